@@ -0,0 +1,74 @@
+# scripts/bench_plan_executor.py
+#
+# Plan wall time: sequential (max_parallelism=1) vs DAG-parallel
+# execution of wide plans with independent steps. Uses the real
+# CommandExecutor and TaskManager against a throwaway database.
+#
+#   PYTHONPATH=src python scripts/bench_plan_executor.py --width 4 8 16 --parallelism 4 8
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+# DB_PATH is read at import time
+os.environ["AIOS_DATA_DIR"] = tempfile.mkdtemp(prefix="bench-plan-")
+
+from ai_os.executors.command_executor import CommandExecutor
+from ai_os.persistence.schema import init_db
+from ai_os.planner.executor import PlanExecutor
+from ai_os.planner.plan import Plan, PlanStep
+from ai_os.tasks.task_manager import TaskManager
+
+COMMANDS = [["ls"], ["pwd"], ["echo", "hello"]]
+
+
+def wide_plan(width: int) -> Plan:
+    # Ids opt the plan into graph execution; without them it runs in order
+    return Plan(
+        goal="bench",
+        steps=[
+            PlanStep(action="command", params={"command": COMMANDS[i % len(COMMANDS)]}, id=f"s{i}")
+            for i in range(width)
+        ],
+    )
+
+
+def measure(executor: PlanExecutor, plan: Plan, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        executor.execute(plan)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--parallelism", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    init_db()
+    task_manager = TaskManager()
+    command_executor = CommandExecutor()
+
+    executors = {
+        p: PlanExecutor(task_manager, command_executor, max_parallelism=p)
+        for p in [1, *args.parallelism]
+    }
+
+    for width in args.width:
+        plan = wide_plan(width)
+        sequential = measure(executors[1], plan, args.runs)
+        line = f"width={width:>3}  sequential {sequential * 1000:8.2f} ms"
+        for p in args.parallelism:
+            parallel = measure(executors[p], plan, args.runs)
+            line += f" | p={p}: {parallel * 1000:8.2f} ms ({sequential / parallel:4.1f}x)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# scripts/bench_plan_grammar.py
+#
+# Local planner reliability: free-form generation vs decoding
+# constrained to the Plan JSON schema. For each goal the planner gets
+# up to --attempts generations (the dispatcher makes 2 local attempts
+# before going to the cloud) and we report the first-attempt success
+# rate, mean generations per plan, and how many failures were
+# unparseable output rather than invalid plans. Each mode runs with
+# the completion read whole and as a stream (stopping at the end of
+# the object or the first invalid step); tokens/generation shows
+# what streaming saves. (A model that samples stray UTF-8 lead bytes,
+# like a random-weight test model, makes llama.cpp hold a free-form
+# stream back until the end, so that row only means something with a
+# real model.)
+#
+#   PYTHONPATH=src python scripts/bench_plan_grammar.py --model models/planner.gguf
+
+import argparse
+import json
+import statistics
+import time
+
+from ai_os.llm.local import LocalLLMClient
+from ai_os.planner.llm_planner import LLMPlanner
+from ai_os.planner.validator import PlanValidationError
+
+GOALS = [
+    "list files",
+    "show the files in this folder",
+    "what directory am I in",
+    "print the working directory",
+    "say hello",
+    "echo hello world",
+    "list files and then print the working directory",
+    "print the current directory, then list its files",
+    "echo done after listing files",
+    "show where I am and what is here",
+    "greet the user",
+    "echo the word ready",
+]
+
+
+class RecordingClient:
+    """
+    Keeps the last raw output so failures can be classified.
+    """
+
+    def __init__(self, llm: LocalLLMClient):
+        self.llm = llm
+        self.last = ""
+        self.calls = 0
+        self.tokens = 0
+        self.seconds = 0.0
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        start = time.perf_counter()
+        self.last = self.llm.generate(prompt, **kwargs)
+        self.seconds += time.perf_counter() - start
+        self.calls += 1
+        self.tokens += self._count(self.last)
+        return self.last
+
+    def generate_stream(self, prompt: str, **kwargs):
+        start = time.perf_counter()
+        self.last = ""
+        self.calls += 1
+        stream = self.llm.generate_stream(prompt, **kwargs)
+        try:
+            for chunk in stream:
+                self.last += chunk
+                yield chunk
+        finally:
+            stream.close()
+            self.seconds += time.perf_counter() - start
+            self.tokens += self._count(self.last)
+
+    def _count(self, text: str) -> int:
+        return len(self.llm.llm.tokenize(text.encode("utf-8"), add_bos=False))
+
+
+def parses(raw: str) -> bool:
+    try:
+        json.loads(raw)
+        return True
+    except ValueError:
+        return False
+
+
+def run(llm: LocalLLMClient, constrained: bool, streaming: bool, goals, attempts: int):
+    client = RecordingClient(llm)
+    planner = LLMPlanner(client, constrained=constrained, streaming=streaming)
+
+    first_ok = 0
+    generations = []
+    unparseable = invalid = failed = 0
+    for goal in goals:
+        for attempt in range(1, attempts + 1):
+            try:
+                planner.plan(goal)
+            except PlanValidationError:
+                if parses(client.last.strip()):
+                    invalid += 1
+                else:
+                    unparseable += 1
+                continue
+            first_ok += attempt == 1
+            generations.append(attempt)
+            break
+        else:
+            failed += 1
+            generations.append(attempts)
+
+    return {
+        "first_attempt_success": first_ok / len(goals),
+        "mean_generations": statistics.mean(generations),
+        "failed_goals": failed,
+        "unparseable_outputs": unparseable,
+        "invalid_plans": invalid,
+        "mean_generation_s": client.seconds / max(1, client.calls),
+        "mean_tokens": client.tokens / max(1, client.calls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", required=True, help="GGUF model path")
+    parser.add_argument("--attempts", type=int, default=2)
+    parser.add_argument("--goals", type=int, default=len(GOALS))
+    args = parser.parse_args()
+
+    llm = LocalLLMClient(args.model)
+    goals = GOALS[: args.goals]
+
+    modes = [
+        ("free-form", False, False),
+        ("free-form/stream", False, True),
+        ("constrained", True, False),
+        ("constrained/stream", True, True),
+    ]
+    for label, constrained, streaming in modes:
+        result = run(llm, constrained, streaming, goals, args.attempts)
+        print(
+            f"{label:<18} first-attempt {result['first_attempt_success']:6.1%} | "
+            f"generations/plan {result['mean_generations']:.2f} | "
+            f"failed {result['failed_goals']}/{len(goals)} | "
+            f"unparseable {result['unparseable_outputs']} | "
+            f"invalid {result['invalid_plans']} | "
+            f"{result['mean_tokens']:5.1f} tokens, "
+            f"{result['mean_generation_s']:.2f} s/generation"
+        )
+
+
+if __name__ == "__main__":
+    main()
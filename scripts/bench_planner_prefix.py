@@ -0,0 +1,105 @@
+# scripts/bench_planner_prefix.py
+#
+# Planner prompt cost: the old layout (goal substituted inside the
+# preamble, every prompt evaluated from the first divergent token)
+# vs the static preamble as a prefix whose KV state is kept by
+# LocalLLMClient. Reports prompt tokens evaluated, prompt-eval time
+# and time to first token per request, plus the one-off warm-up with
+# and without a saved state file. "interleaved" runs an unrelated
+# prompt between plans, as another user of the same model would.
+#
+#   PYTHONPATH=src python scripts/bench_planner_prefix.py --model models/planner.gguf
+
+import argparse
+import statistics
+import tempfile
+import time
+
+import llama_cpp
+
+from ai_os.llm.local import LocalLLMClient
+from ai_os.planner.llm_planner import LLMPlanner, PROMPT_PREFIX
+
+GOALS = [
+    "list files",
+    "what directory am I in",
+    "say hello",
+    "print the working directory, then list files",
+    "echo the word ready",
+    "show where I am and what is here",
+]
+
+# _build_prompt before the preamble became a stable prefix
+LEGACY_PROMPT = PROMPT_PREFIX.replace('"<goal>"', '"{goal}"').replace(
+    "with \"goal\" set to the goal\ngiven at the end", "exactly"
+) + "\nNow produce the JSON plan.\n"
+
+
+def first_token(client: LocalLLMClient, prompt: str):
+    """
+    (prompt tokens evaluated, prompt-eval ms, time to first token ms)
+    """
+    ctx = client.llm._ctx.ctx
+    with client._lock:
+        llama_cpp.llama_perf_context_reset(ctx)
+        start = time.perf_counter()
+        stream = client.llm(
+            client._prompt_tokens(prompt), max_tokens=1, temperature=0.0, stream=True
+        )
+        next(iter(stream), None)
+        ttft = (time.perf_counter() - start) * 1000
+        for _ in stream:
+            pass
+        perf = llama_cpp.llama_perf_context(ctx)
+    return perf.n_p_eval, perf.t_p_eval_ms, ttft
+
+
+OTHER_PROMPT = "Summarize in one sentence why a planner should output JSON.\n"
+
+
+def run(client: LocalLLMClient, build, rounds: int, interleaved: bool = False):
+    samples = []
+    for _ in range(rounds):
+        for goal in GOALS:
+            if interleaved:
+                first_token(client, OTHER_PROMPT)
+            samples.append(first_token(client, build(goal)))
+    tokens, eval_ms, ttft = zip(*samples)
+    return statistics.mean(tokens), statistics.median(eval_ms), statistics.median(ttft)
+
+
+def report(label, result):
+    tokens, eval_ms, ttft = result
+    print(
+        f"{label:<26} prompt tokens evaluated (mean) {tokens:6.1f} | "
+        f"prompt eval p50 {eval_ms:8.2f} ms | TTFT p50 {ttft:8.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", required=True, help="GGUF model path")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    planner = LLMPlanner(None)
+
+    legacy = LocalLLMClient(args.model)
+    report("legacy prompt", run(legacy, lambda g: LEGACY_PROMPT.replace("{goal}", g), args.rounds))
+    report("prefix, cold", run(legacy, planner._build_prompt, args.rounds))
+    report("prefix, cold, interleaved", run(legacy, planner._build_prompt, args.rounds, True))
+    del legacy
+
+    state_dir = tempfile.mkdtemp(prefix="bench-prefix-")
+    for label in ("warm-up (eval)", "warm-up (file)"):
+        client = LocalLLMClient(args.model)
+        start = time.perf_counter()
+        client.warm_prefix(PROMPT_PREFIX, state_dir)
+        print(f"{label:<26} {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    report("prefix cached", run(client, planner._build_prompt, args.rounds))
+    report("prefix cached, interleaved", run(client, planner._build_prompt, args.rounds, True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# scripts/bench_spawn.py
+#
+# Command spawn latency: direct (asyncio subprocess forked from this
+# process) vs the prewarmed spawn server (posix_spawn from a small
+# helper). --ballast-mb grows this process first, to stand in for an
+# API process with torch/onnxruntime/llama.cpp mapped.
+#
+#   PYTHONPATH=src python scripts/bench_spawn.py --runs 500 --ballast-mb 0 2048
+
+import argparse
+import statistics
+import time
+
+from ai_os.executors.command_executor import CommandExecutor
+from ai_os.executors.spawner import Spawner
+
+PAGE = 4096
+
+
+def grow(ballast: list, mb: int):
+    # Touch every page so it is really mapped and must be copied on fork
+    block = bytearray(mb * 1024 * 1024)
+    for i in range(0, len(block), PAGE):
+        block[i] = 1
+    ballast.append(block)
+
+
+def measure(executor: CommandExecutor, command, runs: int):
+    executor.run(command)  # warm up
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        executor.run(command)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return (
+        statistics.median(samples),
+        samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=300)
+    parser.add_argument("--ballast-mb", type=int, nargs="+", default=[0, 1024])
+    parser.add_argument("--command", nargs="+", default=["pwd"])
+    args = parser.parse_args()
+
+    # Started before any ballast, as main.py does before heavy imports
+    spawner = Spawner(CommandExecutor.ALLOWED_COMMANDS)
+    direct = CommandExecutor()
+    served = CommandExecutor(spawner=spawner)
+
+    ballast = []
+    grown = 0
+    for mb in sorted(args.ballast_mb):
+        grow(ballast, mb - grown)
+        grown = mb
+
+        d50, d99 = measure(direct, args.command, args.runs)
+        s50, s99 = measure(served, args.command, args.runs)
+        print(
+            f"parent +{mb:>5} MB | direct p50 {d50:6.2f} ms p99 {d99:6.2f} ms"
+            f" | spawner p50 {s50:6.2f} ms p99 {s99:6.2f} ms"
+        )
+
+    spawner.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# scripts/bench_task_startup.py
+#
+# TaskManager startup time vs. number of historical task rows.
+# Startup should stay flat: only pending/running tasks are loaded.
+#
+#   PYTHONPATH=src python scripts/bench_task_startup.py --rows 10000 100000 1000000
+
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+ACTIVE_ROWS = 50
+
+INSERT = """
+    INSERT INTO tasks (id, type, status, payload, result, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+def populate(path: Path, rows: int):
+    from ai_os.persistence.migrations import migrate
+    from ai_os.persistence.schema import _create_tables
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    _create_tables(conn)
+    migrate(conn)
+
+    payload = json.dumps({"command": ["ls"]})
+    result = json.dumps({"stdout": "x" * 200, "stderr": "", "returncode": 0})
+    now = time.time()
+
+    batch = []
+    for i in range(rows):
+        status = "pending" if i < ACTIVE_ROWS else "completed"
+        batch.append((str(uuid.uuid4()), "command", status, payload, result, now - i))
+        if len(batch) == 50_000:
+            conn.executemany(INSERT, batch)
+            batch = []
+    if batch:
+        conn.executemany(INSERT, batch)
+
+    conn.commit()
+    conn.close()
+
+
+def measure(rows: int) -> float:
+    """
+    Runs in a fresh interpreter so the DB path (read from
+    AIOS_DATA_DIR at import) and the connection pool are per run.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, AIOS_DATA_DIR=tmp)
+        code = (
+            "import time, sys\n"
+            "from ai_os.tasks.task_manager import TaskManager\n"
+            "start = time.perf_counter()\n"
+            "tm = TaskManager()\n"
+            "tm.load_active()\n"
+            "elapsed = time.perf_counter() - start\n"
+            "assert tm.cache_stats()['active'] == %d\n"
+            "print(elapsed)\n" % min(rows, ACTIVE_ROWS)
+        )
+
+        populate(Path(tmp) / "ai_os.db", rows)
+
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            cwd=tmp,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return float(out.stdout.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        elapsed = measure(rows)
+        print(f"{rows:>9} rows: startup {elapsed * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
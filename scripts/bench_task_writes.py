@@ -0,0 +1,97 @@
+# scripts/bench_task_writes.py
+#
+# Task write throughput: connect-per-call (old get_conn) vs pooled WAL.
+# Each task does what TaskManager does: one INSERT, then one UPDATE,
+# each in its own transaction.
+#
+#   PYTHONPATH=src python scripts/bench_task_writes.py --writers 8 --tasks 500
+
+import argparse
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from ai_os.persistence.db import ConnectionPool
+from ai_os.persistence.schema import _create_tables
+
+INSERT = """
+    INSERT INTO tasks (id, type, status, payload, created_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+UPDATE = """
+    UPDATE tasks SET status = ?, result = ?, error = ? WHERE id = ?
+"""
+
+
+def write_task_legacy(path: Path):
+    task_id = str(uuid.uuid4())
+
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute(INSERT, (task_id, "command", "pending", json.dumps({"command": ["ls"]}), time.time()))
+    conn.commit()
+    conn.close()
+
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute(UPDATE, ("completed", json.dumps({"stdout": "ok"}), None, task_id))
+    conn.commit()
+    conn.close()
+
+
+def write_task_pooled(pool: ConnectionPool):
+    task_id = str(uuid.uuid4())
+    conn = pool.get()
+
+    with conn:
+        conn.execute(INSERT, (task_id, "command", "pending", json.dumps({"command": ["ls"]}), time.time()))
+    with conn:
+        conn.execute(UPDATE, ("completed", json.dumps({"stdout": "ok"}), None, task_id))
+
+
+def run(mode: str, writers: int, tasks: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+
+        setup = sqlite3.connect(path)
+        _create_tables(setup)
+        setup.commit()
+        setup.close()
+
+        pool = ConnectionPool(path)
+
+        def worker():
+            for _ in range(tasks):
+                if mode == "legacy":
+                    write_task_legacy(path)
+                else:
+                    write_task_pooled(pool)
+
+        threads = [threading.Thread(target=worker) for _ in range(writers)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        pool.close_all()
+
+    return writers * tasks / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--tasks", type=int, default=250, help="Tasks per writer")
+    args = parser.parse_args()
+
+    for mode in ("legacy", "pooled"):
+        rate = run(mode, args.writers, args.tasks)
+        print(f"{mode:>7}: {rate:10.1f} tasks/sec  ({args.writers} writers x {args.tasks} tasks)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# scripts/enable_incremental_vacuum.py
+#
+# One-off conversion of an existing database to incremental auto_vacuum,
+# so the retention engine can return freed pages to the OS. Runs a full
+# VACUUM, which locks the database while it rewrites the file: stop the
+# API (or pick a quiet window) first.
+#
+#   PYTHONPATH=src AIOS_DATA_DIR=./data python scripts/enable_incremental_vacuum.py
+
+import os
+import time
+
+from ai_os.config import Config
+from ai_os.persistence.db import get_conn
+from ai_os.persistence.retention import enable_incremental_vacuum
+
+
+def main():
+    before = os.path.getsize(Config.DB_PATH)
+    start = time.perf_counter()
+    if not enable_incremental_vacuum(get_conn()):
+        print(f"{Config.DB_PATH} is already in incremental auto_vacuum mode")
+        return
+
+    print(
+        f"Converted {Config.DB_PATH} in {time.perf_counter() - start:.1f} s "
+        f"({before / 1e6:.1f} MB -> {os.path.getsize(Config.DB_PATH) / 1e6:.1f} MB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,20 @@
-from fastapi import FastAPI, HTTPException, Request
+import asyncio
+import threading
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from ai_os.observability.timing import timing_middleware
-from ai_os.model_manager import ModelManager
-from ai_os.tasks.task_manager import TaskManager
+from ai_os.model_manager import ModelManager, ModelLoadingError
+from ai_os.inference import encoding as emb_encoding
+from ai_os.tasks.task_manager import InvalidCursorError, TaskManager, TaskNotFoundError
+from ai_os.tasks.task_queue import TaskQueue, parse_role_limits
 from ai_os.executors.command_executor import CommandExecutor
+from ai_os.executors.pools import PoolSaturatedError, WorkPool
+from ai_os.executors.spawner import get_spawner
 from ai_os.planner.executor import PlanExecutor
-from ai_os.planner.llm_planner import LLMPlanner
+from ai_os.planner.llm_planner import LLMPlanner, PROMPT_PREFIX
 from ai_os.planner.validator import PlanValidationError
 from ai_os.security.policy import PolicyEngine, PolicyError
 from ai_os.security.capabilities import Capability
@@ -13,8 +22,25 @@ from ai_os.security.auth import resolve_request_context
 from ai_os.security.rate_limit import RateLimiter, RateLimitError
 from ai_os.llm.local import LocalLLMClient
 from ai_os.llm.client import CloudLLMClient
+from ai_os.planner.cache import PlanCache
 from ai_os.planner.dispatcher import PlannerDispatcher
+from ai_os.planner.semantic_index import SemanticPlanIndex
+from ai_os.persistence.archive import ArchiveStore
+from ai_os.persistence.blobs import (
+    BlobNotFoundError,
+    BlobStore,
+    RangeNotSatisfiableError,
+    parse_byte_range,
+)
+from ai_os.persistence.db import get_conn
+from ai_os.persistence.retention import RetentionEngine, default_policies
+from ai_os.persistence.schema import init_db
+from ai_os.persistence.write_behind import WriteBehindQueue
+from ai_os.sse import EventChannel, format_event
 from ai_os.config import Config
+from ai_os.observability.logger import get_logger
+
+logger = get_logger("api")
 
 # ---- Globals ----
 
@@ -22,13 +48,49 @@ rate_limiter = RateLimiter(max_requests=10, window_seconds=60)
 
 local_llm = LocalLLMClient(model_path=Config.LOCAL_LLM_PATH)
 model_manager = ModelManager()
-task_manager = TaskManager()
-command_executor = CommandExecutor()
+task_write_behind = None
+if Config.TASK_WRITE_MODE == "write_behind":
+    task_write_behind = WriteBehindQueue(
+        connect=get_conn,
+        flush_interval_ms=Config.TASK_WRITE_FLUSH_MS,
+        max_batch=Config.TASK_WRITE_MAX_BATCH,
+        durability=Config.TASK_WRITE_DURABILITY,
+    )
+task_archive = ArchiveStore(Config.ARCHIVE_DIR)
+task_manager = TaskManager(write_behind=task_write_behind, archive=task_archive)
+blob_store = BlobStore(Config.BLOB_DIR)
+retention = RetentionEngine(
+    default_policies(),
+    archive=task_archive,
+    batch_size=Config.RETENTION_BATCH_SIZE,
+    vacuum_pages=Config.RETENTION_VACUUM_PAGES,
+    blobs=blob_store,
+    blob_max_age_days=Config.RETENTION_BLOB_DAYS,
+)
+command_spawner = None
+if Config.COMMAND_SPAWNER == "server":
+    # Already running if main.py started it before the heavy imports
+    command_spawner = get_spawner(CommandExecutor.ALLOWED_COMMANDS)
+command_executor = CommandExecutor(blob_store=blob_store, spawner=command_spawner)
+task_queue = TaskQueue(
+    task_manager,
+    handlers={"command": lambda task: command_executor.run(task.payload["command"])},
+    workers=Config.TASK_QUEUE_WORKERS,
+    max_queue=Config.TASK_QUEUE_MAX,
+    role_limits=parse_role_limits(Config.TASK_ROLE_LIMITS),
+    max_priority=Config.TASK_MAX_PRIORITY,
+)
 
-plan_executor = PlanExecutor(task_manager, command_executor)
+plan_executor = PlanExecutor(
+    task_manager, command_executor, max_parallelism=Config.PLAN_MAX_PARALLELISM
+)
 policy_engine = PolicyEngine()
 
-local_planner = LLMPlanner(local_llm)
+local_planner = LLMPlanner(
+    local_llm,
+    constrained=Config.LOCAL_LLM_CONSTRAINED,
+    streaming=Config.PLANNER_STREAMING,
+)
 
 cloud_planner = None
 if Config.ENABLE_CLOUD_LLM:
@@ -37,12 +99,58 @@ if Config.ENABLE_CLOUD_LLM:
         base_url=Config.OPENROUTER_BASE_URL,
         model=Config.OPENROUTER_MODEL,
     )
-    cloud_planner = LLMPlanner(cloud_llm)
+    cloud_planner = LLMPlanner(cloud_llm, streaming=Config.PLANNER_STREAMING)
+
+# Blocking work runs on dedicated, separately sized pools so slow
+# plans can't starve cheap handlers on the event loop
+inference_pool = WorkPool(
+    "inference", Config.INFERENCE_POOL_WORKERS, Config.INFERENCE_POOL_QUEUE
+)
+llm_pool = WorkPool("llm", Config.LLM_POOL_WORKERS, Config.LLM_POOL_QUEUE)
+command_pool = WorkPool(
+    "command", Config.COMMAND_POOL_WORKERS, Config.COMMAND_POOL_QUEUE
+)
+
+plan_cache = None
+if Config.PLAN_CACHE_ENABLED:
+    plan_cache = PlanCache(
+        max_entries=Config.PLAN_CACHE_MAX_ENTRIES,
+        ttl_seconds=Config.PLAN_CACHE_TTL_SECONDS,
+    )
+
+
+def _warm_planner_prefix():
+    # Plans requested meanwhile wait on the client lock, then reuse it
+    try:
+        local_llm.warm_prefix(PROMPT_PREFIX, Config.LOCAL_LLM_STATE_DIR)
+    except Exception as e:
+        logger.warning(f"Planner prompt prefix not cached: {e}")
+
+
+def _embed_goal(goal: str):
+    # Never wait on a cold model: planning just goes to the LLM instead
+    if not model_manager.is_ready(Config.PLAN_INDEX_MODEL):
+        return None
+    return model_manager.embed(Config.PLAN_INDEX_MODEL, goal)
+
+
+plan_index = None
+if Config.PLAN_INDEX_ENABLED:
+    plan_index = SemanticPlanIndex(
+        Config.PLAN_INDEX_DIR,
+        embed=_embed_goal,
+        model=Config.PLAN_INDEX_MODEL,
+        threshold=Config.PLAN_INDEX_THRESHOLD,
+        top_k=Config.PLAN_INDEX_TOP_K,
+        max_entries=Config.PLAN_INDEX_MAX_ENTRIES,
+    )
 
 dispatcher = PlannerDispatcher(
     local_planner=local_planner,
     cloud_planner=cloud_planner,
     policy=policy_engine,
+    cache=plan_cache,
+    index=plan_index,
 )
 
 # ---- Schemas ----
@@ -50,14 +158,70 @@ dispatcher = PlannerDispatcher(
 class InferRequest(BaseModel):
     model: str
     prompt: str
+    # None keeps the legacy 5-value "sample" response
+    encoding: Optional[str] = None
+
+class InferBatchRequest(BaseModel):
+    model: str
+    texts: list[str]
+    encoding: str = emb_encoding.FLOAT
+
+
+def _resolve_encoding(encoding: Optional[str], request: Request) -> Optional[str]:
+    if emb_encoding.OCTET_STREAM in request.headers.get("accept", ""):
+        return emb_encoding.BINARY
+    if encoding is not None and encoding not in emb_encoding.ENCODINGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"encoding must be one of {list(emb_encoding.ENCODINGS)}",
+        )
+    return encoding
+
+
+def _embedding_response(model: str, embeddings, truncated, encoding: str, single: bool):
+    truncated_rows = [int(i) for i, cut in enumerate(truncated) if cut]
+
+    if encoding == emb_encoding.BINARY:
+        return Response(
+            content=emb_encoding.to_bytes(embeddings),
+            media_type=emb_encoding.OCTET_STREAM,
+            headers={
+                "X-Embedding-Dtype": "float32",
+                "X-Embedding-Shape": ",".join(str(d) for d in embeddings.shape),
+                "X-Embedding-Truncated": ",".join(str(i) for i in truncated_rows),
+            },
+        )
+
+    result = {"model": model, "dim": int(embeddings.shape[1])}
+    if single:
+        result["truncated"] = bool(truncated_rows)
+        result["embedding"] = emb_encoding.encode_embeddings(embeddings[0], encoding)
+    else:
+        result["count"] = int(embeddings.shape[0])
+        result["truncated"] = truncated_rows
+        result["embeddings"] = emb_encoding.encode_embeddings(embeddings, encoding)
+
+    return {"result": result}
 
 class CommandTaskRequest(BaseModel):
     command: list[str]
+    # "sync" runs inline; "async" returns 202 and runs on the task queue
+    mode: str = "sync"
+    # Async only; higher runs first, clamped to +/- AIOS_TASK_MAX_PRIORITY
+    priority: int = 0
 
 class PlanRequest(BaseModel):
     goal: str
 
 
+def _model_loading(e: ModelLoadingError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title="AI OS Daemon",
@@ -66,48 +230,202 @@ def create_app() -> FastAPI:
 
     app.middleware("http")(timing_middleware)
 
+    @app.exception_handler(PoolSaturatedError)
+    async def pool_saturated(request: Request, e: PoolSaturatedError):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(e)},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
     @app.get("/health")
-    def health():
+    async def health():
         return {
             "status": "ok",
             "env": Config.ENV,
             "cloud_enabled": Config.ENABLE_CLOUD_LLM,
+            "models": model_manager.model_status(),
+        }
+
+    @app.on_event("startup")
+    def startup():
+        if Config.MODEL_PRELOAD:
+            model_manager.preload_async()
+        # Load active tasks once the schema is migrated, then requeue pending work
+        init_db()
+        task_queue.start()
+        task_queue.recover()
+        if Config.LOCAL_LLM_PREFIX_CACHE:
+            threading.Thread(
+                target=_warm_planner_prefix, name="llm-prefix-warmup", daemon=True
+            ).start()
+        if Config.RETENTION_ENABLED:
+            retention.start(
+                Config.RETENTION_INTERVAL_SECONDS,
+                Config.RETENTION_INITIAL_DELAY_SECONDS,
+            )
+
+    @app.on_event("shutdown")
+    def shutdown():
+        retention.stop()
+        task_queue.shutdown()
+        for pool in (inference_pool, llm_pool, command_pool):
+            pool.shutdown()
+        if command_spawner:
+            command_spawner.close()
+        # After the pools: drains writes from tasks that just finished
+        task_manager.close()
+        model_manager.shutdown()
+
+    @app.get("/v1/metrics")
+    async def metrics():
+        return {
+            "pools": {
+                pool.name: pool.snapshot()
+                for pool in (inference_pool, llm_pool, command_pool)
+            },
+            "batching": model_manager.batching_stats(),
+            "embedding_cache": model_manager.embedding_cache_stats(),
+            "task_cache": task_manager.cache_stats(),
+            "task_queue": task_queue.snapshot(),
+            "task_writes": (
+                task_write_behind.stats() if task_write_behind else {"mode": "sync"}
+            ),
+            "model_cache": {
+                "used_bytes": model_manager.cache.total_bytes(),
+                "evictions": model_manager.cache.evictions,
+                "unloads": model_manager.cache.unloads,
+            },
+            "retention": retention.stats(),
+            "plan_cache": plan_cache.stats() if plan_cache else {"enabled": False},
+            "plan_index": plan_index.stats() if plan_index else {"enabled": False},
         }
 
     @app.get("/v1/models")
-    def list_models():
+    async def list_models():
         return model_manager.list_models()
 
-    @app.post("/v1/infer")
-    def infer(req: InferRequest):
-        if req.model not in model_manager.list_models():
+    # ---- Model cache administration ----
+
+    def _require_admin(request: Request):
+        ctx = resolve_request_context(request)
+        try:
+            policy_engine.check(ctx.role, Capability.MANAGE_MODELS)
+        except PolicyError as e:
+            raise HTTPException(status_code=403, detail=str(e))
+
+    def _require_registered(name: str):
+        if name not in model_manager.list_models():
             raise HTTPException(status_code=404, detail="Model not found")
+
+    @app.get("/v1/admin/models")
+    async def admin_list_models(request: Request):
+        _require_admin(request)
+        return model_manager.loaded_models()
+
+    @app.post("/v1/admin/models/{name}/load")
+    async def admin_load_model(name: str, request: Request):
+        _require_admin(request)
+        _require_registered(name)
         try:
-            return {"result": model_manager.infer(req.model, req.prompt)}
+            return await inference_pool.run(model_manager.load, name)
+        except PoolSaturatedError:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
-    @app.post("/v1/tasks/command")
-    def run_command(req: CommandTaskRequest, request: Request):
-        ctx = resolve_request_context(request)
-        rate_key = f"{request.client.host}:{ctx.role}"
+    @app.post("/v1/admin/models/{name}/unload")
+    async def admin_unload_model(name: str, request: Request):
+        _require_admin(request)
+        _require_registered(name)
+        return {"name": name, "unloaded": model_manager.unload(name)}
 
-        # 🚦 Day 17: rate limiting
+    @app.post("/v1/admin/models/{name}/pin")
+    async def admin_pin_model(name: str, request: Request):
+        _require_admin(request)
+        _require_registered(name)
         try:
-            rate_limiter.check(rate_key)
-        except RateLimitError as e:
-            raise HTTPException(status_code=429, detail=str(e))
+            return await inference_pool.run(model_manager.pin, name, True)
+        except PoolSaturatedError:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
-        # 🔒 Authorization
+    @app.post("/v1/admin/models/{name}/unpin")
+    async def admin_unpin_model(name: str, request: Request):
+        _require_admin(request)
+        _require_registered(name)
+        return model_manager.pin(name, False)
+
+    @app.delete("/v1/admin/cache/embeddings")
+    async def admin_clear_embedding_cache(request: Request):
+        _require_admin(request)
+        if model_manager.embedding_cache:
+            model_manager.embedding_cache.clear()
+        return model_manager.embedding_cache_stats()
+
+    @app.delete("/v1/admin/cache/plans")
+    async def admin_clear_plan_cache(request: Request):
+        _require_admin(request)
+        if plan_cache:
+            plan_cache.clear()
+        return plan_cache.stats() if plan_cache else {"enabled": False}
+
+    @app.post("/v1/infer")
+    async def infer(req: InferRequest, request: Request):
+        if req.model not in model_manager.list_models():
+            raise HTTPException(status_code=404, detail="Model not found")
+        encoding = _resolve_encoding(req.encoding, request)
         try:
-            policy_engine.check(ctx.role, Capability.EXECUTE_COMMAND)
-        except PolicyError as e:
-            raise HTTPException(status_code=403, detail=str(e))
+            if encoding is None:
+                result = await inference_pool.run(
+                    model_manager.infer, req.model, req.prompt
+                )
+                return {"result": result}
+            embedding, truncated = await inference_pool.run(
+                model_manager.embed, req.model, req.prompt, return_truncation=True
+            )
+            return _embedding_response(
+                req.model, embedding[None, :], [truncated], encoding, single=True
+            )
+        except ModelLoadingError as e:
+            raise _model_loading(e)
+        except PoolSaturatedError:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
-        task = task_manager.create_task("command", req.dict())
+    @app.post("/v1/infer/batch")
+    async def infer_batch(req: InferBatchRequest, request: Request):
+        encoding = _resolve_encoding(req.encoding, request)
+        if req.model not in model_manager.list_models():
+            raise HTTPException(status_code=404, detail="Model not found")
+        if not req.texts:
+            raise HTTPException(status_code=400, detail="texts must not be empty")
+        if len(req.texts) > Config.INFER_BATCH_MAX_TEXTS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {Config.INFER_BATCH_MAX_TEXTS} texts per request",
+            )
+        try:
+            embeddings, truncated = await inference_pool.run(
+                model_manager.embed_batch, req.model, req.texts, return_truncation=True
+            )
+            return _embedding_response(
+                req.model, embeddings, truncated, encoding, single=False
+            )
+        except ModelLoadingError as e:
+            raise _model_loading(e)
+        except PoolSaturatedError:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def _execute_command_task(req: CommandTaskRequest):
+        task = task_manager.create_task("command", {"command": req.command})
 
         try:
-            task.status = "running"
+            task_manager.mark_running(task)
             task.result = command_executor.run(req.command)
             task.status = "completed"
         except Exception as e:
@@ -127,12 +445,104 @@ def create_app() -> FastAPI:
         task_manager.update_task(task)
         return task
 
+    @app.post("/v1/tasks/command")
+    async def run_command(req: CommandTaskRequest, request: Request):
+        ctx = resolve_request_context(request)
+        rate_key = f"{request.client.host}:{ctx.role}"
+
+        # 🚦 Day 17: rate limiting
+        try:
+            rate_limiter.check(rate_key)
+        except RateLimitError as e:
+            raise HTTPException(status_code=429, detail=str(e))
+
+        # 🔒 Authorization
+        try:
+            policy_engine.check(ctx.role, Capability.EXECUTE_COMMAND)
+        except PolicyError as e:
+            raise HTTPException(status_code=403, detail=str(e))
+
+        if req.mode not in ("sync", "async"):
+            raise HTTPException(status_code=400, detail="mode must be 'sync' or 'async'")
+
+        if req.mode == "sync":
+            return await command_pool.run(_execute_command_task, req)
+
+        task = await run_in_threadpool(
+            task_queue.submit,
+            "command",
+            {"command": req.command},
+            priority=req.priority,
+            role=ctx.role.value,
+        )
+        return JSONResponse(
+            status_code=202,
+            content={"task_id": task.id, "status": task.status},
+            headers={"Location": f"/v1/tasks/{task.id}"},
+        )
+
+    @app.get("/v1/tasks")
+    async def list_tasks(
+        status: Optional[str] = None,
+        type: Optional[str] = None,
+        created_after: Optional[float] = None,
+        created_before: Optional[float] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        include_result: bool = False,
+    ):
+        if not 1 <= limit <= Config.TASK_LIST_MAX_LIMIT:
+            raise HTTPException(
+                status_code=400,
+                detail=f"limit must be between 1 and {Config.TASK_LIST_MAX_LIMIT}",
+            )
+        try:
+            page = await run_in_threadpool(
+                task_manager.list_tasks,
+                status=status,
+                task_type=type,
+                created_after=created_after,
+                created_before=created_before,
+                limit=limit,
+                cursor=cursor,
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        exclude = None if include_result else {"result"}
+        return {
+            "tasks": [task.model_dump(exclude=exclude) for task in page["tasks"]],
+            "next_cursor": page["next_cursor"],
+        }
+
+    @app.get("/v1/tasks/stats")
+    async def task_stats(
+        type: Optional[str] = None,
+        created_after: Optional[float] = None,
+        created_before: Optional[float] = None,
+    ):
+        return {
+            "latency": await run_in_threadpool(
+                task_manager.latency_stats,
+                task_type=type,
+                created_after=created_after,
+                created_before=created_before,
+            )
+        }
+
     @app.get("/v1/tasks/{task_id}")
-    def get_task(task_id: str):
-        return task_manager.get_task(task_id)
+    async def get_task(task_id: str, wait: float = 0):
+        try:
+            task = await run_in_threadpool(task_manager.get_task, task_id)
+        except TaskNotFoundError:
+            raise HTTPException(status_code=404, detail="Task not found")
 
-    @app.post("/v1/plan")
-    def plan_and_execute(req: PlanRequest, request: Request):
+        # Long-poll: hold the request until the task finishes or `wait` expires
+        if wait > 0:
+            task = await task_queue.wait(task, min(wait, Config.TASK_MAX_WAIT_SECONDS))
+        return task
+
+    def _authorize_plan(request: Request):
         ctx = resolve_request_context(request)
         rate_key = f"{request.client.host}:{ctx.role}"
 
@@ -148,8 +558,125 @@ def create_app() -> FastAPI:
         except PolicyError as e:
             raise HTTPException(status_code=403, detail=str(e))
 
+        return ctx
+
+    async def _plan(goal: str, role, on_event=None):
+        # Stored plans are cheap lookups: only a miss takes a slot on the
+        # LLM pool, so hits never queue behind (or 503 on) a generation
+        plan = await run_in_threadpool(dispatcher.reuse, goal, role, on_event)
+        if plan is None:
+            plan = await llm_pool.run(dispatcher.generate, goal, role, on_event)
+        return plan
+
+    @app.post("/v1/plan/stream")
+    async def plan_stream(req: PlanRequest, request: Request):
+        """
+        Same as /v1/plan, reported as Server-Sent Events while it runs:
+        planner_started/failed/succeeded, plan_accepted, task_started,
+        task_finished, then done (or error). Disconnecting stops any
+        step that hasn't started yet.
+        """
+        ctx = _authorize_plan(request)
+        channel = EventChannel()
+        cancel = threading.Event()
+
+        async def run():
+            try:
+                plan = await _plan(req.goal, ctx.role, channel.emit)
+                channel.emit("plan_accepted", {
+                    "goal": plan.goal,
+                    "steps": [s.dict() for s in plan.steps],
+                })
+                tasks = await command_pool.run(
+                    plan_executor.execute, plan, channel.emit, cancel
+                )
+                channel.emit("done", {
+                    "tasks": len(tasks),
+                    "statuses": [task.status for task in tasks],
+                })
+            except PlanValidationError as e:
+                channel.emit("error", {"code": "Plan Failed", "message": str(e)})
+            except PoolSaturatedError as e:
+                channel.emit("error", {"code": "Saturated", "message": str(e)})
+            except Exception as e:
+                channel.emit("error", {"code": "Internal Error", "message": str(e)})
+            finally:
+                channel.close()
+
+        async def stream():
+            worker = asyncio.create_task(run())
+            try:
+                # Flushed at once, before planning starts
+                yield format_event("accepted", {"goal": req.goal})
+                async for frame in channel.events():
+                    yield frame
+            finally:
+                # Client went away (or stream finished): stop scheduling steps
+                cancel.set()
+                if not worker.done():
+                    worker.cancel()
+
+        return StreamingResponse(
+            stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.get("/v1/tasks/{task_id}/output/{stream}")
+    async def get_task_output(task_id: str, stream: str, request: Request):
+        """
+        Raw command output, including anything spilled past the inline cap.
+        Supports a single `Range: bytes=...` header.
+        """
+        if stream not in ("stdout", "stderr"):
+            raise HTTPException(status_code=404, detail="Unknown stream")
+        try:
+            task = await run_in_threadpool(task_manager.get_task, task_id)
+        except TaskNotFoundError:
+            raise HTTPException(status_code=404, detail="Task not found")
+        if not task.result or stream not in task.result:
+            raise HTTPException(status_code=404, detail="Task has no output")
+
+        blob_id = task.result.get(f"{stream}_blob")
+        inline = None
+        try:
+            if blob_id:
+                size = await run_in_threadpool(blob_store.size, blob_id)
+            else:
+                inline = task.result[stream].encode()
+                size = len(inline)
+            byte_range = parse_byte_range(request.headers.get("range"), size)
+        except BlobNotFoundError:
+            raise HTTPException(status_code=410, detail="Output blob has expired")
+        except RangeNotSatisfiableError as e:
+            raise HTTPException(
+                status_code=416,
+                detail=str(e),
+                headers={"Content-Range": f"bytes */{size}"},
+            )
+
+        start, end = byte_range or (0, size)
+        if blob_id:
+            content = await run_in_threadpool(blob_store.read, blob_id, start, end - start)
+        else:
+            content = inline[start:end]
+
+        headers = {"Accept-Ranges": "bytes"}
+        if byte_range:
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+        return Response(
+            content=content,
+            status_code=206 if byte_range else 200,
+            media_type="application/octet-stream",
+            headers=headers,
+        )
+
+    @app.post("/v1/plan")
+    async def plan_and_execute(req: PlanRequest, request: Request):
+        ctx = _authorize_plan(request)
+
         try:
-            plan = dispatcher.plan(req.goal, ctx.role)
+            plan = await _plan(req.goal, ctx.role)
         except PlanValidationError as e:
             raise HTTPException(
                 status_code=400,
@@ -161,7 +688,7 @@ def create_app() -> FastAPI:
                 },
             )
 
-        tasks = plan_executor.execute(plan)
+        tasks = await command_pool.run(plan_executor.execute, plan)
 
         return {
             "goal": plan.goal,
@@ -1,5 +1,6 @@
 # src/ai_os/cli.py
 
+import json
 import click
 import requests
 
@@ -41,5 +42,38 @@ def infer(model, prompt):
         print(r.text)
 
 
+@cli.command()
+@click.argument("model")
+@click.option("--samples", type=click.Path(exists=True), help="File with one sample text per line")
+@click.option("--runs", default=20, show_default=True, help="Timed runs per precision")
+@click.option("--min-cosine", default=0.99, show_default=True, help="Minimum mean cosine to recommend int8")
+@click.option("--force", is_flag=True, help="Re-quantize even if a cached variant exists")
+def quantize(model, samples, runs, min_cosine, force):
+    """
+    Builds the INT8 variant of MODEL locally and compares it to fp32.
+    Set `precision: int8` in the registry to serve it.
+    """
+    from ai_os.config import Config
+    from ai_os.inference.quantization import evaluate, quantize_model
+    from ai_os.model_manager import ModelManager
+
+    manager = ModelManager()
+    if model not in manager.list_models():
+        print("Error: model not registered:", model)
+        return
+
+    path = quantize_model(manager.registry[model]["path"], Config.ONNX_CACHE_DIR, force=force)
+    print("Quantized model:", path)
+
+    texts = None
+    if samples:
+        with open(samples) as f:
+            texts = [line.strip() for line in f if line.strip()]
+
+    report = evaluate(manager, model, texts=texts, runs=runs)
+    report["recommend_int8"] = report["cosine"]["mean"] >= min_cosine
+    print(json.dumps(report, indent=2))
+
+
 if __name__ == "__main__":
     cli()
@@ -17,10 +17,124 @@ class Config:
     # Storage
     DATA_DIR = Path(os.getenv("AIOS_DATA_DIR", "data"))
     DB_PATH = DATA_DIR / "ai_os.db"
+    DB_SYNCHRONOUS = os.getenv("AIOS_DB_SYNCHRONOUS", "NORMAL")
+    DB_CACHE_SIZE_KB = int(os.getenv("AIOS_DB_CACHE_SIZE_KB", "16384"))
+
+    # Finished tasks kept in memory; older ones are read from the DB
+    TASK_CACHE_SIZE = int(os.getenv("AIOS_TASK_CACHE_SIZE", "10000"))
+
+    # Upper bound for GET /v1/tasks page size
+    TASK_LIST_MAX_LIMIT = int(os.getenv("AIOS_TASK_LIST_MAX_LIMIT", "500"))
+
+    # Task persistence: "sync" (write-through) or "write_behind"
+    TASK_WRITE_MODE = os.getenv("AIOS_TASK_WRITE_MODE", "sync")
+    # strict: wait for the fsynced group commit; relaxed: flush in background/on shutdown
+    TASK_WRITE_DURABILITY = os.getenv("AIOS_TASK_WRITE_DURABILITY", "strict")
+    TASK_WRITE_FLUSH_MS = float(os.getenv("AIOS_TASK_WRITE_FLUSH_MS", "10"))
+    TASK_WRITE_MAX_BATCH = int(os.getenv("AIOS_TASK_WRITE_MAX_BATCH", "256"))
+
+    # Retention: completed/failed tasks and plans older than N days
+    # are archived to gzip JSONL segments ("archive") or dropped ("delete").
+    # 0 days disables a policy.
+    RETENTION_ENABLED = os.getenv("AIOS_RETENTION_ENABLED", "1") == "1"
+    RETENTION_ACTION = os.getenv("AIOS_RETENTION_ACTION", "archive")
+    RETENTION_COMPLETED_DAYS = float(os.getenv("AIOS_RETENTION_COMPLETED_DAYS", "30"))
+    RETENTION_FAILED_DAYS = float(os.getenv("AIOS_RETENTION_FAILED_DAYS", "90"))
+    RETENTION_PLANS_DAYS = float(os.getenv("AIOS_RETENTION_PLANS_DAYS", "90"))
+    RETENTION_BLOB_DAYS = float(os.getenv("AIOS_RETENTION_BLOB_DAYS", "30"))
+    RETENTION_INTERVAL_SECONDS = float(os.getenv("AIOS_RETENTION_INTERVAL_SECONDS", "3600"))
+    RETENTION_INITIAL_DELAY_SECONDS = float(os.getenv("AIOS_RETENTION_INITIAL_DELAY_SECONDS", "60"))
+    RETENTION_BATCH_SIZE = int(os.getenv("AIOS_RETENTION_BATCH_SIZE", "500"))
+    RETENTION_VACUUM_PAGES = int(os.getenv("AIOS_RETENTION_VACUUM_PAGES", "2000"))
+    ARCHIVE_DIR = Path(os.getenv("AIOS_ARCHIVE_DIR", str(DATA_DIR / "archive")))
 
     # Defaults
     DEFAULT_DEVICE = os.getenv("AIOS_DEFAULT_DEVICE", "cpu")
     LOCAL_LLM_PATH = os.getenv("AIOS_LOCAL_LLM_PATH")
+    # Local planner output constrained to the Plan JSON schema (GBNF)
+    LOCAL_LLM_CONSTRAINED = os.getenv("AIOS_LOCAL_LLM_CONSTRAINED", "1") == "1"
+    # Planners read completions as a stream, stopping at the end of
+    # the plan object or at the first invalid step
+    PLANNER_STREAMING = os.getenv("AIOS_PLANNER_STREAMING", "1") == "1"
+    # KV state of the static planner prompt prefix, evaluated once and
+    # saved under LOCAL_LLM_STATE_DIR for the next start
+    LOCAL_LLM_PREFIX_CACHE = os.getenv("AIOS_LOCAL_LLM_PREFIX_CACHE", "1") == "1"
+    LOCAL_LLM_STATE_DIR = Path(os.getenv("AIOS_LOCAL_LLM_STATE_DIR", str(DATA_DIR / "llm_state")))
+
+    # Inference micro-batching
+    INFER_BATCHING = os.getenv("AIOS_INFER_BATCHING", "1") == "1"
+    INFER_MAX_BATCH_SIZE = int(os.getenv("AIOS_INFER_MAX_BATCH_SIZE", "8"))
+    INFER_MAX_WAIT_MS = float(os.getenv("AIOS_INFER_MAX_WAIT_MS", "5"))
+
+    # Resident model cache (0 disables the limit)
+    MODEL_CACHE_MAX_BYTES = int(os.getenv("AIOS_MODEL_CACHE_MAX_BYTES", str(2 * 1024**3)))
+    MODEL_CACHE_IDLE_TTL_SECONDS = float(os.getenv("AIOS_MODEL_CACHE_IDLE_TTL_SECONDS", "1800"))
+
+    # Model loading
+    MODEL_PRELOAD = os.getenv("AIOS_MODEL_PRELOAD", "1") == "1"
+    MODEL_LOAD_WAIT_SECONDS = float(os.getenv("AIOS_MODEL_LOAD_WAIT_SECONDS", "30"))
+
+    # Optimized ONNX graphs, reused across restarts
+    ONNX_CACHE_DIR = Path(os.getenv("AIOS_ONNX_CACHE_DIR", str(DATA_DIR / "onnx_cache")))
+
+    # Embedding result cache (disk tier is off unless a directory is set)
+    EMBED_CACHE_ENABLED = os.getenv("AIOS_EMBED_CACHE", "1") == "1"
+    EMBED_CACHE_MAX_BYTES = int(os.getenv("AIOS_EMBED_CACHE_MAX_BYTES", str(64 * 1024**2)))
+    EMBED_CACHE_DISK_DIR = os.getenv("AIOS_EMBED_CACHE_DISK_DIR") or None
+    EMBED_CACHE_DISK_MAX_BYTES = int(os.getenv("AIOS_EMBED_CACHE_DISK_MAX_BYTES", str(1024**3)))
+
+    # Batch embedding (/v1/infer/batch)
+    INFER_BUCKET_SIZE = int(os.getenv("AIOS_INFER_BUCKET_SIZE", "32"))
+    INFER_BATCH_MAX_TEXTS = int(os.getenv("AIOS_INFER_BATCH_MAX_TEXTS", "2048"))
+
+    # Worker pools (workers, then extra queued jobs before 503)
+    # Inference workers mostly wait on the micro-batcher, so keep this
+    # well above the max batch size
+    INFERENCE_POOL_WORKERS = int(os.getenv("AIOS_INFERENCE_POOL_WORKERS", "16"))
+    INFERENCE_POOL_QUEUE = int(os.getenv("AIOS_INFERENCE_POOL_QUEUE", "64"))
+    # One llama.cpp context: generation is serialized anyway
+    LLM_POOL_WORKERS = int(os.getenv("AIOS_LLM_POOL_WORKERS", "1"))
+    LLM_POOL_QUEUE = int(os.getenv("AIOS_LLM_POOL_QUEUE", "8"))
+    COMMAND_POOL_WORKERS = int(os.getenv("AIOS_COMMAND_POOL_WORKERS", "4"))
+    COMMAND_POOL_QUEUE = int(os.getenv("AIOS_COMMAND_POOL_QUEUE", "32"))
+
+    # Command output: kept inline in the task result up to
+    # COMMAND_MAX_INLINE_BYTES per stream, spilled to BLOB_DIR up to
+    # COMMAND_MAX_OUTPUT_BYTES, dropped beyond that
+    COMMAND_MAX_INLINE_BYTES = int(os.getenv("AIOS_COMMAND_MAX_INLINE_BYTES", str(64 * 1024)))
+    COMMAND_MAX_OUTPUT_BYTES = int(os.getenv("AIOS_COMMAND_MAX_OUTPUT_BYTES", str(16 * 1024**2)))
+    BLOB_DIR = Path(os.getenv("AIOS_BLOB_DIR", str(DATA_DIR / "blobs")))
+    # "direct": fork/exec from this process; "server": launch through
+    # the prewarmed spawn server (posix_spawn from a small helper)
+    COMMAND_SPAWNER = os.getenv("AIOS_COMMAND_SPAWNER", "direct")
+
+    # Plan steps run concurrently per plan (1 = sequential)
+    PLAN_MAX_PARALLELISM = int(os.getenv("AIOS_PLAN_MAX_PARALLELISM", "4"))
+
+    # Validated plans reused for repeated goals, skipping the LLM
+    # (0 = no TTL / no size bound)
+    PLAN_CACHE_ENABLED = os.getenv("AIOS_PLAN_CACHE", "1") == "1"
+    PLAN_CACHE_MAX_ENTRIES = int(os.getenv("AIOS_PLAN_CACHE_MAX_ENTRIES", "1000"))
+    PLAN_CACHE_TTL_SECONDS = float(os.getenv("AIOS_PLAN_CACHE_TTL_SECONDS", str(7 * 86400)))
+
+    # Semantic plan index: a new goal whose embedding scores at least
+    # PLAN_INDEX_THRESHOLD (cosine) against a planned goal reuses its plan
+    PLAN_INDEX_ENABLED = os.getenv("AIOS_PLAN_INDEX", "1") == "1"
+    PLAN_INDEX_MODEL = os.getenv("AIOS_PLAN_INDEX_MODEL", "stsb")
+    PLAN_INDEX_THRESHOLD = float(os.getenv("AIOS_PLAN_INDEX_THRESHOLD", "0.92"))
+    PLAN_INDEX_TOP_K = int(os.getenv("AIOS_PLAN_INDEX_TOP_K", "5"))
+    PLAN_INDEX_MAX_ENTRIES = int(os.getenv("AIOS_PLAN_INDEX_MAX_ENTRIES", "100000"))
+    PLAN_INDEX_DIR = Path(os.getenv("AIOS_PLAN_INDEX_DIR", str(DATA_DIR / "plan_index")))
+
+    # Async task queue (mode="async" on /v1/tasks/command)
+    TASK_QUEUE_WORKERS = int(os.getenv("AIOS_TASK_QUEUE_WORKERS", "4"))
+    TASK_QUEUE_MAX = int(os.getenv("AIOS_TASK_QUEUE_MAX", "256"))
+    # Max concurrently running tasks per role, e.g. "user=1,admin=4"
+    TASK_ROLE_LIMITS = os.getenv("AIOS_TASK_ROLE_LIMITS", "user=1,system=2")
+    # Queued task priority is clamped to [-TASK_MAX_PRIORITY, TASK_MAX_PRIORITY]
+    TASK_MAX_PRIORITY = int(os.getenv("AIOS_TASK_MAX_PRIORITY", "10"))
+    # Upper bound for the ?wait= long-poll on /v1/tasks/{id}
+    TASK_MAX_WAIT_SECONDS = float(os.getenv("AIOS_TASK_MAX_WAIT_SECONDS", "30"))
 
     # OpenRouter / Cloud LLM
     OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
@@ -53,5 +167,14 @@ class Config:
             if not cls.OPENROUTER_MODEL:
                 errors.append("OPENROUTER_MODEL is missing")
 
+        if cls.COMMAND_SPAWNER not in ("direct", "server"):
+            errors.append("AIOS_COMMAND_SPAWNER must be 'direct' or 'server'")
+
+        if cls.RETENTION_ACTION not in ("archive", "delete"):
+            errors.append("AIOS_RETENTION_ACTION must be 'archive' or 'delete'")
+
+        if not 0 < cls.PLAN_INDEX_THRESHOLD <= 1:
+            errors.append("AIOS_PLAN_INDEX_THRESHOLD must be in (0, 1]")
+
         if errors:
             raise ConfigError("\n".join(errors))
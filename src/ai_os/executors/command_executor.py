@@ -1,16 +1,110 @@
-import subprocess
+import asyncio
+import threading
 import time
-from typing import List, Dict
+from typing import List, Dict, Optional
 
+from ai_os.config import Config
+from ai_os.persistence.blobs import BlobStore, BlobWriter
+from ai_os.executors.spawner import Spawner, SpawnerError
 from ai_os.observability.logger import get_logger
 
 logger = get_logger("executors.command")
 
+CHUNK_BYTES = 64 * 1024
+
 
 class CommandExecutionError(Exception):
     pass
 
 
+class _StreamCapture:
+    """
+    Incremental capture of one output stream.
+    - The first max_inline_bytes are kept in memory for the task result
+    - Past that, output spills to a blob (when a store is configured)
+    - Past max_bytes nothing more is kept; the stream is still drained
+      so the child never blocks on a full pipe
+    """
+
+    def __init__(self, max_inline_bytes: int, max_bytes: int, blobs: Optional[BlobStore]):
+        self.max_inline_bytes = max_inline_bytes
+        self.max_bytes = max_bytes if blobs else max_inline_bytes
+        self.blobs = blobs
+        self.head = bytearray()
+        self.writer: Optional[BlobWriter] = None
+        self.total = 0
+        self.kept = 0
+
+    def feed(self, chunk: bytes):
+        self.total += len(chunk)
+        room = self.max_bytes - self.kept
+        if room <= 0:
+            return
+        chunk = chunk[:room]
+        self.kept += len(chunk)
+
+        if self.writer is None and len(self.head) + len(chunk) > self.max_inline_bytes:
+            self.writer = self.blobs.open()
+            self.writer.write(bytes(self.head))
+        if self.writer is not None:
+            self.writer.write(chunk)
+
+        inline_room = self.max_inline_bytes - len(self.head)
+        if inline_room > 0:
+            self.head += chunk[:inline_room]
+
+    def abort(self):
+        if self.writer is not None:
+            self.writer.abort()
+            self.writer = None
+
+    def result(self, name: str) -> Dict:
+        text = self.head.decode("utf-8", errors="replace")
+        out = {name: text.strip(), f"{name}_bytes": self.total}
+
+        if self.total > len(self.head):
+            blob_id = self.writer.commit() if self.writer else None
+            where = f"; full output in blob {blob_id}" if blob_id else ""
+            out[name] = (
+                f"{text}\n[truncated: showing {len(self.head)} of {self.total} bytes{where}]"
+            )
+            if blob_id:
+                out[f"{name}_blob"] = blob_id
+            if self.total > self.kept:
+                out[f"{name}_truncated"] = True
+        return out
+
+
+class _IOLoop:
+    """
+    One background event loop that owns every child process's pipes,
+    so any number of worker threads can wait on commands without each
+    running its own loop.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="command-io", daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+
+_io_loop: Optional[_IOLoop] = None
+_io_loop_lock = threading.Lock()
+
+
+def _get_io_loop() -> _IOLoop:
+    global _io_loop
+    with _io_loop_lock:
+        if _io_loop is None:
+            _io_loop = _IOLoop()
+        return _io_loop
+
+
 class CommandExecutor:
     """
     Secure command executor.
@@ -18,6 +112,10 @@ class CommandExecutor:
     - No shell
     - Argument validation
     - Timeout enforced
+    - Output read incrementally with per-stream byte caps; large
+      output spills to the blob store and the result references it
+    - With a Spawner, processes are launched by the spawn server
+      instead of being forked from this process
     """
 
     # Command → allowed args
@@ -29,15 +127,25 @@ class CommandExecutor:
 
     TIMEOUT_SECONDS = 3
 
-    def run(self, command: List[str]) -> Dict:
+    def __init__(
+        self,
+        blob_store: Optional[BlobStore] = None,
+        max_inline_bytes: int = Config.COMMAND_MAX_INLINE_BYTES,
+        max_output_bytes: int = Config.COMMAND_MAX_OUTPUT_BYTES,
+        spawner: Optional[Spawner] = None,
+    ):
+        self.blob_store = blob_store
+        self.spawner = spawner
+        self.max_inline_bytes = max_inline_bytes
+        self.max_output_bytes = max_output_bytes
+
+    def validate(self, command: List[str]):
         if not command or not isinstance(command, list):
             raise CommandExecutionError("Command must be a list")
 
         cmd = command[0]
         args = command[1:]
 
-        logger.info(f"Executing command: {' '.join(command)}")
-
         # Command allow-list
         if cmd not in self.ALLOWED_COMMANDS:
             raise CommandExecutionError(f"Command not allowed: {cmd}")
@@ -49,17 +157,38 @@ class CommandExecutor:
                 f"Arguments not allowed for command: {cmd}"
             )
 
+    def run(self, command: List[str]) -> Dict:
+        """
+        Blocking entry point for worker threads.
+        """
+        return _get_io_loop().run(self.run_async(command))
+
+    async def run_async(self, command: List[str]) -> Dict:
+        self.validate(command)
+        cmd = command[0]
+
+        logger.info(f"Executing command: {' '.join(command)}")
+
         start = time.time()
 
+        proc = await self._start(command)
+        stdout = _StreamCapture(self.max_inline_bytes, self.max_output_bytes, self.blob_store)
+        stderr = _StreamCapture(self.max_inline_bytes, self.max_output_bytes, self.blob_store)
+
         try:
-            completed = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
+            await asyncio.wait_for(
+                asyncio.gather(
+                    self._drain(proc.stdout, stdout),
+                    self._drain(proc.stderr, stderr),
+                    proc.wait(),
+                ),
                 timeout=self.TIMEOUT_SECONDS,
             )
-
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            stdout.abort()
+            stderr.abort()
             logger.warning(f"Command timed out: {' '.join(command)}")
             raise CommandExecutionError("Command execution timed out")
 
@@ -67,13 +196,36 @@ class CommandExecutor:
 
         logger.info(
             f"Command executed | cmd={cmd} | "
-            f"returncode={completed.returncode} | "
+            f"returncode={proc.returncode} | "
+            f"stdout_bytes={stdout.total} | stderr_bytes={stderr.total} | "
             f"duration_ms={int(duration * 1000)}"
         )
 
         return {
-            "stdout": completed.stdout.strip(),
-            "stderr": completed.stderr.strip(),
-            "returncode": completed.returncode,
+            **stdout.result("stdout"),
+            **stderr.result("stderr"),
+            "returncode": proc.returncode,
             "duration_ms": int(duration * 1000),
         }
+
+    async def _start(self, command: List[str]):
+        if self.spawner is not None and self.spawner.alive:
+            try:
+                return await self.spawner.spawn(command)
+            except SpawnerError as e:
+                logger.warning(f"Spawner failed, spawning directly | error={e}")
+
+        return await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+
+    @staticmethod
+    async def _drain(stream: asyncio.StreamReader, capture: _StreamCapture):
+        while True:
+            chunk = await stream.read(CHUNK_BYTES)
+            if not chunk:
+                return
+            capture.feed(chunk)
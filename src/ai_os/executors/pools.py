@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from ai_os.observability.logger import get_logger
+from ai_os.observability.metrics import LatencyStats
+
+logger = get_logger("executors.pools")
+
+
+class PoolSaturatedError(Exception):
+    def __init__(self, pool: str, retry_after: int):
+        super().__init__(f"Worker pool '{pool}' is saturated")
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+class WorkPool:
+    """
+    Bounded thread pool for blocking work called from async handlers.
+    - max_workers jobs run at once
+    - up to max_queue more wait; beyond that submissions are rejected
+      with PoolSaturatedError instead of queueing without bound
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_queue: int,
+        retry_after: int = 1,
+    ):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f"pool-{name}",
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.rejected = 0
+
+        self.queue_wait = LatencyStats()
+        self.run_time = LatencyStats()
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                logger.warning(
+                    f"Pool saturated | pool={self.name} | in_flight={self._in_flight}"
+                )
+                raise PoolSaturatedError(self.name, self.retry_after)
+            self._in_flight += 1
+
+        enqueued = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            self.queue_wait.observe((started - enqueued) * 1000)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.run_time.observe((time.perf_counter() - started) * 1000)
+                # Released by the job itself, so a cancelled awaiter
+                # doesn't free a slot that is still busy
+                with self._lock:
+                    self._in_flight -= 1
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, job)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            in_flight = self._in_flight
+            rejected = self.rejected
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": in_flight,
+            "queued": max(0, in_flight - self.max_workers),
+            "rejected": rejected,
+            "queue_wait": self.queue_wait.snapshot(),
+            "run_time": self.run_time.snapshot(),
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,112 @@
+# Helper process for spawner mode. Keep imports to the stdlib: this runs
+# as a fresh, small interpreter so posix_spawn never has to copy the
+# API process's address space.
+#
+#   python spawn_server.py <socket fd> <allowed command>...
+
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+
+MAX_MESSAGE = 64 * 1024
+
+
+class SpawnServer:
+    """
+    Receives {"op": "spawn", "id", "argv"} with the child's stdout/stderr
+    pipe ends attached (SCM_RIGHTS), posix_spawns the command onto them
+    and reports {"id", "pid"} and later {"id", "returncode"}.
+    {"op": "kill", "id"} SIGKILLs a running child.
+    """
+
+    def __init__(self, sock: socket.socket, allowed: set):
+        self.sock = sock
+        self.allowed = allowed
+        self.pids = {}            # pid -> request id
+        self.ids = {}             # request id -> pid
+        self.lock = threading.Lock()
+        self.send_lock = threading.Lock()
+        self.children = threading.Semaphore(0)
+
+    def send(self, message: dict):
+        # SOCK_SEQPACKET: one send is one message
+        with self.send_lock:
+            self.sock.send(json.dumps(message).encode())
+
+    def serve(self):
+        threading.Thread(target=self.reap, daemon=True).start()
+        while True:
+            try:
+                data, fds, _, _ = socket.recv_fds(self.sock, MAX_MESSAGE, 2)
+            except OSError:
+                return
+            if not data:
+                return  # parent went away
+
+            request = json.loads(data)
+            if request["op"] == "spawn":
+                self.spawn(request, fds)
+            elif request["op"] == "kill":
+                with self.lock:
+                    pid = self.ids.get(request["id"])
+                if pid is not None:
+                    try:
+                        os.kill(pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+
+    def spawn(self, request: dict, fds: list):
+        argv = request["argv"]
+        try:
+            if len(fds) != 2:
+                raise ValueError("expected stdout and stderr descriptors")
+            if not argv or argv[0] not in self.allowed:
+                raise ValueError(f"Command not allowed: {argv[0] if argv else ''}")
+
+            file_actions = [
+                (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+                (os.POSIX_SPAWN_DUP2, fds[0], 1),
+                (os.POSIX_SPAWN_DUP2, fds[1], 2),
+            ]
+            # Held across spawn, registration and the pid reply: the
+            # reaper looks pids up under this lock, so its returncode
+            # message can never overtake the pid message
+            with self.lock:
+                pid = os.posix_spawnp(argv[0], argv, os.environ, file_actions=file_actions)
+                self.pids[pid] = request["id"]
+                self.ids[request["id"]] = pid
+                self.send({"id": request["id"], "pid": pid})
+        except Exception as e:
+            self.send({"id": request["id"], "error": str(e)})
+            return
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+        self.children.release()
+
+    def reap(self):
+        while True:
+            self.children.acquire()
+            pid, status = os.waitpid(-1, 0)
+            with self.lock:
+                request_id = self.pids.pop(pid, None)
+                self.ids.pop(request_id, None)
+            if request_id is not None:
+                self.send({
+                    "id": request_id,
+                    "returncode": os.waitstatus_to_exitcode(status),
+                })
+
+
+def main():
+    fd = int(sys.argv[1])
+    sock = socket.socket(fileno=fd)
+    SpawnServer(sock, set(sys.argv[2:])).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import asyncio
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from ai_os.observability.logger import get_logger
+
+logger = get_logger("executors.spawner")
+
+SERVER_SCRIPT = Path(__file__).with_name("spawn_server.py")
+MAX_MESSAGE = 64 * 1024
+START_TIMEOUT_SECONDS = 5
+
+
+class SpawnerError(Exception):
+    pass
+
+
+class SpawnedProcess:
+    """
+    Child started by the spawn server, shaped like asyncio's Process:
+    stdout/stderr StreamReaders, wait(), kill(), returncode.
+    """
+
+    def __init__(self, spawner: "Spawner", request_id: int, pid: int, exited: Future):
+        self.spawner = spawner
+        self.request_id = request_id
+        self.pid = pid
+        self._exited = exited
+        self.returncode: Optional[int] = None
+        self.stdout: Optional[asyncio.StreamReader] = None
+        self.stderr: Optional[asyncio.StreamReader] = None
+
+    async def wait(self) -> int:
+        self.returncode = await asyncio.wrap_future(self._exited)
+        return self.returncode
+
+    def kill(self):
+        self.spawner._send({"op": "kill", "id": self.request_id})
+
+
+class Spawner:
+    """
+    Client for the spawn server (spawn_server.py).
+    - The server is a fresh, small interpreter, so launching a command
+      never forks the large API process
+    - Output pipes are created here and handed over with SCM_RIGHTS;
+      the command writes straight into them, nothing is relayed
+    - The server reports each child's pid and exit code back
+    """
+
+    def __init__(self, allowed: Iterable[str]):
+        self._sock, server_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self.proc = subprocess.Popen(
+            [sys.executable, str(SERVER_SCRIPT), str(server_sock.fileno()), *allowed],
+            pass_fds=[server_sock.fileno()],
+            stdin=subprocess.DEVNULL,
+        )
+        server_sock.close()
+
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self.alive = True
+        self._closing = False
+
+        self._reader = threading.Thread(target=self._read_loop, name="spawner-reader", daemon=True)
+        self._reader.start()
+
+    def _send(self, message: dict, fds: Optional[List[int]] = None):
+        data = json.dumps(message).encode()
+        with self._send_lock:
+            if fds:
+                socket.send_fds(self._sock, [data], fds)
+            else:
+                self._sock.send(data)
+
+    def _read_loop(self):
+        while True:
+            try:
+                data = self._sock.recv(MAX_MESSAGE)
+            except OSError:
+                data = b""
+            if not data:
+                break
+
+            message = json.loads(data)
+            with self._lock:
+                entry = self._pending.get(message["id"])
+                if entry is not None and ("error" in message or "returncode" in message):
+                    del self._pending[message["id"]]
+            if entry is None:
+                continue
+
+            started, exited = entry
+            if "pid" in message:
+                started.set_result(message["pid"])
+            elif "error" in message:
+                started.set_exception(SpawnerError(message["error"]))
+            else:
+                exited.set_result(message["returncode"])
+
+        self.alive = False
+        if not self._closing:
+            logger.error("Spawn server exited; commands fall back to direct spawning")
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for started, exited in pending.values():
+            for future in (started, exited):
+                if not future.done():
+                    future.set_exception(SpawnerError("Spawn server exited"))
+
+    async def spawn(self, argv: List[str]) -> SpawnedProcess:
+        if not self.alive:
+            raise SpawnerError("Spawn server is not running")
+
+        request_id = next(self._ids)
+        started, exited = Future(), Future()
+        with self._lock:
+            self._pending[request_id] = (started, exited)
+
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        try:
+            self._send({"op": "spawn", "id": request_id, "argv": argv}, [out_w, err_w])
+        except OSError as e:
+            os.close(out_r)
+            os.close(err_r)
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise SpawnerError(str(e))
+        finally:
+            # The server holds its own copies now; EOF arrives once the child exits
+            os.close(out_w)
+            os.close(err_w)
+
+        try:
+            pid = await asyncio.wait_for(asyncio.wrap_future(started), START_TIMEOUT_SECONDS)
+        except BaseException:
+            os.close(out_r)
+            os.close(err_r)
+            # Timed out or cancelled: nobody will wait on this id again,
+            # and a child the server starts late is killed, not orphaned
+            with self._lock:
+                self._pending.pop(request_id, None)
+            try:
+                self._send({"op": "kill", "id": request_id})
+            except OSError:
+                pass
+            raise
+
+        proc = SpawnedProcess(self, request_id, pid, exited)
+        proc.stdout = await _pipe_reader(out_r)
+        proc.stderr = await _pipe_reader(err_r)
+        return proc
+
+    def close(self):
+        self._closing = True
+        self.alive = False
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+async def _pipe_reader(fd: int) -> asyncio.StreamReader:
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(loop=loop)
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader, loop=loop),
+        os.fdopen(fd, "rb", buffering=0),
+    )
+    return reader
+
+
+_spawner: Optional[Spawner] = None
+_spawner_lock = threading.Lock()
+
+
+def get_spawner(allowed: Iterable[str]) -> Spawner:
+    """
+    Process-wide spawner, started on first use. Call it early (before
+    heavy imports) so even the one fork that starts the server is cheap.
+    """
+    global _spawner
+    with _spawner_lock:
+        if _spawner is None or not _spawner.alive:
+            _spawner = Spawner(allowed)
+        return _spawner
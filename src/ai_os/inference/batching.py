@@ -0,0 +1,178 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+from ai_os.observability.logger import get_logger
+from ai_os.observability.metrics import LatencyStats
+
+logger = get_logger("inference.batching")
+
+_STOP = object()
+
+
+class BatcherClosedError(Exception):
+    pass
+
+
+class BatchStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.batch_sizes: Dict[int, int] = {}
+        self.queue_wait = LatencyStats()
+        self.run_time = LatencyStats()
+
+    def record(self, size: int, waits_ms: List[float], run_ms: float):
+        with self._lock:
+            self.batches += 1
+            self.requests += size
+            self.batch_sizes[size] = self.batch_sizes.get(size, 0) + 1
+        for w in waits_ms:
+            self.queue_wait.observe(w)
+        self.run_time.observe(run_ms)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            avg_size = self.requests / self.batches if self.batches else 0.0
+            sizes = dict(sorted(self.batch_sizes.items()))
+            batches = self.batches
+            requests = self.requests
+        return {
+            "batches": batches,
+            "requests": requests,
+            "avg_batch_size": round(avg_size, 3),
+            "batch_size_histogram": sizes,
+            "queue_wait": self.queue_wait.snapshot(),
+            "run_time": self.run_time.snapshot(),
+        }
+
+
+class MicroBatcher:
+    """
+    Dynamic micro-batcher.
+    - Callers block on submit()
+    - One worker thread drains the queue
+    - A batch closes at max_batch_size items or max_wait_ms after
+      its first item was queued, whichever comes first
+    - run_batch receives the items in order and must return one
+      result per item
+    - After close(), submit() raises BatcherClosedError; nothing is
+      ever queued behind the stop marker, and anything left in the
+      queue when the worker exits is failed rather than left waiting
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+    ):
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.stats = BatchStats()
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        # Orders submit() against close(): no item lands after _STOP
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._loop,
+            name=f"batcher-{name}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def submit(self, item: Any) -> Any:
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise BatcherClosedError(f"Batcher '{self.name}' is closed")
+            self._queue.put((item, time.perf_counter(), future))
+        return future.result()
+
+    def close(self, timeout: float | None = None):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # ----------------------------
+    # Worker
+    # ----------------------------
+    def _collect(self, first) -> tuple[list, bool]:
+        batch = [first]
+        deadline = first[1] + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    entry = self._queue.get(timeout=remaining)
+                else:
+                    # Deadline passed: still take whatever is already queued
+                    entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if entry is _STOP:
+                return batch, True
+            batch.append(entry)
+
+        return batch, False
+
+    def _loop(self):
+        try:
+            while True:
+                first = self._queue.get()
+                if first is _STOP:
+                    return
+
+                batch, stop = self._collect(first)
+                self._run(batch)
+
+                if stop:
+                    return
+        finally:
+            self._fail_queued()
+
+    def _fail_queued(self):
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if entry is not _STOP:
+                entry[2].set_exception(
+                    BatcherClosedError(f"Batcher '{self.name}' is closed")
+                )
+
+    def _run(self, batch: list):
+        start = time.perf_counter()
+        waits_ms = [(start - enqueued) * 1000 for _, enqueued, _ in batch]
+
+        try:
+            results = self.run_batch([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"run_batch returned {len(results)} results "
+                    f"for {len(batch)} items"
+                )
+        except Exception as e:
+            logger.error(f"Batch failed | batcher={self.name} | size={len(batch)} | error={e}")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        run_ms = (time.perf_counter() - start) * 1000
+        self.stats.record(len(batch), waits_ms, run_ms)
+
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
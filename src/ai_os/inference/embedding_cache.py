@@ -0,0 +1,151 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from ai_os.observability.logger import get_logger
+
+logger = get_logger("inference.embedding_cache")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    # Case is preserved: cased tokenizers embed "Apple" and "apple" differently
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def cache_key(model: str, fingerprint: str, config: str, text: str) -> str:
+    """
+    Content address of one embedding.
+    The model file fingerprint is part of the key, so replacing a model
+    file invalidates its entries without any explicit purge.
+    """
+    raw = "\x1f".join((model, fingerprint, config, normalize_text(text)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache of (vector, truncated) pairs.
+    - Memory: LRU bounded by total vector bytes
+    - Disk (optional): diskcache with its own size limit
+    Disk hits are promoted to memory.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_dir: Optional[Path] = None,
+        disk_max_bytes: int = 0,
+    ):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, bool]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.disk = None
+        if disk_dir:
+            try:
+                import diskcache
+            except ImportError:
+                logger.warning("diskcache not installed; disk tier disabled")
+            else:
+                self.disk = diskcache.Cache(
+                    str(disk_dir),
+                    size_limit=disk_max_bytes,
+                    eviction_policy="least-recently-used",
+                )
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, bool]]:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return hit
+
+        if self.disk is not None:
+            raw = self.disk.get(key)
+            if raw is not None:
+                # First byte is the truncated flag, then float32 data
+                vec = np.frombuffer(raw, dtype=np.float32, offset=1).copy()
+                truncated = raw[0] == 1
+                self._put_memory(key, vec, truncated)
+                with self._lock:
+                    self.disk_hits += 1
+                return vec, truncated
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    # ----------------------------
+    # Store
+    # ----------------------------
+    def put(self, key: str, vec: np.ndarray, truncated: bool = False):
+        # Copy so a cached row never pins the whole batch matrix
+        vec = np.array(vec, dtype=np.float32)
+        self._put_memory(key, vec, truncated)
+        if self.disk is not None:
+            self.disk.set(key, bytes([int(truncated)]) + vec.tobytes())
+
+    def _put_memory(self, key: str, vec: np.ndarray, truncated: bool):
+        if vec.nbytes > self.max_bytes:
+            return
+
+        # Shared between callers, so never mutable
+        vec.flags.writeable = False
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[0].nbytes
+
+            self._entries[key] = (vec, truncated)
+            self._bytes += vec.nbytes
+
+            while self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "disk_enabled": self.disk is not None,
+            }
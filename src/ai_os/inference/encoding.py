@@ -0,0 +1,44 @@
+import base64
+
+import numpy as np
+
+
+# Response encodings for embedding vectors
+FLOAT = "float"            # JSON list of floats
+BASE64 = "base64"          # little-endian float32 bytes, base64
+BASE64_F16 = "base64_f16"  # little-endian float16 bytes, base64
+BINARY = "binary"          # raw float32 bytes, application/octet-stream
+
+ENCODINGS = (FLOAT, BASE64, BASE64_F16, BINARY)
+
+OCTET_STREAM = "application/octet-stream"
+
+
+class EncodingError(Exception):
+    pass
+
+
+def _dtype_for(encoding: str) -> np.dtype:
+    return np.dtype("<f2") if encoding == BASE64_F16 else np.dtype("<f4")
+
+
+def to_bytes(embeddings: np.ndarray, encoding: str = BINARY) -> bytes:
+    return np.ascontiguousarray(embeddings, dtype=_dtype_for(encoding)).tobytes()
+
+
+def encode_embeddings(embeddings: np.ndarray, encoding: str):
+    """
+    Encodes a (n, dim) matrix for a JSON response.
+    BINARY is not JSON-encodable; use to_bytes() for it.
+    """
+    if encoding == FLOAT:
+        return embeddings.tolist()
+
+    if encoding in (BASE64, BASE64_F16):
+        return {
+            "dtype": _dtype_for(encoding).name,
+            "shape": list(embeddings.shape),
+            "data": base64.b64encode(to_bytes(embeddings, encoding)).decode("ascii"),
+        }
+
+    raise EncodingError(f"Unsupported encoding: {encoding}")
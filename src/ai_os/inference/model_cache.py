@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from ai_os.observability.logger import get_logger
+
+logger = get_logger("inference.model_cache")
+
+
+class CachedModel:
+    def __init__(
+        self,
+        name: str,
+        session: Any,
+        tokenizer: Any,
+        size_bytes: int,
+        pinned: bool = False,
+    ):
+        self.name = name
+        self.session = session
+        self.tokenizer = tokenizer
+        self.size_bytes = size_bytes
+        self.pinned = pinned
+        # Path and content hash of the loaded model file
+        self.model_path = ""
+        self.fingerprint = ""
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+
+    def info(self) -> Dict:
+        return {
+            "name": self.name,
+            "size_bytes": self.size_bytes,
+            "pinned": self.pinned,
+            "loaded_at": self.loaded_at,
+            "last_used": self.last_used,
+            "idle_seconds": round(time.time() - self.last_used, 3),
+        }
+
+
+class ModelCache:
+    """
+    Resident model sessions.
+    - LRU order, most recently used last
+    - Evicts unpinned models when the memory budget is exceeded
+    - Evicts unpinned models idle for longer than idle_ttl_seconds
+    - max_bytes / idle_ttl_seconds <= 0 disable the respective limit
+    - evictions counts models dropped by the budget or idle TTL;
+      explicit unload() calls are counted separately in unloads
+    """
+
+    def __init__(self, max_bytes: int = 0, idle_ttl_seconds: float = 0):
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl_seconds
+
+        self._entries: "OrderedDict[str, CachedModel]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self.unloads = 0
+
+        self._stop = threading.Event()
+        self._janitor: Optional[threading.Thread] = None
+        if self.idle_ttl > 0:
+            self._janitor = threading.Thread(
+                target=self._janitor_loop,
+                name="model-cache-janitor",
+                daemon=True,
+            )
+            self._janitor.start()
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+    def get(self, name: str) -> Optional[CachedModel]:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            entry.last_used = time.time()
+            self._entries.move_to_end(name)
+            return entry
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._entries
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(e.size_bytes for e in self._entries.values())
+
+    def entries(self) -> List[Dict]:
+        with self._lock:
+            return [e.info() for e in self._entries.values()]
+
+    # ----------------------------
+    # Mutation
+    # ----------------------------
+    def put(self, entry: CachedModel):
+        with self._lock:
+            self._entries[entry.name] = entry
+            self._entries.move_to_end(entry.name)
+            self._enforce_budget(keep=entry.name)
+
+    def evict(self, name: str) -> bool:
+        return self._remove(name, "evicted")
+
+    def unload(self, name: str) -> bool:
+        return self._remove(name, "unloaded")
+
+    def _remove(self, name: str, reason: str) -> bool:
+        with self._lock:
+            entry = self._entries.pop(name, None)
+            if entry is None:
+                return False
+            if reason == "evicted":
+                self.evictions += 1
+            else:
+                self.unloads += 1
+
+        logger.info(
+            f"Model {reason} | model={name} | size_bytes={entry.size_bytes}"
+        )
+        return True
+
+    def set_pinned(self, name: str, pinned: bool) -> bool:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return False
+            entry.pinned = pinned
+            if not pinned:
+                self._enforce_budget()
+            return True
+
+    def sweep_idle(self) -> List[str]:
+        if self.idle_ttl <= 0:
+            return []
+
+        cutoff = time.time() - self.idle_ttl
+        with self._lock:
+            expired = [
+                e.name for e in self._entries.values()
+                if not e.pinned and e.last_used < cutoff
+            ]
+        for name in expired:
+            self.evict(name)
+        return expired
+
+    def _enforce_budget(self, keep: Optional[str] = None):
+        if self.max_bytes <= 0:
+            return
+
+        # Oldest first; never evict pinned models or the one just loaded
+        for name in list(self._entries.keys()):
+            if self.total_bytes() <= self.max_bytes:
+                return
+            entry = self._entries[name]
+            if entry.pinned or name == keep:
+                continue
+            self.evict(name)
+
+        if self.total_bytes() > self.max_bytes:
+            logger.warning(
+                f"Model cache over budget | used={self.total_bytes()} | "
+                f"budget={self.max_bytes}"
+            )
+
+    # ----------------------------
+    # Background idle eviction
+    # ----------------------------
+    def _janitor_loop(self):
+        interval = max(1.0, self.idle_ttl / 2)
+        while not self._stop.wait(interval):
+            self.sweep_idle()
+
+    def close(self):
+        self._stop.set()
@@ -0,0 +1,83 @@
+import numpy as np
+
+
+POOLING_STRATEGIES = ("mean", "cls", "max")
+
+
+class PoolingError(Exception):
+    pass
+
+
+def pool(
+    hidden: np.ndarray,
+    attention_mask: np.ndarray,
+    strategy: str = "mean",
+    normalize: bool = False,
+) -> np.ndarray:
+    """
+    Pools a (batch, seq, dim) hidden-state tensor into (batch, dim).
+    - mean: average over non-pad positions only
+    - cls:  first token
+    - max:  element-wise max over non-pad positions
+    Models that already output (batch, dim) are passed through.
+    """
+    if hidden.ndim == 2:
+        pooled = hidden
+    elif strategy == "mean":
+        mask = attention_mask[:, :, None].astype(hidden.dtype)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled = (hidden * mask).sum(axis=1) / counts
+    elif strategy == "cls":
+        pooled = hidden[:, 0]
+    elif strategy == "max":
+        mask = attention_mask[:, :, None].astype(bool)
+        pooled = np.where(mask, hidden, -np.inf).max(axis=1)
+    else:
+        raise PoolingError(f"Unknown pooling strategy: {strategy}")
+
+    pooled = pooled.astype(np.float32, copy=False)
+
+    if normalize:
+        pooled = l2_normalize(pooled)
+
+    return pooled
+
+
+def l2_normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.clip(norms, 1e-12, None)
+
+
+def combine_chunks(
+    pooled: np.ndarray,
+    owners: np.ndarray,
+    lengths: np.ndarray,
+    count: int,
+    strategy: str = "mean",
+) -> np.ndarray:
+    """
+    Folds per-window rows (sliding-window mode) back into one row per
+    text. owners[i] is the text index of row i, in ascending order.
+    - mean: token-count weighted mean of the window means
+    - cls:  first window
+    - max:  element-wise max over windows
+    """
+    if len(owners) == count:
+        return pooled
+
+    dim = pooled.shape[1]
+
+    if strategy == "cls":
+        _, first = np.unique(owners, return_index=True)
+        return pooled[first]
+
+    if strategy == "max":
+        out = np.full((count, dim), -np.inf, dtype=np.float32)
+        np.maximum.at(out, owners, pooled)
+        return out
+
+    weights = lengths.astype(np.float32)
+    out = np.zeros((count, dim), dtype=np.float32)
+    np.add.at(out, owners, pooled * weights[:, None])
+    totals = np.bincount(owners, weights=weights, minlength=count)
+    return out / np.clip(totals, 1e-9, None)[:, None].astype(np.float32)
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from ai_os.observability.logger import get_logger
+
+logger = get_logger("inference.quantization")
+
+PRECISIONS = ("fp32", "int8")
+
+# Used by the accuracy check when no sample file is given
+SAMPLE_TEXTS = [
+    "list the files in this directory",
+    "what is the current working directory",
+    "A man is playing a guitar.",
+    "A woman is slicing an onion.",
+    "The cat sat on the mat.",
+    "Stocks fell sharply after the earnings report.",
+    "How do I reset my password?",
+    "The weather tomorrow will be sunny with light winds.",
+    "Quantization trades a little accuracy for lower latency.",
+    "echo hello world",
+]
+
+
+class QuantizationError(Exception):
+    pass
+
+
+def quantized_path(cache_dir: Path, model_path: str) -> Path:
+    """
+    Cache file for the int8 variant.
+    Keyed on the source file (size + mtime) so a changed fp32 model
+    is re-quantized instead of serving a stale variant.
+    """
+    stat = os.stat(model_path)
+    key = f"{os.path.abspath(model_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    stem = Path(model_path).stem
+    return cache_dir / "quantized" / f"{stem}-{digest}.int8.onnx"
+
+
+def quantize_model(model_path: str, cache_dir: Path, force: bool = False) -> Path:
+    """
+    Produces (or reuses) a dynamically quantized INT8 copy of model_path.
+    Weights are stored as int8; activations are quantized at runtime.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    out = quantized_path(cache_dir, model_path)
+    if out.exists() and not force:
+        return out
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(".tmp")
+
+    logger.info(f"Quantizing model | src={model_path} | dst={out}")
+    start = time.time()
+
+    try:
+        quantize_dynamic(
+            model_input=model_path,
+            model_output=str(tmp),
+            weight_type=QuantType.QInt8,
+        )
+    except Exception as e:
+        tmp.unlink(missing_ok=True)
+        raise QuantizationError(f"Quantization failed: {e}")
+
+    # Atomic publish so a concurrent loader never sees a partial file
+    os.replace(tmp, out)
+
+    logger.info(
+        f"Model quantized | dst={out} | "
+        f"duration_ms={int((time.time() - start) * 1000)}"
+    )
+    return out
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    return (a * b).sum(axis=1)
+
+
+def _time_ms(fn, runs: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def evaluate(manager, name: str, texts: List[str] | None = None, runs: int = 20) -> Dict:
+    """
+    Compares the int8 variant of a registered model against fp32:
+    per-text cosine similarity of the embeddings and mean batch latency.
+    """
+    texts = texts or SAMPLE_TEXTS
+
+    fp32 = manager.build_variant(name, "fp32")
+    int8 = manager.build_variant(name, "int8")
+
+    ref = manager.embed_with(name, fp32, texts)
+    quant = manager.embed_with(name, int8, texts)
+    cos = _cosine(ref, quant)
+
+    fp32_ms = _time_ms(lambda: manager.embed_with(name, fp32, texts), runs)
+    int8_ms = _time_ms(lambda: manager.embed_with(name, int8, texts), runs)
+
+    return {
+        "model": name,
+        "samples": len(texts),
+        "cosine": {
+            "mean": round(float(cos.mean()), 6),
+            "min": round(float(cos.min()), 6),
+        },
+        "latency_ms": {
+            "fp32": round(fp32_ms, 3),
+            "int8": round(int8_ms, 3),
+            "speedup": round(fp32_ms / int8_ms, 3) if int8_ms else None,
+        },
+        "size_bytes": {
+            "fp32": fp32.size_bytes,
+            "int8": int8.size_bytes,
+        },
+    }
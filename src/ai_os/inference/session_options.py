@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import onnxruntime as ort
+
+from ai_os.config import ConfigError
+from ai_os.observability.logger import get_logger
+
+logger = get_logger("inference.session_options")
+
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+EXECUTION_MODES = {
+    "sequential": ort.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": ort.ExecutionMode.ORT_PARALLEL,
+}
+
+PROFILE_KEYS = {
+    "intra_op_num_threads",
+    "inter_op_num_threads",
+    "graph_optimization_level",
+    "execution_mode",
+    "enable_cpu_mem_arena",
+    "enable_mem_pattern",
+    "cache_optimized",
+}
+
+
+def resolve_providers(name: str, device: str) -> List[str]:
+    if device != "cuda":
+        return ["CPUExecutionProvider"]
+
+    if "CUDAExecutionProvider" not in ort.get_available_providers():
+        logger.warning(
+            f"Model '{name}' requests cuda but CUDAExecutionProvider is "
+            f"not available; running on CPU"
+        )
+        return ["CPUExecutionProvider"]
+
+    return ["CUDAExecutionProvider", "CPUExecutionProvider"]
+
+
+def resolve_profile(
+    name: str,
+    cfg: Dict,
+    profiles: Dict[str, Dict],
+) -> Dict:
+    """
+    Merges the named profile (session_profile) with per-model
+    overrides (session). Unknown keys are rejected so typos
+    don't silently fall back to defaults.
+    """
+    profile = {}
+
+    profile_name = cfg.get("session_profile")
+    if profile_name:
+        if profile_name not in profiles:
+            raise ConfigError(
+                f"Model '{name}' uses unknown session profile '{profile_name}'"
+            )
+        profile.update(profiles[profile_name])
+
+    profile.update(cfg.get("session", {}))
+
+    unknown = set(profile) - PROFILE_KEYS
+    if unknown:
+        raise ConfigError(
+            f"Model '{name}' has unknown session options: {sorted(unknown)}"
+        )
+
+    return profile
+
+
+def build_session_options(profile: Dict) -> ort.SessionOptions:
+    so = ort.SessionOptions()
+
+    if "intra_op_num_threads" in profile:
+        so.intra_op_num_threads = int(profile["intra_op_num_threads"])
+    if "inter_op_num_threads" in profile:
+        so.inter_op_num_threads = int(profile["inter_op_num_threads"])
+
+    level = profile.get("graph_optimization_level", "all")
+    if level not in GRAPH_OPTIMIZATION_LEVELS:
+        raise ConfigError(f"Unknown graph_optimization_level: {level}")
+    so.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[level]
+
+    mode = profile.get("execution_mode", "sequential")
+    if mode not in EXECUTION_MODES:
+        raise ConfigError(f"Unknown execution_mode: {mode}")
+    so.execution_mode = EXECUTION_MODES[mode]
+
+    if "enable_cpu_mem_arena" in profile:
+        so.enable_cpu_mem_arena = bool(profile["enable_cpu_mem_arena"])
+    if "enable_mem_pattern" in profile:
+        so.enable_mem_pattern = bool(profile["enable_mem_pattern"])
+
+    return so
+
+
+def optimized_model_path(
+    cache_dir: Path,
+    name: str,
+    model_path: str,
+    profile: Dict,
+    providers: List[str],
+) -> Path:
+    """
+    Cache file for the optimized graph.
+    Keyed on the source file (size + mtime), the graph optimization
+    level and the providers, since optimized graphs are provider specific.
+    """
+    stat = os.stat(model_path)
+    key = json.dumps(
+        {
+            "path": os.path.abspath(model_path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "level": profile.get("graph_optimization_level", "all"),
+            "providers": providers,
+            "ort": ort.__version__,
+        },
+        sort_keys=True,
+    )
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return cache_dir / f"{name}-{digest}.opt.onnx"
+
+
+def create_session(
+    name: str,
+    model_path: str,
+    providers: List[str],
+    profile: Dict,
+    cache_dir: Optional[Path] = None,
+) -> ort.InferenceSession:
+    so = build_session_options(profile)
+
+    if cache_dir is None or not profile.get("cache_optimized", True):
+        return ort.InferenceSession(model_path, so, providers=providers)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cached = optimized_model_path(cache_dir, name, model_path, profile, providers)
+
+    if cached.exists():
+        # Already optimized: skip re-running the graph transformers
+        so.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS["disable"]
+        try:
+            return ort.InferenceSession(str(cached), so, providers=providers)
+        except Exception as e:
+            logger.warning(
+                f"Optimized graph for '{name}' is unreadable, rebuilding | "
+                f"path={cached} | error={e}"
+            )
+            cached.unlink(missing_ok=True)
+            so = build_session_options(profile)
+
+    # Written beside the cache file and renamed into place, so a crash
+    # or a concurrent build never leaves a truncated file under its name
+    tmp = cached.with_name(f"{cached.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    so.optimized_model_filepath = str(tmp)
+    try:
+        session = ort.InferenceSession(model_path, so, providers=providers)
+        os.replace(tmp, cached)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return session
@@ -0,0 +1,130 @@
+import threading
+from typing import Dict, List
+
+import numpy as np
+
+from ai_os.config import ConfigError
+
+TRUNCATION_MODES = ("truncate", "sliding_window")
+
+
+class TokenizedBatch:
+    """
+    Unpadded token rows for a list of texts.
+    In sliding-window mode one text can own several rows;
+    owners maps each row back to its text.
+    """
+
+    def __init__(self, ids, type_ids, owners, truncated, count):
+        self.ids: List[List[int]] = ids
+        self.type_ids: List[List[int]] = type_ids
+        self.owners = np.asarray(owners, dtype=np.int64)
+        self.truncated = np.asarray(truncated, dtype=bool)
+        self.count = count
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.fromiter((len(r) for r in self.ids), dtype=np.int64, count=len(self.ids))
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class FastTokenizer:
+    """
+    Batch tokenization on the Rust `tokenizers` backend.
+    - encode_batch releases the GIL and runs in parallel
+    - truncation is reported per text instead of silently applied
+    - sliding_window keeps up to max_chunks overlapping windows per text
+    - padded int64 inputs are written into per-thread reusable buffers
+    """
+
+    def __init__(
+        self,
+        hf_tokenizer,
+        max_length: int,
+        mode: str = "truncate",
+        stride: int = 0,
+        max_chunks: int = 1,
+    ):
+        if mode not in TRUNCATION_MODES:
+            raise ConfigError(f"Unknown truncation mode: {mode}")
+
+        backend = getattr(hf_tokenizer, "backend_tokenizer", None)
+        if backend is None:
+            raise ConfigError(
+                f"{type(hf_tokenizer).__name__} has no Rust backend; "
+                f"a fast tokenizer is required"
+            )
+
+        from tokenizers import Tokenizer
+
+        # Private copy: truncation/padding settings are per-tokenizer state
+        self._tok = Tokenizer.from_str(backend.to_str())
+        self._tok.no_padding()
+
+        self.sliding = mode == "sliding_window"
+        self.max_chunks = max(1, max_chunks) if self.sliding else 1
+        self._tok.enable_truncation(
+            max_length,
+            stride=stride if self.sliding else 0,
+        )
+
+        self.pad_id = hf_tokenizer.pad_token_id or 0
+        self._local = threading.local()
+
+    def encode(self, texts: List[str]) -> TokenizedBatch:
+        ids, type_ids, owners, truncated = [], [], [], []
+
+        for i, enc in enumerate(self._tok.encode_batch(texts)):
+            windows = [enc]
+            if self.sliding:
+                windows += enc.overflowing
+
+            kept = windows[:self.max_chunks]
+            truncated.append(len(enc.overflowing) + 1 > len(kept))
+
+            for w in kept:
+                ids.append(w.ids)
+                type_ids.append(w.type_ids)
+                owners.append(i)
+
+        return TokenizedBatch(ids, type_ids, owners, truncated, len(texts))
+
+    def _buffer(self, size: int) -> np.ndarray:
+        buf = getattr(self._local, "buf", None)
+        if buf is None or buf.shape[1] < size:
+            buf = np.empty((3, size), dtype=np.int64)
+            self._local.buf = buf
+        return buf
+
+    def pad(self, batch: TokenizedBatch, rows: List[int]) -> Dict[str, np.ndarray]:
+        """
+        Pads the selected rows to the longest one among them.
+        The returned arrays are views into a buffer owned by the calling
+        thread and are overwritten by its next pad() call.
+        """
+        width = max(len(batch.ids[r]) for r in rows)
+        size = len(rows) * width
+
+        # Flat slices reshaped, so each view stays C-contiguous
+        buf = self._buffer(size)
+        input_ids = buf[0, :size].reshape(len(rows), width)
+        attention_mask = buf[1, :size].reshape(len(rows), width)
+        token_type_ids = buf[2, :size].reshape(len(rows), width)
+
+        input_ids.fill(self.pad_id)
+        attention_mask.fill(0)
+        token_type_ids.fill(0)
+
+        for j, r in enumerate(rows):
+            n = len(batch.ids[r])
+            input_ids[j, :n] = batch.ids[r]
+            attention_mask[j, :n] = 1
+            token_type_ids[j, :n] = batch.type_ids[r]
+
+        return {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "token_type_ids": token_type_ids,
+        }
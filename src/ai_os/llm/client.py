@@ -1,3 +1,6 @@
+import json
+from typing import Iterator
+
 import httpx
 from ai_os.config import Config , ConfigError
 
@@ -13,13 +16,14 @@ class CloudLLMClient:
         self.base_url = base_url
         self.model = model
 
-    def generate(self, prompt: str) -> str:
-        headers = {
+    def _headers(self) -> dict:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
 
-        payload = {
+    def _payload(self, prompt: str) -> dict:
+        return {
             "model": self.model,
             "messages": [
                 {
@@ -39,10 +43,11 @@ class CloudLLMClient:
             "max_tokens": 512,
         }
 
+    def generate(self, prompt: str) -> str:
         response = httpx.post(
             f"{self.base_url}/chat/completions",
-            headers=headers,
-            json=payload,
+            headers=self._headers(),
+            json=self._payload(prompt),
             timeout=15.0,
         )
 
@@ -51,3 +56,30 @@ class CloudLLMClient:
         data = response.json()
 
         return data["choices"][0]["message"]["content"]
+
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Yields content deltas as they arrive (SSE). Closing the iterator
+        closes the connection, which ends generation upstream.
+        """
+        payload = {**self._payload(prompt), "stream": True}
+
+        with httpx.stream(
+            "POST",
+            f"{self.base_url}/chat/completions",
+            headers=self._headers(),
+            json=payload,
+            timeout=15.0,
+        ) as response:
+            response.raise_for_status()
+
+            for line in response.iter_lines():
+                # Skips keep-alive comments (": ...") and blank lines
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    return
+                delta = json.loads(data)["choices"][0].get("delta") or {}
+                if delta.get("content"):
+                    yield delta["content"]
@@ -1,25 +1,182 @@
-from llama_cpp import Llama
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import llama_cpp
+import numpy as np
+from llama_cpp import Llama, LlamaGrammar, LlamaState
+
+from ai_os.observability.logger import get_logger
+
+logger = get_logger("llm.local")
+
 
 class LocalLLMClient:
     def __init__(self , model_path : str):
         if not model_path:
             raise RuntimeError("LOCAL_LLM_PATH not configured")
+        self.model_path = model_path
         self.llm = Llama(
             model_path=model_path,
             n_ctx=2048,
             n_threads=8,
             verbose=False
         )
-    
-    def generate(self, prompt:str) -> str:
-        output = self.llm(
-            prompt,
-            max_tokens=512,
-            temperature=0.0,
-            top_p=1.0,
-            stop=["\n\n", "</s>"],
+        # llama.cpp contexts are not thread-safe
+        self._lock = threading.Lock()
+        # (text, tokens, state) of the warmed prompt prefix
+        self._prefix = None
+
+    # ----------------------------
+    # Prompt prefix KV cache
+    # ----------------------------
+    def warm_prefix(self, prefix: str, state_dir: Optional[Path] = None):
+        """
+        Evaluates a fixed prompt prefix once and keeps its KV state, so
+        prompts that start with it only evaluate the remainder.
+        With state_dir, the state is saved there and loaded on the next
+        start instead of being evaluated again.
+        """
+        tokens = self.llm.tokenize(prefix.encode("utf-8"), add_bos=True)
+        path = Path(state_dir) / f"{self._state_key(prefix)}.npz" if state_dir else None
+
+        with self._lock:
+            state = self._read_state(path, tokens) if path else None
+            if state is not None:
+                self.llm.load_state(state)
+                source = "file"
+            else:
+                self.llm.reset()
+                self.llm.eval(tokens)
+                state = self.llm.save_state()
+                # Only the logits after the last prefix token can matter
+                # (and they are recomputed once the goal is appended);
+                # load_state broadcasts this row
+                state.scores = state.scores[-1:].copy()
+                if path:
+                    self._write_state(path, state)
+                source = "eval"
+            self._prefix = (prefix, tokens, state)
+
+        logger.info(
+            f"Prompt prefix cached | tokens={len(tokens)} | "
+            f"state_bytes={state.llama_state_size} | source={source}"
         )
 
-        return output["choices"][0]["text"].strip()
+    def _state_key(self, prefix: str) -> str:
+        # Any change to the model file, context size, library or prefix
+        # makes a saved state unusable
+        stat = os.stat(self.model_path)
+        raw = "\x1f".join((
+            os.path.realpath(self.model_path), str(stat.st_size), str(stat.st_mtime_ns),
+            str(self.llm.n_ctx()), llama_cpp.__version__, prefix,
+        ))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def _read_state(path: Path, tokens: List[int]) -> Optional[LlamaState]:
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                state = LlamaState(
+                    input_ids=data["input_ids"],
+                    scores=data["scores"],
+                    n_tokens=int(data["n_tokens"]),
+                    llama_state=data["llama_state"].tobytes(),
+                    llama_state_size=int(data["llama_state"].size),
+                    seed=int(data["seed"]),
+                )
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable prefix state {path}: {e}")
+            return None
+        if state.input_ids[: len(tokens)].tolist() != tokens:
+            return None
+        return state
 
+    @staticmethod
+    def _write_state(path: Path, state: LlamaState):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp,
+            input_ids=state.input_ids,
+            scores=state.scores,
+            n_tokens=state.n_tokens,
+            llama_state=np.frombuffer(state.llama_state, dtype=np.uint8),
+            seed=state.seed,
+        )
+        os.replace(tmp, path)
+
+    def _prompt_tokens(self, prompt: str):
+        """
+        Prompts starting with the warmed prefix are passed as tokens
+        that start with exactly the cached ones; llama.cpp then only
+        evaluates what follows the longest match. If other prompts have
+        moved the context on since, the prefix state is restored first.
+        """
+        if self._prefix is None or not prompt.startswith(self._prefix[0]):
+            return prompt
+
+        text, tokens, state = self._prefix
+        n = len(tokens)
+        full = self.llm.tokenize(prompt.encode("utf-8"), add_bos=True)
+        if full[:n] != tokens:
+            # A token straddles the boundary: split there instead
+            full = tokens + self.llm.tokenize(prompt[len(text):].encode("utf-8"), add_bos=False)
+
+        if self.llm.n_tokens < n or self.llm.input_ids[:n].tolist() != tokens:
+            self.llm.load_state(state)
+        return full
+
+    # ----------------------------
+    # Generation
+    # ----------------------------
+    def _completion_args(self, json_schema: Optional[dict]) -> dict:
+        args = {
+            "max_tokens": 512,
+            "temperature": 0.0,
+            "top_p": 1.0,
+            "stop": ["\n\n", "</s>"],
+        }
+        if json_schema is not None:
+            # Schema -> GBNF is a fraction of a millisecond, so
+            # per-request schemas are fine
+            args["grammar"] = LlamaGrammar.from_json_schema(
+                json.dumps(json_schema), verbose=False
+            )
+            # The grammar ends the output at the closing brace; a blank
+            # line inside the JSON must not stop it early
+            args["stop"] = ["</s>"]
+        return args
+
+    def generate(self, prompt:str, json_schema: Optional[dict] = None) -> str:
+        """
+        With json_schema, sampling is constrained by a GBNF grammar built
+        from it: the output is always JSON of that shape, unless
+        max_tokens cuts it off.
+        """
+        args = self._completion_args(json_schema)
+        with self._lock:
+            output = self.llm(self._prompt_tokens(prompt), **args)
+
+        return output["choices"][0]["text"].strip()
 
+    def generate_stream(self, prompt: str, json_schema: Optional[dict] = None) -> Iterator[str]:
+        """
+        Same as generate(), yielding text as it is sampled. Closing the
+        iterator stops generation; the context stays locked until then.
+        """
+        args = self._completion_args(json_schema)
+        with self._lock:
+            stream = self.llm(self._prompt_tokens(prompt), stream=True, **args)
+            try:
+                for chunk in stream:
+                    text = chunk["choices"][0]["text"]
+                    if text:
+                        yield text
+            finally:
+                stream.close()
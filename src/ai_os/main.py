@@ -2,9 +2,17 @@
 
 import logging
 import uvicorn
+from ai_os.config import Config , ConfigError
+from ai_os.executors.command_executor import CommandExecutor
+from ai_os.executors.spawner import get_spawner
+
+# Start the spawn server while this process is still small: torch,
+# onnxruntime and llama.cpp are only mapped by the imports below
+if Config.COMMAND_SPAWNER == "server":
+    get_spawner(CommandExecutor.ALLOWED_COMMANDS)
+
 from ai_os.api import create_app
 from ai_os.persistence.schema import init_db
-from ai_os.config import Config , ConfigError
 from ai_os.observability.logger import get_logger
 
 try:
@@ -1,93 +1,583 @@
+import hashlib
 import os
+import threading
+import time
 import yaml
 import logging
-import onnxruntime as ort
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import numpy as np
 from transformers import AutoTokenizer
 from ai_os.config import Config as settings
 from ai_os.config import ConfigError
+from ai_os.inference.batching import MicroBatcher
+from ai_os.inference.embedding_cache import EmbeddingCache, cache_key
+from ai_os.inference.model_cache import CachedModel, ModelCache
+from ai_os.inference.pooling import (
+    POOLING_STRATEGIES,
+    combine_chunks,
+    l2_normalize,
+    pool,
+)
+from ai_os.inference.quantization import PRECISIONS, quantize_model
+from ai_os.inference.tokenization import FastTokenizer
+from ai_os.inference.session_options import (
+    create_session,
+    resolve_profile,
+    resolve_providers,
+)
 
 logger = logging.getLogger(__name__)
 
 
+class ModelLoadingError(Exception):
+    """
+    Raised when a caller gave up waiting for a model that is still loading.
+    """
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"Model '{name}' is still loading")
+        self.retry_after = retry_after
+
+
 class ModelManager:
     def __init__(self, registry_path="config/model_registry.yaml"):
         self.registry_path = registry_path
-        self.registry = self._load_registry()
+        self.registry, self.session_profiles = self._load_registry()
+
+        self.cache = ModelCache(
+            max_bytes=settings.MODEL_CACHE_MAX_BYTES,
+            idle_ttl_seconds=settings.MODEL_CACHE_IDLE_TTL_SECONDS,
+        )
+
+        self.embedding_cache = None
+        if settings.EMBED_CACHE_ENABLED:
+            self.embedding_cache = EmbeddingCache(
+                max_bytes=settings.EMBED_CACHE_MAX_BYTES,
+                disk_dir=settings.EMBED_CACHE_DISK_DIR,
+                disk_max_bytes=settings.EMBED_CACHE_DISK_MAX_BYTES,
+            )
 
-        self.sessions = {}
-        self.tokenizers = {}
+        # Single-flight loading: one Future per model being loaded
+        self._loading = {}
+        self._loading_lock = threading.Lock()
+        self._load_errors = {}
+        # name -> (model path, file signature, fingerprint) of the last
+        # load, so embedding cache keys don't need a resident model
+        self._fingerprints = {}
+
+        self.batchers = {}
+        self._batchers_lock = threading.Lock()
 
     def _load_registry(self):
         with open(self.registry_path, "r") as f:
-            return yaml.safe_load(f)["models"]
+            data = yaml.safe_load(f)
+        return data["models"], data.get("session_profiles") or {}
 
     def list_models(self):
         return list(self.registry.keys())
 
-    def _load_model(self, name: str):
-        if name in self.sessions:
-            return
+    @staticmethod
+    def _estimate_size(model_path: str) -> int:
+        """
+        Resident size estimate: the weights dominate, so use the ONNX
+        file plus its external data file if there is one.
+        """
+        size = os.path.getsize(model_path)
+        external = model_path + ".data"
+        if os.path.exists(external):
+            size += os.path.getsize(external)
+        return size
+
+    @staticmethod
+    def _file_signature(model_path: str) -> tuple:
+        stat = os.stat(model_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    @staticmethod
+    def _fingerprint(model_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(model_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _load_model(
+        self, name: str, timeout: float | None = None
+    ) -> CachedModel:
+        """
+        Returns the resident model, loading it if needed.
+        Concurrent callers for the same cold model share one load;
+        waiters give up with ModelLoadingError after `timeout` seconds.
+        """
+        entry = self.cache.get(name)
+        if entry is not None:
+            return entry
 
         if name not in self.registry:
             raise ValueError(f"Model '{name}' not registered")
 
-        cfg = self.registry[name]
+        with self._loading_lock:
+            # Re-check: a load may have finished while we took the lock
+            entry = self.cache.get(name)
+            if entry is not None:
+                return entry
+
+            future = self._loading.get(name)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._loading[name] = future
 
+        if not owner:
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                raise ModelLoadingError(name, retry_after=max(1, int(timeout or 1)))
+
+        try:
+            entry = self._build_model(name)
+            self.cache.put(entry)
+            self._fingerprints[name] = (
+                entry.model_path,
+                self._file_signature(entry.model_path),
+                entry.fingerprint,
+            )
+            self._load_errors.pop(name, None)
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            self._load_errors[name] = str(e)
+            future.set_exception(e)
+            raise
+        finally:
+            with self._loading_lock:
+                self._loading.pop(name, None)
+
+    def _resolve_model_path(self, name: str, precision: str) -> str:
+        cfg = self.registry[name]
         model_path = cfg["path"]
-        tokenizer_id = cfg["tokenizer"]
-        device = cfg.get("device", settings.default_device)
 
         if not os.path.exists(model_path):
             raise FileNotFoundError(model_path)
 
-        providers = (
-            ["CUDAExecutionProvider", "CPUExecutionProvider"]
-            if device == "cuda"
-            else ["CPUExecutionProvider"]
+        if precision not in PRECISIONS:
+            raise ConfigError(
+                f"Model '{name}' has unknown precision '{precision}'"
+            )
+
+        if precision == "int8":
+            # Produced once and cached; see `ai_os.cli quantize`
+            return str(quantize_model(model_path, settings.ONNX_CACHE_DIR))
+
+        return model_path
+
+    def _build_model(self, name: str, precision: str | None = None) -> CachedModel:
+        cfg = self.registry[name]
+
+        precision = precision or cfg.get("precision", "fp32")
+        model_path = self._resolve_model_path(name, precision)
+        tokenizer_id = cfg["tokenizer"]
+        device = cfg.get("device", settings.DEFAULT_DEVICE)
+
+        providers = resolve_providers(name, device)
+
+        profile = resolve_profile(name, cfg, self.session_profiles)
+
+        logger.info("Loading model '%s' (%s) on %s", name, precision, device)
+        start = time.time()
+
+        session = create_session(
+            f"{name}-{precision}",
+            model_path,
+            providers,
+            profile,
+            cache_dir=settings.ONNX_CACHE_DIR,
+        )
+        tokenizer = self._build_tokenizer(
+            name, AutoTokenizer.from_pretrained(tokenizer_id)
+        )
+
+        entry = CachedModel(
+            name=name,
+            session=session,
+            tokenizer=tokenizer,
+            size_bytes=self._estimate_size(model_path),
+            pinned=bool(cfg.get("pinned", False)),
         )
+        entry.model_path = model_path
+        entry.fingerprint = self._fingerprint(model_path)
 
-        logger.info("Loading model '%s' on %s", name, device)
+        if cfg.get("warmup", True):
+            self._warmup(name, entry)
 
-        session = ort.InferenceSession(model_path, providers=providers)
-        tokenizer = AutoTokenizer.from_pretrained(tokenizer_id)
+        logger.info(
+            "Model '%s' ready in %.2fms", name, (time.time() - start) * 1000
+        )
+        return entry
+
+    def _truncation(self, name: str) -> dict:
+        cfg = self.registry[name]
+        opts = cfg.get("truncation", {})
+        return {
+            "max_length": cfg.get("max_length", 32),
+            "mode": opts.get("mode", "truncate"),
+            "stride": opts.get("stride", 0),
+            "max_chunks": opts.get("max_chunks", 1),
+        }
 
-        self.sessions[name] = session
-        self.tokenizers[name] = tokenizer
+    def _build_tokenizer(self, name: str, hf_tokenizer) -> FastTokenizer:
+        return FastTokenizer(hf_tokenizer, **self._truncation(name))
 
-    def infer(self, model: str, text: str):
-        self._load_model(model)
-
-        session = self.sessions[model]
-        tokenizer = self.tokenizers[model]
-        cfg = self.registry[model]
-
-        encoded = tokenizer(
-            text,
-            return_tensors="np",
-            padding="max_length",
-            truncation=True,
-            max_length=cfg.get("max_length", 32),
+    def _warmup(self, name: str, entry: CachedModel):
+        """
+        Runs one dummy batch so graph optimization and arena allocation
+        happen before the first real request.
+        """
+        cfg = self.registry[name]
+        size = cfg.get("batching", {}).get(
+            "max_batch_size", settings.INFER_MAX_BATCH_SIZE
         )
+        self._embed_texts(name, entry, ["warmup"] * max(1, size))
+
+    # ----------------------------
+    # Variants (quantization checks)
+    # ----------------------------
+    def build_variant(self, name: str, precision: str) -> CachedModel:
+        """
+        Builds a model at the given precision without caching it.
+        """
+        if name not in self.registry:
+            raise ValueError(f"Model '{name}' not registered")
+        return self._build_model(name, precision)
+
+    def embed_with(self, name: str, entry: CachedModel, texts: list[str]) -> np.ndarray:
+        return self._embed_texts(name, entry, texts)[0]
+
+    # ----------------------------
+    # Startup preload / readiness
+    # ----------------------------
+    def preload(self):
+        for name, cfg in self.registry.items():
+            if not cfg.get("preload", False):
+                continue
+            try:
+                self._load_model(name)
+            except Exception as e:
+                logger.error("Preload failed for model '%s': %s", name, e)
+
+    def preload_async(self) -> threading.Thread:
+        thread = threading.Thread(
+            target=self.preload, name="model-preload", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def is_ready(self, name: str) -> bool:
+        return name in self.cache
+
+    def model_status(self):
+        status = {}
+        for name in self.registry:
+            if name in self.cache:
+                status[name] = {"state": "ready"}
+            elif name in self._loading:
+                status[name] = {"state": "loading"}
+            elif name in self._load_errors:
+                status[name] = {
+                    "state": "failed",
+                    "error": self._load_errors[name],
+                }
+            else:
+                status[name] = {"state": "unloaded"}
+        return status
+
+    # ----------------------------
+    # Cache administration
+    # ----------------------------
+    def loaded_models(self):
+        return {
+            "budget_bytes": self.cache.max_bytes,
+            "used_bytes": self.cache.total_bytes(),
+            "idle_ttl_seconds": self.cache.idle_ttl,
+            "evictions": self.cache.evictions,
+            "unloads": self.cache.unloads,
+            "models": self.cache.entries(),
+        }
+
+    def load(self, name: str):
+        return self._load_model(name).info()
+
+    def unload(self, name: str) -> bool:
+        return self.cache.unload(name)
+
+    def pin(self, name: str, pinned: bool = True):
+        # Pinning a cold model loads it first
+        if pinned:
+            self._load_model(name)
+        self.cache.set_pinned(name, pinned)
+        entry = self.cache.get(name)
+        return entry.info() if entry else None
+
+    # ----------------------------
+    # Micro-batching
+    # ----------------------------
+    def _get_batcher(self, model: str) -> MicroBatcher:
+        batcher = self.batchers.get(model)
+        if batcher:
+            return batcher
 
-        ort_inputs = {}
-        for inp in session.get_inputs():
-            name = inp.name
-            if name == "input_ids":
-                ort_inputs[name] = encoded["input_ids"]
-            elif name == "attention_mask":
-                ort_inputs[name] = encoded["attention_mask"]
-            elif name == "token_type_ids":
-                # Some models require this even for single-sentence input
-                ort_inputs[name] = encoded.get(
-                    "token_type_ids",
-                    encoded["input_ids"] * 0
+        if model not in self.registry:
+            raise ValueError(f"Model '{model}' not registered")
+
+        with self._batchers_lock:
+            if model not in self.batchers:
+                opts = self.registry[model].get("batching", {})
+                self.batchers[model] = MicroBatcher(
+                    name=model,
+                    run_batch=lambda texts: self._embed(model, texts),
+                    max_batch_size=opts.get(
+                        "max_batch_size", settings.INFER_MAX_BATCH_SIZE
+                    ),
+                    max_wait_ms=opts.get(
+                        "max_wait_ms", settings.INFER_MAX_WAIT_MS
+                    ),
                 )
+            return self.batchers[model]
+
+    def batching_stats(self):
+        return {
+            name: batcher.stats.snapshot()
+            for name, batcher in self.batchers.items()
+        }
+
+    def shutdown(self):
+        for batcher in list(self.batchers.values()):
+            batcher.close()
+        self.cache.close()
+        if self.embedding_cache:
+            self.embedding_cache.close()
+
+    # ----------------------------
+    # Inference
+    # ----------------------------
+    def _pooling(self, model: str) -> tuple[str, bool]:
+        opts = self.registry[model].get("pooling", {})
+        strategy = opts.get("strategy", "mean")
+        if strategy not in POOLING_STRATEGIES:
+            raise ConfigError(
+                f"Model '{model}' has unknown pooling strategy '{strategy}'"
+            )
+        return strategy, bool(opts.get("normalize", False))
+
+    def _run(self, model: str, entry: CachedModel, batch) -> np.ndarray:
+        session = entry.session
+
+        ort_inputs = {
+            inp.name: batch[inp.name]
+            for inp in session.get_inputs()
+            if inp.name in batch
+        }
+
+        hidden = session.run(None, ort_inputs)[0]
+        strategy, _ = self._pooling(model)
+
+        # Normalization happens after sliding windows are combined
+        return pool(hidden, batch["attention_mask"], strategy)
+
+    def _embed_texts(
+        self,
+        model: str,
+        entry: CachedModel,
+        texts: list[str],
+        bucketed: bool = False,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (embeddings, truncated) for texts.
+        With bucketed, rows are sorted by token length and run in
+        buckets padded only to their own longest row; otherwise all
+        rows go through one session.run.
+        """
+        tokenized = entry.tokenizer.encode(texts)
+        lengths = tokenized.lengths
+
+        rows = list(range(len(tokenized)))
+        if bucketed:
+            bucket_size = self.registry[model].get(
+                "bucket_size", settings.INFER_BUCKET_SIZE
+            )
+            rows.sort(key=lambda r: lengths[r])
+        else:
+            bucket_size = len(rows)
+
+        pooled = None
+        for start in range(0, len(rows), bucket_size):
+            indices = rows[start:start + bucket_size]
+            out = self._run(model, entry, entry.tokenizer.pad(tokenized, indices))
+
+            if pooled is None:
+                pooled = np.empty((len(rows), out.shape[1]), dtype=np.float32)
+            pooled[indices] = out
+
+        strategy, normalize = self._pooling(model)
+        embeddings = combine_chunks(
+            pooled, tokenized.owners, lengths, len(texts), strategy
+        )
+        if normalize:
+            embeddings = l2_normalize(embeddings)
 
-        outputs = session.run(None, ort_inputs)
-        embedding = outputs[0][0].mean(axis=0)
+        return embeddings, tokenized.truncated
+
+    def _embed(self, model: str, texts: list[str]):
+        """
+        Micro-batcher entry point: one session.run for all texts,
+        one (embedding, truncated) pair per text.
+        """
+        entry = self._load_model(model, timeout=settings.MODEL_LOAD_WAIT_SECONDS)
+        embeddings, truncated = self._embed_texts(model, entry, texts)
+        return list(zip(embeddings, truncated.tolist()))
+
+    # ----------------------------
+    # Embedding cache
+    # ----------------------------
+    def _cache_key(self, model: str, fingerprint: str, text: str) -> str:
+        strategy, normalize = self._pooling(model)
+        trunc = self._truncation(model)
+        config = (
+            f"{strategy}:{normalize}:{trunc['max_length']}:"
+            f"{trunc['mode']}:{trunc['stride']}:{trunc['max_chunks']}"
+        )
+        return cache_key(model, fingerprint, config, text)
+
+    def _known_fingerprint(self, model: str) -> str | None:
+        """
+        Fingerprint of the model without loading it: the resident
+        entry's, or the last load's if the file is unchanged since.
+        None means the model has to be loaded to know it.
+        """
+        entry = self.cache.get(model)
+        if entry is not None:
+            return entry.fingerprint
+
+        known = self._fingerprints.get(model)
+        if known is None:
+            return None
+        model_path, signature, fingerprint = known
+        try:
+            if self._file_signature(model_path) != signature:
+                return None
+        except OSError:
+            return None
+        return fingerprint
+
+    def embedding_cache_stats(self):
+        if not self.embedding_cache:
+            return {"enabled": False}
+        return {"enabled": True, **self.embedding_cache.stats()}
+
+    def embed(self, model: str, text: str, return_truncation: bool = False):
+        """
+        Embeds one text; with return_truncation, returns
+        (embedding, truncated). A cache hit never loads the model.
+        """
+        key = None
+        result = None
+        if self.embedding_cache:
+            fingerprint = self._known_fingerprint(model)
+            if fingerprint is None:
+                entry = self._load_model(model, timeout=settings.MODEL_LOAD_WAIT_SECONDS)
+                fingerprint = entry.fingerprint
+            key = self._cache_key(model, fingerprint, text)
+            result = self.embedding_cache.get(key)
+
+        if result is None:
+            if settings.INFER_BATCHING:
+                result = self._get_batcher(model).submit(text)
+            else:
+                result = self._embed(model, [text])[0]
+
+            # Skip if the file was replaced under a stale fingerprint
+            if key and self._known_fingerprint(model) == fingerprint:
+                self.embedding_cache.put(key, *result)
+
+        return result if return_truncation else result[0]
+
+    def embed_batch(
+        self,
+        model: str,
+        texts: list[str],
+        return_truncation: bool = False,
+    ):
+        """
+        Embeds many texts at once, bucketed by token length.
+        Cached texts are served from the embedding cache; only the
+        distinct misses go through the model, which isn't loaded when
+        there are none. With return_truncation, returns
+        (embeddings, truncated).
+        """
+        if not texts:
+            raise ValueError("texts must not be empty")
+
+        if not self.embedding_cache:
+            entry = self._load_model(model, timeout=settings.MODEL_LOAD_WAIT_SECONDS)
+            embeddings, truncated = self._embed_texts(
+                model, entry, texts, bucketed=True
+            )
+            return (embeddings, truncated) if return_truncation else embeddings
+
+        entry = None
+        fingerprint = self._known_fingerprint(model)
+        if fingerprint is None:
+            entry = self._load_model(model, timeout=settings.MODEL_LOAD_WAIT_SECONDS)
+            fingerprint = entry.fingerprint
+
+        keys = [self._cache_key(model, fingerprint, t) for t in texts]
+        found = {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key in found or key in missing:
+                continue
+            cached = self.embedding_cache.get(key)
+            if cached is not None:
+                found[key] = cached
+            else:
+                missing[key] = text
+
+        if missing:
+            if entry is None:
+                entry = self._load_model(model, timeout=settings.MODEL_LOAD_WAIT_SECONDS)
+                if entry.fingerprint != fingerprint:
+                    # File replaced since the last load: start over with
+                    # the new fingerprint, now that the model is resident
+                    return self.embed_batch(model, texts, return_truncation)
+            computed, truncated = self._embed_texts(
+                model, entry, list(missing.values()), bucketed=True
+            )
+            for key, vec, cut in zip(missing.keys(), computed, truncated.tolist()):
+                self.embedding_cache.put(key, vec, cut)
+                found[key] = (vec, cut)
+
+        embeddings = np.stack([found[key][0] for key in keys])
+        if not return_truncation:
+            return embeddings
+        return embeddings, np.array([found[key][1] for key in keys], dtype=bool)
+
+    def infer(self, model: str, text: str):
+        embedding, truncated = self.embed(model, text, return_truncation=True)
 
         return {
             "model": model,
             "dim": int(embedding.shape[0]),
+            "truncated": bool(truncated),
             "sample": embedding[:5].tolist(),
         }
+
+    def infer_batch(self, model: str, texts: list[str]):
+        embeddings, truncated = self.embed_batch(model, texts, return_truncation=True)
+
+        return {
+            "model": model,
+            "dim": int(embeddings.shape[1]),
+            "count": len(texts),
+            "truncated": np.flatnonzero(truncated).tolist(),
+            "embeddings": embeddings.tolist(),
+        }
@@ -0,0 +1,30 @@
+import threading
+from typing import Dict
+
+
+class LatencyStats:
+    """
+    Thread-safe running count / mean / max for a duration in milliseconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, duration_ms: float):
+        with self._lock:
+            self.count += 1
+            self.total_ms += duration_ms
+            if duration_ms > self.max_ms:
+                self.max_ms = duration_ms
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            avg = self.total_ms / self.count if self.count else 0.0
+            return {
+                "count": self.count,
+                "avg_ms": round(avg, 3),
+                "max_ms": round(self.max_ms, 3),
+            }
@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ai_os.persistence.db import get_conn
+from ai_os.observability.logger import get_logger
+
+logger = get_logger("persistence.archive")
+
+
+class ArchiveError(Exception):
+    pass
+
+
+class ArchiveStore:
+    """
+    Append-only gzip JSONL segments for rows moved out of SQLite.
+    - One segment per retention batch, so a lookup decompresses at most
+      one batch worth of rows
+    - Archived task ids are indexed in the task_archive table; the
+      segment file is only opened on a lookup
+    - Segments are written to a temp file, fsynced, then renamed, so a
+      crash never leaves a half-written segment behind
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    def write_segment(self, kind: str, rows: List[Dict]) -> str:
+        name = f"{kind}-{time.strftime('%Y%m%d')}-{uuid.uuid4().hex[:12]}.jsonl.gz"
+        path = self.root / name
+        tmp = path.with_suffix(".tmp")
+
+        with open(tmp, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+                for row in rows:
+                    gz.write(json.dumps(row, separators=(",", ":")).encode())
+                    gz.write(b"\n")
+            raw.flush()
+            os.fsync(raw.fileno())
+
+        os.replace(tmp, path)
+        return name
+
+    def read_segment(self, name: str):
+        path = self.root / name
+        if not path.exists():
+            raise ArchiveError(f"Missing archive segment: {name}")
+        with gzip.open(path, "rt") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def find_task(self, task_id: str) -> Optional[Dict]:
+        row = get_conn().execute(
+            "SELECT segment FROM task_archive WHERE id = ?",
+            (task_id,),
+        ).fetchone()
+
+        with self._lock:
+            self.lookups += 1
+        if row is None:
+            return None
+
+        try:
+            for record in self.read_segment(row[0]):
+                if record["id"] == task_id:
+                    with self._lock:
+                        self.hits += 1
+                    return record
+        except (ArchiveError, OSError, ValueError) as e:
+            logger.error(f"Archive lookup failed | id={task_id} | error={e}")
+        return None
+
+    def stats(self) -> Dict:
+        segments = list(self.root.glob("*.jsonl.gz"))
+        with self._lock:
+            return {
+                "segments": len(segments),
+                "bytes": sum(p.stat().st_size for p in segments),
+                "lookups": self.lookups,
+                "hits": self.hits,
+            }
@@ -0,0 +1,123 @@
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Optional, Tuple
+
+from ai_os.observability.logger import get_logger
+
+logger = get_logger("persistence.blobs")
+
+_BLOB_ID = re.compile(r"^[0-9a-f]{32}$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class BlobNotFoundError(KeyError):
+    pass
+
+
+class RangeNotSatisfiableError(ValueError):
+    pass
+
+
+class BlobWriter:
+    """
+    Streams one blob to a temp file; visible under its id only after commit().
+    """
+
+    def __init__(self, store: "BlobStore"):
+        self.store = store
+        self.blob_id = uuid.uuid4().hex
+        self._tmp = store.root / f"{self.blob_id}.tmp"
+        self._file = open(self._tmp, "wb")
+        self.size = 0
+
+    def write(self, data: bytes):
+        self._file.write(data)
+        self.size += len(data)
+
+    def commit(self) -> str:
+        self._file.close()
+        os.replace(self._tmp, self.store.path(self.blob_id))
+        return self.blob_id
+
+    def abort(self):
+        self._file.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+class BlobStore:
+    """
+    File-backed store for large command output.
+    - One file per blob, named by a random id
+    - Reads are by byte range, so a client can page through
+      output without it ever being loaded whole
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, blob_id: str) -> Path:
+        if not _BLOB_ID.match(blob_id):
+            raise BlobNotFoundError(blob_id)
+        return self.root / blob_id
+
+    def open(self) -> BlobWriter:
+        return BlobWriter(self)
+
+    def size(self, blob_id: str) -> int:
+        try:
+            return self.path(blob_id).stat().st_size
+        except FileNotFoundError:
+            raise BlobNotFoundError(blob_id)
+
+    def read(self, blob_id: str, start: int = 0, length: Optional[int] = None) -> bytes:
+        try:
+            with open(self.path(blob_id), "rb") as f:
+                f.seek(start)
+                return f.read(-1 if length is None else length)
+        except FileNotFoundError:
+            raise BlobNotFoundError(blob_id)
+
+    def prune(self, older_than_seconds: float) -> int:
+        """
+        Deletes blobs (and abandoned temp files) older than the cutoff.
+        """
+        cutoff = time.time() - older_than_seconds
+        removed = 0
+        for path in self.root.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        if removed:
+            logger.info(f"Pruned blobs | count={removed}")
+        return removed
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Single-range "bytes=a-b" / "bytes=a-" / "bytes=-n" -> (start, end),
+    end exclusive. None when no range was requested.
+    """
+    if not header:
+        return None
+
+    match = _RANGE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        raise RangeNotSatisfiableError(f"Unsupported range: {header}")
+
+    first, last = match.groups()
+    if first == "":
+        start, end = max(0, size - int(last)), size
+    else:
+        start = int(first)
+        end = min(size, int(last) + 1) if last else size
+
+    if start >= size or start >= end:
+        raise RangeNotSatisfiableError(f"Range not satisfiable: {header}")
+    return start, end
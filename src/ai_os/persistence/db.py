@@ -1,8 +1,103 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
-DB_PATH = Path("data/ai_os.db")
+from ai_os.config import Config
+
+DB_PATH = Path(Config.DB_PATH)
 DB_PATH.parent.mkdir(parents = True , exist_ok=True)
 
-def get_conn():
-    return sqlite3.connect(DB_PATH)
\ No newline at end of file
+# Applied to every new connection.
+# WAL lets readers run alongside the writer; synchronous=NORMAL in WAL
+# mode only fsyncs at checkpoints, never per commit.
+# auto_vacuum only takes effect on a fresh file, so it goes first.
+PRAGMAS = {
+    "auto_vacuum": "INCREMENTAL",
+    "journal_mode": "WAL",
+    "synchronous": Config.DB_SYNCHRONOUS,
+    "cache_size": Config.DB_CACHE_SIZE_KB * -1,  # negative = KiB
+    "busy_timeout": 5000,
+    "foreign_keys": "ON",
+    "temp_store": "MEMORY",
+}
+
+
+class ConnectionPool:
+    """
+    One long-lived connection per thread.
+    - Connection setup and PRAGMAs are paid once per thread
+    - sqlite3 keeps a per-connection prepared statement cache,
+      so repeated INSERT/UPDATE text is parsed once
+    - Connections of threads that have exited are closed lazily
+    """
+
+    def __init__(self, path: Path, cached_statements: int = 256):
+        self.path = Path(path)
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conns: list[tuple[threading.Thread, sqlite3.Connection]] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=5.0,
+            cached_statements=self.cached_statements,
+            # Closed from whichever thread reaps it
+            check_same_thread=False,
+        )
+        for name, value in PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+
+        conn = self._connect()
+        self._local.conn = conn
+
+        with self._lock:
+            self._reap()
+            self._conns.append((threading.current_thread(), conn))
+
+        return conn
+
+    def _reap(self):
+        alive = []
+        for thread, conn in self._conns:
+            if thread.is_alive():
+                alive.append((thread, conn))
+            else:
+                conn.close()
+        self._conns = alive
+
+    def close_all(self):
+        with self._lock:
+            for _, conn in self._conns:
+                conn.close()
+            self._conns = []
+        self._local = threading.local()
+
+
+pool = ConnectionPool(DB_PATH)
+
+
+def get_conn() -> sqlite3.Connection:
+    """
+    Returns this thread's pooled connection.
+    Do not close it; use transaction() for writes.
+    """
+    return pool.get()
+
+
+@contextmanager
+def transaction():
+    """
+    Commits on success, rolls back on error.
+    """
+    conn = pool.get()
+    with conn:
+        yield conn
@@ -0,0 +1,101 @@
+import sqlite3
+
+from ai_os.observability.logger import get_logger
+
+logger = get_logger("persistence.migrations")
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_column(conn: sqlite3.Connection, table: str, column: str, decl: str):
+    if column not in _columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+# ----------------------------
+# Migrations (append only)
+# ----------------------------
+def _task_timing_and_query_indexes(conn: sqlite3.Connection):
+    _add_column(conn, "tasks", "started_at", "REAL")
+    _add_column(conn, "tasks", "finished_at", "REAL")
+
+    # Keyset pagination is ordered by (created_at, id); every filter
+    # combination gets an index ending in that order.
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_tasks_created
+    ON tasks (created_at, id)
+    """)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_tasks_status_created
+    ON tasks (status, created_at, id)
+    """)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_tasks_type_created
+    ON tasks (type, created_at, id)
+    """)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_tasks_type_status_created
+    ON tasks (type, status, created_at, id)
+    """)
+
+
+def _task_archive_index(conn: sqlite3.Connection):
+    # id -> segment file for tasks moved out by the retention engine
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS task_archive (
+        id TEXT PRIMARY KEY,
+        segment TEXT NOT NULL,
+        created_at REAL,
+        archived_at REAL
+    )
+    """)
+
+
+def _task_queue_columns(conn: sqlite3.Connection):
+    # Lets queued tasks be requeued with their priority/role after restart
+    _add_column(conn, "tasks", "priority", "INTEGER")
+    _add_column(conn, "tasks", "role", "TEXT")
+
+
+def _plan_cache_table(conn: sqlite3.Connection):
+    # Validated plans keyed by sha256 of the normalized goal
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS plan_cache (
+        key TEXT PRIMARY KEY,
+        goal TEXT NOT NULL,
+        plan TEXT NOT NULL,
+        planner TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_used_at REAL NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_plan_cache_last_used
+    ON plan_cache (last_used_at)
+    """)
+
+
+MIGRATIONS = [
+    (1, _task_timing_and_query_indexes),
+    (2, _task_archive_index),
+    (3, _task_queue_columns),
+    (4, _plan_cache_table),
+]
+
+
+def migrate(conn: sqlite3.Connection):
+    """
+    Applies pending migrations in order, tracked in PRAGMA user_version.
+    Must run inside a transaction.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+
+    for target, step in MIGRATIONS:
+        if target <= version:
+            continue
+        logger.info(f"Applying migration {target}: {step.__name__}")
+        step(conn)
+        conn.execute(f"PRAGMA user_version = {target}")
@@ -0,0 +1,275 @@
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from ai_os.config import Config
+from ai_os.persistence.archive import ArchiveStore
+from ai_os.persistence.blobs import BlobStore
+from ai_os.persistence.db import get_conn, transaction
+from ai_os.observability.logger import get_logger
+
+logger = get_logger("persistence.retention")
+
+ARCHIVE = "archive"   # move rows to compressed segments, then delete
+DELETE = "delete"     # drop rows outright
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class RetentionError(Exception):
+    pass
+
+
+def enable_incremental_vacuum(conn) -> bool:
+    """
+    Switches a database created before auto_vacuum was enabled to
+    incremental mode. That takes a full VACUUM, which locks the whole
+    database while it rewrites the file, so it is never done
+    automatically: run scripts/enable_incremental_vacuum.py during a
+    maintenance window. Returns False if nothing needed converting.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+        return False
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return True
+
+
+class RetentionPolicy:
+    """
+    Rows of `table` created more than max_age_days ago (optionally only
+    with one of `statuses`) are archived or deleted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        table: str,
+        max_age_days: float,
+        statuses: Sequence[str] = (),
+        action: str = ARCHIVE,
+    ):
+        if action not in (ARCHIVE, DELETE):
+            raise RetentionError(f"Unknown retention action: {action}")
+        self.name = name
+        self.table = table
+        self.max_age_days = max_age_days
+        self.statuses = tuple(statuses)
+        self.action = action
+
+    def cutoff(self, now: float) -> float:
+        return now - self.max_age_days * 86400
+
+
+def default_policies() -> List[RetentionPolicy]:
+    """
+    Built from Config; a max age of 0 disables that policy.
+    """
+    action = Config.RETENTION_ACTION
+    policies = [
+        RetentionPolicy("tasks_completed", "tasks", Config.RETENTION_COMPLETED_DAYS,
+                        statuses=("completed", "cancelled"), action=action),
+        RetentionPolicy("tasks_failed", "tasks", Config.RETENTION_FAILED_DAYS,
+                        statuses=("failed",), action=action),
+        RetentionPolicy("plans", "plans", Config.RETENTION_PLANS_DAYS, action=action),
+    ]
+    return [p for p in policies if p.max_age_days > 0]
+
+
+class RetentionEngine:
+    """
+    Background retention.
+    - Works in small batches, each its own short transaction, with a
+      pause in between so request-path writers are never blocked for long
+    - Archived tasks are indexed in task_archive and stay readable
+      through ArchiveStore
+    - Freed pages are returned to the OS with PRAGMA incremental_vacuum,
+      on databases already in incremental auto_vacuum mode
+    - Spilled command output older than blob_max_age_days is removed
+    """
+
+    def __init__(
+        self,
+        policies: List[RetentionPolicy],
+        archive: Optional[ArchiveStore] = None,
+        batch_size: int = 500,
+        batch_pause_ms: float = 50,
+        vacuum_pages: int = 2000,
+        blobs: Optional[BlobStore] = None,
+        blob_max_age_days: float = 0,
+    ):
+        if archive is None and any(p.action == ARCHIVE for p in policies):
+            raise RetentionError("Archive policies need an ArchiveStore")
+
+        self.policies = policies
+        self.archive = archive
+        self.batch_size = max(1, batch_size)
+        self.batch_pause = batch_pause_ms / 1000
+        self.vacuum_pages = vacuum_pages
+        self.blobs = blobs
+        self.blob_max_age_days = blob_max_age_days
+
+        self.runs = 0
+        self.archived = 0
+        self.deleted = 0
+        self.vacuumed_pages = 0
+        self.pruned_blobs = 0
+        self.last_run_at: Optional[float] = None
+        self.last_duration_ms = 0.0
+        self._vacuum_warned = False
+
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ----------------------------
+    # Scheduling
+    # ----------------------------
+    def start(self, interval_seconds: float, initial_delay_seconds: float = 0):
+        if self._thread is not None:
+            return
+
+        def loop():
+            delay = initial_delay_seconds
+            while not self._stop.wait(delay):
+                try:
+                    self.run_once()
+                except Exception as e:
+                    logger.error(f"Retention run failed | error={e}")
+                delay = interval_seconds
+
+        self._thread = threading.Thread(target=loop, name="retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # ----------------------------
+    # One pass over every policy
+    # ----------------------------
+    def run_once(self, now: Optional[float] = None) -> Dict:
+        with self._run_lock:
+            start = time.perf_counter()
+            now = time.time() if now is None else now
+
+            moved = {}
+            for policy in self.policies:
+                moved[policy.name] = self._apply(policy, now)
+
+            pages = self._incremental_vacuum()
+
+            if self.blobs is not None and self.blob_max_age_days > 0:
+                self.pruned_blobs += self.blobs.prune(self.blob_max_age_days * 86400)
+
+            self.runs += 1
+            self.last_run_at = now
+            self.last_duration_ms = (time.perf_counter() - start) * 1000
+            logger.info(
+                f"Retention run | rows={moved} | vacuumed_pages={pages} "
+                f"| duration_ms={self.last_duration_ms:.1f}"
+            )
+            return {"rows": moved, "vacuumed_pages": pages}
+
+    def _apply(self, policy: RetentionPolicy, now: float) -> int:
+        cutoff = policy.cutoff(now)
+        where = "created_at < ?"
+        params: list = [cutoff]
+        if policy.statuses:
+            where += f" AND status IN ({','.join('?' * len(policy.statuses))})"
+            params += policy.statuses
+
+        total = 0
+        while not self._stop.is_set():
+            cur = get_conn().execute(
+                f"""
+                SELECT * FROM {policy.table}
+                WHERE {where}
+                ORDER BY created_at
+                LIMIT ?
+                """,
+                (*params, self.batch_size),
+            )
+            columns = [c[0] for c in cur.description]
+            rows = [dict(zip(columns, row)) for row in cur.fetchall()]
+            if not rows:
+                break
+
+            self._move_batch(policy, rows, now)
+            total += len(rows)
+
+            if len(rows) < self.batch_size:
+                break
+            time.sleep(self.batch_pause)
+
+        return total
+
+    def _move_batch(self, policy: RetentionPolicy, rows: List[Dict], now: float):
+        segment = None
+        if policy.action == ARCHIVE:
+            # Segment is durable before any row is deleted; a crash in
+            # between only leaves rows to be archived again next run
+            segment = self.archive.write_segment(policy.name, rows)
+
+        ids = [row["id"] for row in rows]
+        with transaction() as conn:
+            if segment is not None and policy.table == "tasks":
+                conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO task_archive
+                        (id, segment, created_at, archived_at)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    [(row["id"], segment, row["created_at"], now) for row in rows],
+                )
+            conn.execute(
+                f"DELETE FROM {policy.table} WHERE id IN ({','.join('?' * len(ids))})",
+                ids,
+            )
+
+        if segment is not None:
+            self.archived += len(rows)
+        else:
+            self.deleted += len(rows)
+
+    # ----------------------------
+    # Space reclamation
+    # ----------------------------
+    def _incremental_vacuum(self) -> int:
+        conn = get_conn()
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode != AUTO_VACUUM_INCREMENTAL:
+            # Switching modes needs a full VACUUM; see enable_incremental_vacuum
+            if not self._vacuum_warned:
+                logger.warning(
+                    "Database is not in incremental auto_vacuum mode; freed pages "
+                    "are reused but not returned to the OS. Run "
+                    "scripts/enable_incremental_vacuum.py to convert it"
+                )
+                self._vacuum_warned = True
+            return 0
+
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        pages = min(free, self.vacuum_pages) if self.vacuum_pages > 0 else free
+        if pages:
+            conn.execute(f"PRAGMA incremental_vacuum({pages})").fetchall()
+        self.vacuumed_pages += pages
+        return pages
+
+    def stats(self) -> Dict:
+        return {
+            "policies": {
+                p.name: {"table": p.table, "max_age_days": p.max_age_days, "action": p.action}
+                for p in self.policies
+            },
+            "runs": self.runs,
+            "archived": self.archived,
+            "deleted": self.deleted,
+            "vacuumed_pages": self.vacuumed_pages,
+            "pruned_blobs": self.pruned_blobs,
+            "last_run_at": self.last_run_at,
+            "last_duration_ms": round(self.last_duration_ms, 3),
+            "archive": self.archive.stats() if self.archive else None,
+        }
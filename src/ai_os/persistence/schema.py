@@ -1,8 +1,14 @@
-from ai_os.persistence.db import get_conn
+from ai_os.persistence.db import transaction
+from ai_os.persistence.migrations import migrate
 
 
 def init_db():
-    conn = get_conn()
+    with transaction() as conn:
+        _create_tables(conn)
+        migrate(conn)
+
+
+def _create_tables(conn):
     cur = conn.cursor()
 
     cur.execute("""
@@ -25,6 +31,3 @@ def init_db():
         created_at REAL
     )
     """)
-
-    conn.commit()
-    conn.close()
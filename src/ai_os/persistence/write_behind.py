@@ -0,0 +1,189 @@
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+import sqlite3
+
+from ai_os.observability.logger import get_logger
+from ai_os.observability.metrics import LatencyStats
+
+logger = get_logger("persistence.write_behind")
+
+_STOP = object()
+
+STRICT = "strict"      # callers wait until their batch is committed and fsynced
+RELAXED = "relaxed"    # callers return at once; batches flush in the background
+
+
+class WriteBehindError(Exception):
+    pass
+
+
+class WriteBehindQueue:
+    """
+    Group-commit writer.
+    - Statements are queued in order and executed by one writer thread
+    - A batch commits after flush_interval_ms or max_batch statements
+    - STRICT: the writer connection runs synchronous=FULL and submit()
+      blocks until the statement's batch is durable
+    - RELAXED: submit() returns at once; pending writes are flushed on
+      close() (also registered with atexit)
+    - A failed batch is retried one statement at a time, so only the
+      statements that fail on their own are lost (counted in stats())
+    - After close(), submit() raises WriteBehindError; anything the
+      writer can no longer commit fails with it instead of hanging
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], sqlite3.Connection],
+        flush_interval_ms: float = 10,
+        max_batch: int = 256,
+        durability: str = STRICT,
+    ):
+        if durability not in (STRICT, RELAXED):
+            raise WriteBehindError(f"Unknown durability: {durability}")
+
+        self.connect = connect
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.durability = durability
+
+        self.batches = 0
+        self.statements = 0
+        self.failed = 0
+        self.commit_time = LatencyStats()
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        # Guards _closed against submit(), so nothing lands behind _STOP
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._loop, name="task-write-behind", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, sql: str, params: tuple) -> Optional[Future]:
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise WriteBehindError("Write-behind queue is closed")
+            self._queue.put((sql, params, future))
+
+        if self.durability == STRICT:
+            future.result()
+        return future
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Drains every queued statement, then stops the writer.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # ----------------------------
+    # Writer thread
+    # ----------------------------
+    def _loop(self):
+        try:
+            self._write()
+        except Exception as e:
+            logger.error(f"Write-behind writer stopped | error={e}")
+        finally:
+            with self._lock:
+                self._closed = True
+            self._fail_queued()
+
+    def _write(self):
+        conn = self.connect()
+        if self.durability == STRICT:
+            conn.execute("PRAGMA synchronous = FULL")
+
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+
+            batch = [first]
+            deadline = time.perf_counter() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    entry = self._queue.get(timeout=max(0.0, remaining))
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    # Commit what we have, then drain the rest below
+                    stop = True
+                    break
+                batch.append(entry)
+
+            self._commit(conn, batch)
+
+        # Anything enqueued before close() still gets written
+        remaining = []
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not _STOP:
+                remaining.append(entry)
+        for start in range(0, len(remaining), self.max_batch):
+            self._commit(conn, remaining[start:start + self.max_batch])
+
+    def _fail_queued(self):
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if entry is not _STOP:
+                entry[2].set_exception(WriteBehindError("Write-behind writer has stopped"))
+
+    def _commit(self, conn: sqlite3.Connection, batch: list):
+        start = time.perf_counter()
+        try:
+            with conn:
+                for sql, params, _ in batch:
+                    conn.execute(sql, params)
+        except Exception as e:
+            if len(batch) == 1:
+                sql, _, future = batch[0]
+                self.failed += 1
+                logger.error(f"Write-behind statement failed | sql={sql.split()[0]} | error={e}")
+                future.set_exception(e)
+                return
+            # RELAXED callers are long gone: don't drop their good
+            # statements along with the bad one
+            logger.warning(f"Write-behind batch failed, retrying one by one | size={len(batch)} | error={e}")
+            for entry in batch:
+                self._commit(conn, [entry])
+            return
+
+        self.commit_time.observe((time.perf_counter() - start) * 1000)
+        self.batches += 1
+        self.statements += len(batch)
+
+        for _, _, future in batch:
+            future.set_result(None)
+
+    def stats(self):
+        return {
+            "durability": self.durability,
+            "batches": self.batches,
+            "statements": self.statements,
+            "failed": self.failed,
+            "pending": self._queue.qsize(),
+            "avg_batch_size": round(self.statements / self.batches, 3) if self.batches else 0.0,
+            "commit_time": self.commit_time.snapshot(),
+        }
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, Optional, Tuple
+
+from ai_os.persistence.db import get_conn, transaction
+from ai_os.planner.plan import Plan
+from ai_os.observability.logger import get_logger
+
+logger = get_logger("planner.cache")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_goal(goal: str) -> str:
+    # Case is kept: "echo Hello" and "echo hello" are different plans
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", goal)).strip()
+
+
+def goal_key(goal: str) -> str:
+    return hashlib.sha256(normalize_goal(goal).encode("utf-8")).hexdigest()
+
+
+class PlanCache:
+    """
+    Validated plans keyed by normalized goal, stored in SQLite so they
+    survive restarts.
+    - Entries expire ttl_seconds after the plan was generated (0 = never)
+    - Past max_entries, the least recently used entries are evicted
+    - Hit/miss counters are kept per planner; a hit counts towards the
+      planner that generated the cached plan
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+        self.expired = 0
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+    def get(self, goal: str) -> Optional[Tuple[Plan, str]]:
+        """
+        Returns (plan, planner) for a live entry, refreshing its LRU position.
+        """
+        key = goal_key(goal)
+        row = get_conn().execute(
+            "SELECT plan, planner, created_at FROM plan_cache WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        raw, planner, created_at = row
+        now = time.time()
+        if self.ttl_seconds and created_at < now - self.ttl_seconds:
+            self.invalidate(goal)
+            with self._lock:
+                self.expired += 1
+            return None
+
+        with transaction() as conn:
+            conn.execute(
+                "UPDATE plan_cache SET last_used_at = ?, hits = hits + 1 WHERE key = ?",
+                (now, key),
+            )
+
+        plan = Plan(**json.loads(raw))
+        # The cached plan echoes the goal it was generated for
+        plan.goal = goal
+        return plan, planner
+
+    # ----------------------------
+    # Store
+    # ----------------------------
+    def put(self, goal: str, plan: Plan, planner: str):
+        now = time.time()
+        with transaction() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO plan_cache
+                    (key, goal, plan, planner, created_at, last_used_at, hits)
+                VALUES (?, ?, ?, ?, ?, ?, 0)
+                """,
+                (goal_key(goal), normalize_goal(goal), plan.model_dump_json(), planner, now, now),
+            )
+
+            if not self.max_entries:
+                return
+            excess = conn.execute("SELECT COUNT(*) FROM plan_cache").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    """
+                    DELETE FROM plan_cache WHERE key IN (
+                        SELECT key FROM plan_cache ORDER BY last_used_at LIMIT ?
+                    )
+                    """,
+                    (excess,),
+                )
+
+        if excess > 0:
+            with self._lock:
+                self.evictions += excess
+
+    def invalidate(self, goal: str):
+        with transaction() as conn:
+            conn.execute("DELETE FROM plan_cache WHERE key = ?", (goal_key(goal),))
+
+    def clear(self) -> int:
+        with transaction() as conn:
+            return conn.execute("DELETE FROM plan_cache").rowcount
+
+    # ----------------------------
+    # Stats
+    # ----------------------------
+    def record(self, planner: str, hit: bool):
+        with self._lock:
+            counters = self._counters.setdefault(planner, {"hits": 0, "misses": 0})
+            counters["hits" if hit else "misses"] += 1
+
+    def stats(self) -> Dict:
+        entries = get_conn().execute("SELECT COUNT(*) FROM plan_cache").fetchone()[0]
+        with self._lock:
+            planners = {}
+            for planner, counters in self._counters.items():
+                lookups = counters["hits"] + counters["misses"]
+                planners[planner] = {
+                    **counters,
+                    "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+                }
+            hits = sum(c["hits"] for c in self._counters.values())
+            lookups = hits + sum(c["misses"] for c in self._counters.values())
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "planners": planners,
+            }
@@ -1,11 +1,16 @@
+import re
 import time
+from typing import Callable, Optional, Tuple
+from ai_os.planner.cache import PlanCache, normalize_goal
 from ai_os.planner.llm_planner import LLMPlanner
-from ai_os.planner.validator import PlanValidationError
+from ai_os.planner.plan import Plan
+from ai_os.planner.semantic_index import SemanticMatch, SemanticPlanIndex
+from ai_os.planner.validator import PlanValidationError, PlanValidator
 from ai_os.security.capabilities import Capability
 from ai_os.security.policy import PolicyEngine, PolicyError
 from ai_os.planner.simple_planner import SimplePlanner
 from ai_os.observability.logger import get_logger
-from ai_os.persistence.db import get_conn
+from ai_os.persistence.db import transaction
 
 logger = get_logger("planner.dispatcher")
 
@@ -17,6 +22,25 @@ FORBIDDEN_KEYWORDS = [
     "kill",
 ]
 
+# The deterministic fallback is cheap, and caching it would keep
+# serving it after the LLM planners recover
+CACHEABLE_PLANNERS = {"local", "cloud"}
+
+
+def _arguments_in_goal(plan: Plan, goal: str) -> bool:
+    """
+    A paraphrase shares intent, not specifics: a plan carrying free-form
+    arguments (the text of an echo) is only reused if every argument
+    also appears, as whole words, in the new goal.
+    """
+    goal = normalize_goal(goal)
+    for step in plan.steps:
+        for arg in step.params.get("command", [])[1:]:
+            arg = normalize_goal(str(arg))
+            if arg and not re.search(rf"(?<!\w){re.escape(arg)}(?!\w)", goal):
+                return False
+    return True
+
 
 class PlannerDispatcher:
     def __init__(
@@ -24,80 +48,225 @@ class PlannerDispatcher:
         local_planner: LLMPlanner,
         cloud_planner: LLMPlanner | None,
         policy: PolicyEngine,
+        cache: Optional[PlanCache] = None,
+        index: Optional[SemanticPlanIndex] = None,
     ):
         self.local = local_planner
         self.cloud = cloud_planner
         self.policy = policy
+        self.cache = cache
+        self.index = index
         self.simple = SimplePlanner()
+        self.validator = PlanValidator()
 
     def _persist_plan(self, goal: str, planner_used: str, duration_ms: float):
-        conn = get_conn()
-        cur = conn.cursor()
-
-        cur.execute(
-            """
-            INSERT INTO plans (goal, planner_used, created_at)
-            VALUES (?, ?, ?)
-            """,
-            (goal, planner_used, time.time()),
-        )
-
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO plans (goal, planner_used, created_at)
+                VALUES (?, ?, ?)
+                """,
+                (goal, planner_used, time.time()),
+            )
 
         logger.info(
             f"Plan persisted | planner={planner_used} | duration={duration_ms:.2f}ms"
         )
 
+    def _check_reusable(self, plan: Plan, planner: str, role):
+        """
+        A stored plan is re-validated and re-authorized on every reuse,
+        so tightened rules or a different role never reuse it blindly.
+        """
+        if planner == "cloud":
+            self.policy.check(role, Capability.USE_CLOUD_LLM)
+        self.validator.validate(plan)
+
+    def _cached_plan(self, goal: str, role) -> Optional[Tuple[Plan, str]]:
+        if self.cache is None:
+            return None
+
+        hit = self.cache.get(goal)
+        if hit is None:
+            return None
+
+        plan, planner = hit
+        try:
+            self._check_reusable(plan, planner, role)
+        except PolicyError:
+            return None
+        except PlanValidationError as e:
+            logger.warning(f"Cached plan no longer valid, dropping it | error={e}")
+            self.cache.invalidate(goal)
+            return None
+
+        self.cache.record(planner, hit=True)
+        return plan, planner
+
+    def _similar_plan(self, goal: str, role) -> Optional[SemanticMatch]:
+        """
+        Best stored plan for a paraphrase of a goal planned before, as
+        long as its arguments fit the new goal.
+        """
+        if self.index is None:
+            return None
+
+        try:
+            matches = self.index.search(goal)
+        except Exception as e:
+            logger.warning(f"Semantic plan lookup failed | error={e}")
+            return None
+
+        for match in matches:
+            if not _arguments_in_goal(match.plan, goal):
+                continue
+            try:
+                self._check_reusable(match.plan, match.planner, role)
+            except (PolicyError, PlanValidationError):
+                continue
+            self.index.record(hit=True)
+            match.plan.goal = goal
+            # Next time this exact wording is a plain cache hit
+            if self.cache is not None:
+                self.cache.put(goal, match.plan, match.planner)
+            return match
+
+        self.index.record(hit=False)
+        return None
+
+    def _remember(self, goal: str, plan: Plan, planner: str):
+        if self.cache is not None:
+            self.cache.record(planner, hit=False)
+        if planner not in CACHEABLE_PLANNERS:
+            return
+        if self.cache is not None:
+            self.cache.put(goal, plan, planner)
+        if self.index is not None:
+            try:
+                self.index.add(goal, plan, planner)
+            except Exception as e:
+                logger.warning(f"Could not index plan | error={e}")
+
     def _check_goal_safety(self, goal: str):
         if any(word in goal.lower() for word in FORBIDDEN_KEYWORDS):
             raise PlanValidationError("Unsafe goal detected")
 
-    def plan(self, goal: str, role):
+    def plan(self, goal: str, role, on_event: Optional[Callable[[str, dict], None]] = None):
         """
         Planning strategy:
 
+        Plan cache (if configured)
+          ↓
+        Semantic plan index (if configured)
+          ↓
         Local LLM (x2)
           ↓
         Cloud LLM (if allowed)
           ↓
         Deterministic SimplePlanner
+
+        on_event(name, data) is called as each attempt starts, fails or succeeds.
         """
+        plan = self.reuse(goal, role, on_event)
+        if plan is not None:
+            return plan
+        return self.generate(goal, role, on_event)
+
+    def reuse(
+        self, goal: str, role, on_event: Optional[Callable[[str, dict], None]] = None
+    ) -> Optional[Plan]:
+        """
+        Stored plan for this goal, or None.
+        - lookups only, no generation: callers run this outside the
+          LLM pool so hits never queue behind a slow plan
+        """
+        emit = on_event or (lambda name, data: None)
 
         logger.info(f"Starting plan dispatch | goal='{goal}' | role={role}")
 
         # 🔒 Fail fast on unsafe intent
         self._check_goal_safety(goal)
 
+        # 0️⃣ Cache
+        start = time.time()
+        cached = self._cached_plan(goal, role)
+        if cached:
+            plan, planner = cached
+            duration = (time.time() - start) * 1000
+            logger.info(f"Plan cache hit in {duration:.2f}ms | planner={planner}")
+            self._persist_plan(goal, f"cache:{planner}", duration)
+            emit("planner_succeeded", {
+                "planner": planner, "attempt": 0, "duration_ms": duration, "cached": True,
+            })
+            return plan
+
+        # Paraphrase of a goal planned before
+        start = time.time()
+        match = self._similar_plan(goal, role)
+        if match:
+            duration = (time.time() - start) * 1000
+            logger.info(
+                f"Semantic plan match in {duration:.2f}ms | planner={match.planner} | "
+                f"score={match.score:.3f} | matched='{match.goal}'"
+            )
+            self._persist_plan(goal, f"semantic:{match.planner}", duration)
+            emit("planner_succeeded", {
+                "planner": match.planner, "attempt": 0, "duration_ms": duration,
+                "cached": True, "similarity": match.score, "matched_goal": match.goal,
+            })
+            return match.plan
+
+        return None
+
+    def generate(
+        self, goal: str, role, on_event: Optional[Callable[[str, dict], None]] = None
+    ) -> Plan:
+        """
+        Plan a goal reuse() had nothing for.
+        """
+        emit = on_event or (lambda name, data: None)
+
+        # Also checked here for callers that skip reuse()
+        self._check_goal_safety(goal)
+
         # 1️⃣ Local attempt 1
         logger.info("Attempting local planner (attempt 1)")
+        emit("planner_started", {"planner": "local", "attempt": 1})
         start = time.time()
         try:
             plan = self.local.plan(goal)
             duration = (time.time() - start) * 1000
             logger.info(f"Local planner succeeded in {duration:.2f}ms")
             self._persist_plan(goal, "local", duration)
+            self._remember(goal, plan, "local")
+            emit("planner_succeeded", {"planner": "local", "attempt": 1, "duration_ms": duration})
             return plan
-        except PlanValidationError:
+        except PlanValidationError as e:
             duration = (time.time() - start) * 1000
             logger.warning(f"Local planner failed in {duration:.2f}ms")
+            emit("planner_failed", {"planner": "local", "attempt": 1, "duration_ms": duration, "error": str(e)})
 
         # 2️⃣ Local retry
         logger.warning("Retrying local planner (attempt 2)")
+        emit("planner_started", {"planner": "local", "attempt": 2})
         start = time.time()
         try:
             plan = self.local.plan(goal)
             duration = (time.time() - start) * 1000
             logger.info(f"Local retry succeeded in {duration:.2f}ms")
             self._persist_plan(goal, "local", duration)
+            self._remember(goal, plan, "local")
+            emit("planner_succeeded", {"planner": "local", "attempt": 2, "duration_ms": duration})
             return plan
-        except PlanValidationError:
+        except PlanValidationError as e:
             duration = (time.time() - start) * 1000
             logger.warning(f"Local retry failed in {duration:.2f}ms")
+            emit("planner_failed", {"planner": "local", "attempt": 2, "duration_ms": duration, "error": str(e)})
 
         # 3️⃣ Cloud fallback
         logger.warning("Attempting cloud planner fallback")
         if self.cloud:
+            emit("planner_started", {"planner": "cloud", "attempt": 1})
             try:
                 self.policy.check(role, Capability.USE_CLOUD_LLM)
                 start = time.time()
@@ -105,25 +274,33 @@ class PlannerDispatcher:
                 duration = (time.time() - start) * 1000
                 logger.info(f"Cloud planner succeeded in {duration:.2f}ms")
                 self._persist_plan(goal, "cloud", duration)
+                self._remember(goal, plan, "cloud")
+                emit("planner_succeeded", {"planner": "cloud", "attempt": 1, "duration_ms": duration})
                 return plan
             except PolicyError as e:
                 logger.error("Cloud usage blocked by policy")
+                emit("planner_failed", {"planner": "cloud", "attempt": 1, "error": str(e)})
                 raise PlanValidationError(str(e))
-            except PlanValidationError:
+            except PlanValidationError as e:
                 duration = (time.time() - start) * 1000
                 logger.warning(f"Cloud planner failed in {duration:.2f}ms")
+                emit("planner_failed", {"planner": "cloud", "attempt": 1, "duration_ms": duration, "error": str(e)})
 
         # 4️⃣ Deterministic fallback
         logger.warning("Falling back to deterministic SimplePlanner")
+        emit("planner_started", {"planner": "simple", "attempt": 1})
         start = time.time()
         try:
             plan = self.simple.plan(goal)
             duration = (time.time() - start) * 1000
             logger.info(f"Simple planner succeeded in {duration:.2f}ms")
             self._persist_plan(goal, "simple", duration)
+            self._remember(goal, plan, "simple")
+            emit("planner_succeeded", {"planner": "simple", "attempt": 1, "duration_ms": duration})
             return plan
-        except Exception:
+        except Exception as e:
             duration = (time.time() - start) * 1000
+            emit("planner_failed", {"planner": "simple", "attempt": 1, "duration_ms": duration, "error": str(e)})
             logger.error(
                 f"All planning strategies failed | total_time={duration:.2f}ms"
             )
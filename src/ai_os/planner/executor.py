@@ -1,30 +1,143 @@
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from ai_os.config import Config
+from ai_os.tasks.task import Task, TaskStatus
 from ai_os.tasks.task_manager import TaskManager
 from ai_os.executors.command_executor import CommandExecutor
+from ai_os.observability.logger import get_logger
+
+logger = get_logger("planner.executor")
 
 
 class PlanExecutor:
-    def __init__(self, task_manager: TaskManager, command_executor: CommandExecutor):
+    """
+    Runs a plan's steps as a DAG.
+    - A step starts once every step in its depends_on has completed
+    - Up to max_parallelism ready steps of one plan run at once, on
+      threads of that execute() call (1 = strictly sequential, in step
+      order); concurrent plans don't share the limit
+    - Plans that set no id/depends_on run sequentially, every step
+      regardless of earlier failures, as before plans had edges
+    - When a step fails, everything downstream of it is CANCELLED
+    - Each step's task records started_at / finished_at
+    - on_event(name, data) reports task_started / task_finished; once
+      `cancel` is set no new step starts and the rest are CANCELLED
+    """
+
+    def __init__(
+        self,
+        task_manager: TaskManager,
+        command_executor: CommandExecutor,
+        max_parallelism: int = Config.PLAN_MAX_PARALLELISM,
+    ):
         self.task_manager = task_manager
         self.command_executor = command_executor
+        self.max_parallelism = max(1, max_parallelism)
+
+    def _run_step(self, step_id: str, task: Task, emit: Callable) -> Task:
+        try:
+            self.task_manager.mark_running(task)
+            emit("task_started", {
+                "step": step_id,
+                "task_id": task.id,
+                "command": task.payload.get("command"),
+            })
+            task.result = self.command_executor.run(task.payload["command"])
+            task.status = TaskStatus.COMPLETED
+        except Exception as e:
+            task.status = TaskStatus.FAILED
+            task.error = str(e)
+
+        self.task_manager.update_task(task)
+        return task
 
-    def execute(self, plan):
-        results = []
+    def execute(
+        self,
+        plan,
+        on_event: Optional[Callable[[str, dict], None]] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> List[Task]:
+        emit = on_event or (lambda name, data: None)
 
         for step in plan.steps:
-            if step.action == "command":
-                task = self.task_manager.create_task("command", step.params)
-                try:
-                    task.status = "running"
-                    task.result = self.command_executor.run(step.params["command"])
-                    task.status = "completed"
-                except Exception as e:
-                    task.status = "failed"
-                    task.error = str(e)
+            if step.action != "command":
+                raise ValueError(f"Unsupported action: {step.action}")
+
+        ids = plan.step_ids()
+        deps = plan.dependencies()
+
+        children: Dict[str, List[str]] = {step_id: [] for step_id in ids}
+        remaining = {}
+        for step_id, parents in deps.items():
+            remaining[step_id] = len(set(parents))
+            for parent in set(parents):
+                children[parent].append(step_id)
+
+        # Created up front so the whole plan is visible as PENDING
+        tasks = {
+            step_id: self.task_manager.create_task("command", step.params)
+            for step_id, step in zip(ids, plan.steps)
+        }
 
+        parallelism = min(self.max_parallelism, len(ids)) if plan.is_graph() else 1
+        ready = deque(step_id for step_id in ids if remaining[step_id] == 0)
+        running = {}
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, parallelism), thread_name_prefix="plan-step"
+        ) as pool:
+            while ready or running:
+                if cancel is not None and cancel.is_set():
+                    ready.clear()
+                    if not running:
+                        break
+
+                while ready and len(running) < parallelism:
+                    step_id = ready.popleft()
+                    future = pool.submit(self._run_step, step_id, tasks[step_id], emit)
+                    running[future] = step_id
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step_id = running.pop(future)
+                    task = future.result()
+
+                    logger.info(
+                        f"Plan step finished | step={step_id} | status={task.status} "
+                        f"| duration_ms={(task.finished_at - task.started_at) * 1000:.1f}"
+                    )
+                    emit("task_finished", {"step": step_id, "task": task.model_dump()})
+
+                    if task.status == TaskStatus.COMPLETED:
+                        for child in children[step_id]:
+                            remaining[child] -= 1
+                            # Skip children already cancelled by another parent
+                            if remaining[child] == 0 and tasks[child].status == TaskStatus.PENDING:
+                                ready.append(child)
+                    else:
+                        self._cancel_downstream(step_id, children, tasks)
+
+        # Only reached with steps left over when cancelled
+        for task in tasks.values():
+            if task.status == TaskStatus.PENDING:
+                task.status = TaskStatus.CANCELLED
+                task.error = "Plan cancelled"
                 self.task_manager.update_task(task)
-                results.append(task)
 
-            else:
-                raise ValueError(f"Unsupported action: {step.action}")
+        return [tasks[step_id] for step_id in ids]
+
+    def _cancel_downstream(self, failed: str, children: Dict[str, List[str]], tasks: Dict[str, Task]):
+        stack = list(children[failed])
+        while stack:
+            step_id = stack.pop()
+            task = tasks[step_id]
+            if task.status != TaskStatus.PENDING:
+                continue  # already cancelled via another failed parent
 
-        return results
+            task.status = TaskStatus.CANCELLED
+            task.error = f"Dependency {failed} failed"
+            self.task_manager.update_task(task)
+            stack.extend(children[step_id])
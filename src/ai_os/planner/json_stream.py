@@ -0,0 +1,85 @@
+import json
+from typing import Callable, Optional
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+class JSONObjectStream:
+    """
+    Incremental scanner for one top-level JSON object arriving in chunks.
+    - feed() returns True once the object has closed; anything after
+      it is ignored, so the caller can stop generating right there
+    - each object directly inside a top-level array (a plan's steps)
+      is parsed and handed to on_item as soon as it closes
+    - anything but whitespace before the opening brace, or a
+      mismatched bracket, fails at once
+    Only structure is tracked (strings, escapes, nesting); result()
+    still goes through json.loads.
+    """
+
+    def __init__(self, on_item: Optional[Callable[[dict], None]] = None):
+        self.on_item = on_item
+        self.text = ""
+        self.done = False
+        self.items = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._item_start: Optional[int] = None
+        self._end = 0
+
+    def feed(self, chunk: str) -> bool:
+        if self.done:
+            return True
+
+        start = len(self.text)
+        self.text += chunk
+        for i in range(start, len(self.text)):
+            ch = self.text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if not self._stack:
+                if ch.isspace():
+                    continue
+                if ch != "{":
+                    raise JSONStreamError(f"Expected a JSON object, got {self.text[:20]!r}")
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._stack.append(ch)
+                if ch == "{" and self._stack == ["{", "[", "{"]:
+                    self._item_start = i
+            elif ch in "}]":
+                opened = self._stack.pop() if self._stack else None
+                if (opened, ch) not in (("{", "}"), ("[", "]")):
+                    raise JSONStreamError(f"Unexpected {ch!r} at offset {i}")
+
+                if ch == "}" and self._stack == ["{", "["] and self._item_start is not None:
+                    item = json.loads(self.text[self._item_start : i + 1])
+                    self._item_start = None
+                    self.items += 1
+                    if self.on_item is not None:
+                        self.on_item(item)
+
+                if not self._stack:
+                    self.done = True
+                    self._end = i + 1
+                    return True
+        return False
+
+    def result(self) -> str:
+        """
+        The object's text once done, otherwise everything seen so far.
+        """
+        return self.text[: self._end] if self.done else self.text
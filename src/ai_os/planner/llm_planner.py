@@ -1,65 +1,126 @@
 import json
+from ai_os.executors.command_executor import CommandExecutor
 from ai_os.planner.base import BasePlanner
-from ai_os.planner.plan import Plan
+from ai_os.planner.json_stream import JSONObjectStream
+from ai_os.planner.plan import Plan, PlanStep, plan_json_schema
 from ai_os.planner.validator import PlanValidator, PlanValidationError
 from ai_os.planner.repair import PlanRepairer
 from ai_os.llm.local import LocalLLMClient
+from ai_os.observability.logger import get_logger
 import os
 
+logger = get_logger("planner.llm")
+
+PROMPT_PREFIX = """
+You are a deterministic planning engine.
+
+You MUST output ONLY valid JSON.
+Do NOT include explanations.
+Do NOT include markdown.
+Do NOT include text before or after JSON.
+
+The JSON MUST match this schema exactly, with "goal" set to the goal
+given at the end:
+
+{
+  "goal": "<goal>",
+  "steps": [
+    {
+      "action": "command",
+      "params": {
+        "command": ["ls"]
+      }
+    }
+  ]
+}
+
+Rules:
+- Only use action "command"
+- Only use commands: ls, pwd, echo
+- Steps run in order. To let independent steps run in parallel,
+  give steps an "id" and list in "depends_on" the ids of steps that
+  must finish first
+- If you cannot create a valid plan, return EXACTLY this JSON:
+
+{
+  "goal": "<goal>",
+  "steps": []
+}
+
+"""
+
+
 class LLMPlanner(BasePlanner):
-    def __init__(self, llm_client):
+    def __init__(self, llm_client, constrained: bool = False, streaming: bool = False):
+        """
+        constrained: the client decodes against the Plan JSON schema
+        (LocalLLMClient only), so output always parses.
+        streaming: read the client's generate_stream() and stop as soon
+        as the plan object closes or a step fails validation.
+        """
         self.llm = llm_client
         self.validator = PlanValidator()
         self.repairer = PlanRepairer()
+        self.constrained = constrained
+        self.streaming = streaming
+        self.commands = {
+            name: args
+            for name, args in CommandExecutor.ALLOWED_COMMANDS.items()
+            if name in PlanValidator.ALLOWED_COMMANDS
+        }
 
     def plan(self, goal: str) -> Plan:
         
     
         prompt = self._build_prompt(goal)
-        raw = self.llm.generate(prompt)
+        kwargs = {}
+        if self.constrained:
+            kwargs["json_schema"] = plan_json_schema(
+                PlanValidator.ALLOWED_ACTIONS, self.commands
+            )
+        if self.streaming:
+            raw = self._generate_streaming(prompt, kwargs)
+        else:
+            raw = self.llm.generate(prompt, **kwargs)
 
         try:
             data = json.loads(raw)
             plan = Plan(**data)
+            # Whatever the model echoed, the plan is for this goal
+            plan.goal = goal
             plan = self.repairer.repair(plan)
             self.validator.validate(plan)
             return plan
         except Exception as e:
             raise PlanValidationError(str(e))
 
-    def _build_prompt(self, goal: str) -> str:
-      return f"""
-    You are a deterministic planning engine.
-
-    You MUST output ONLY valid JSON.
-    Do NOT include explanations.
-    Do NOT include markdown.
-    Do NOT include text before or after JSON.
-
-    The JSON MUST match this schema exactly:
-
-    {{
-      "goal": "{goal}",
-      "steps": [
-        {{
-          "action": "command",
-          "params": {{
-            "command": ["ls"]
-          }}
-        }}
-      ]
-    }}
-
-    Rules:
-    - Only use action "command"
-    - Only use commands: ls, pwd, echo
-    - If you cannot create a valid plan, return EXACTLY this JSON:
-
-    {{
-      "goal": "{goal}",
-      "steps": []
-    }}
-
-    Now produce the JSON plan.
-    """
+    def _generate_streaming(self, prompt: str, kwargs: dict) -> str:
+        scanner = JSONObjectStream(on_item=self._check_step)
+        stream = self.llm.generate_stream(prompt, **kwargs)
+        try:
+            for chunk in stream:
+                if scanner.feed(chunk):
+                    break
+        except (ValueError, PlanValidationError) as e:
+            logger.info(
+                f"Plan generation aborted | chars={len(scanner.text)} | "
+                f"steps={scanner.items} | error={e}"
+            )
+            raise PlanValidationError(str(e))
+        finally:
+            # Stops generation if we broke out early
+            stream.close()
 
+        return scanner.result()
+
+    def _check_step(self, item: dict):
+        try:
+            step = PlanStep(**item)
+        except ValueError as e:
+            raise PlanValidationError(f"Invalid step: {e}")
+        self.validator.validate_step(self.repairer.repair_step(step))
+
+    def _build_prompt(self, goal: str) -> str:
+        # Static preamble first: the local client keeps its evaluated
+        # KV state, so only the goal line is evaluated per request
+        return f"{PROMPT_PREFIX}Goal: {goal}\nJSON plan:\n"
@@ -1,12 +1,88 @@
-from typing import List, Dict
+from typing import Dict, Iterable, List, Optional, Union
 from pydantic import BaseModel
 
+MAX_SCHEMA_STEPS = 16
+MAX_SCHEMA_STRING = 128
+MAX_SCHEMA_ID = 32
+
 
 class PlanStep(BaseModel):
     action: str
     params: Dict
+    # Defaults to the step's index; depends_on lists ids of steps that
+    # must complete first. Only plans that use either run as a graph
+    # (see Plan.is_graph); others run in step order.
+    id: Optional[str] = None
+    depends_on: List[Union[str, int]] = []
 
 
 class Plan(BaseModel):
     goal: str
     steps: List[PlanStep]
+
+    def is_graph(self) -> bool:
+        """
+        True once any step sets an id or depends_on. Plans without
+        either keep the original sequential semantics.
+        """
+        return any(step.id is not None or step.depends_on for step in self.steps)
+
+    def step_ids(self) -> List[str]:
+        return [step.id or str(i) for i, step in enumerate(self.steps)]
+
+    def dependencies(self) -> Dict[str, List[str]]:
+        return {
+            step_id: [str(dep) for dep in step.depends_on]
+            for step_id, step in zip(self.step_ids(), self.steps)
+        }
+
+
+def _command_schema(commands: Dict[str, List[str]]) -> Dict:
+    # One array shape per command: bare, or (for "*" commands) with a
+    # single argument string
+    shapes = []
+    for name in sorted(commands):
+        shapes.append({"type": "array", "prefixItems": [{"const": name}]})
+        if commands[name] == ["*"]:
+            shapes.append({
+                "type": "array",
+                "prefixItems": [{"const": name}, {"type": "string", "maxLength": MAX_SCHEMA_STRING}],
+            })
+    return {"anyOf": shapes}
+
+
+def plan_json_schema(
+    actions: Iterable[str],
+    commands: Dict[str, List[str]],
+) -> Dict:
+    """
+    JSON schema for constrained decoding, derived from Plan and narrowed:
+    - known actions only, and commands from the allow-list
+      (command name -> allowed args, as in CommandExecutor)
+    - no extra keys; bounded strings and step counts, so sampling
+      can't run on until max_tokens
+    - no user text: the schema is compiled to a grammar, and goals
+      aren't grammar-safe literals; callers overwrite plan.goal
+    PlanValidator still has the final word (dependency graph).
+    """
+    schema = Plan.model_json_schema()
+    schema["additionalProperties"] = False
+    schema["properties"]["goal"] = {"type": "string", "maxLength": MAX_SCHEMA_STRING}
+    schema["properties"]["steps"]["maxItems"] = MAX_SCHEMA_STEPS
+
+    step = schema["$defs"]["PlanStep"]
+    step["additionalProperties"] = False
+    step["properties"]["action"] = {"enum": sorted(actions)}
+    step["properties"]["params"] = {
+        "type": "object",
+        "properties": {"command": _command_schema(commands)},
+        "required": ["command"],
+        "additionalProperties": False,
+    }
+    step["properties"]["id"] = {
+        "anyOf": [{"type": "string", "maxLength": MAX_SCHEMA_ID}, {"type": "null"}],
+    }
+    step["properties"]["depends_on"]["items"] = {
+        "anyOf": [{"type": "string", "maxLength": MAX_SCHEMA_ID}, {"type": "integer"}],
+    }
+    return schema
@@ -1,4 +1,4 @@
-from ai_os.planner.plan import Plan
+from ai_os.planner.plan import Plan, PlanStep
 
 class PlanRepairer:
     
@@ -9,11 +9,14 @@ class PlanRepairer:
 
     def repair(self , plan : Plan) -> Plan:
         for step in plan.steps:
+            self.repair_step(step)
+        return plan
 
-            if step.action == "command":
-                cmd = step.params.get("command")
+    def repair_step(self, step: PlanStep) -> PlanStep:
+        if step.action == "command":
+            cmd = step.params.get("command")
 
-                # Normalize: "ls" -> ["ls"]
-                if isinstance(cmd, str):
-                    step.params["command"] = [cmd]
-        return plan
+            # Normalize: "ls" -> ["ls"]
+            if isinstance(cmd, str):
+                step.params["command"] = [cmd]
+        return step
@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from ai_os.planner.plan import Plan
+from ai_os.observability.logger import get_logger
+
+logger = get_logger("planner.semantic_index")
+
+# A new goal this close to an indexed one adds nothing
+DUPLICATE_SCORE = 0.995
+
+
+class SemanticMatch:
+    def __init__(self, goal: str, plan: Plan, planner: str, score: float):
+        self.goal = goal
+        self.plan = plan
+        self.planner = planner
+        self.score = score
+
+
+class SemanticPlanIndex:
+    """
+    Goal embeddings of previously successful plans, so paraphrased
+    goals can reuse them.
+    - vectors.f32: L2-normalized float32 rows, memory-mapped, so
+      opening the index costs the same at any size and a lookup is
+      one matrix-vector product
+    - plans.jsonl + offsets.u64: row i's plan starts at offsets[i];
+      only matched plans are ever read
+    - meta.json: embedding model and dimension; a mismatch starts a
+      fresh index
+    Rows are append-only. A crash mid-append is trimmed on load.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        embed: Callable[[str], Optional[np.ndarray]],
+        model: str,
+        threshold: float,
+        top_k: int = 5,
+        max_entries: int = 100_000,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.embed = embed
+        self.model = model
+        self.threshold = threshold
+        self.top_k = top_k
+        self.max_entries = max_entries
+
+        self._vectors_path = self.root / "vectors.f32"
+        self._offsets_path = self.root / "offsets.u64"
+        self._plans_path = self.root / "plans.jsonl"
+        self._meta_path = self.root / "meta.json"
+
+        self._lock = threading.Lock()
+        self.dim: Optional[int] = None
+        self._rows = 0
+        self._vectors: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+
+        self.hits = 0
+        self.misses = 0
+
+        self._load()
+
+    # ----------------------------
+    # Files
+    # ----------------------------
+    def _load(self):
+        if not self._meta_path.exists():
+            return
+
+        meta = json.loads(self._meta_path.read_text())
+        if meta.get("model") != self.model:
+            logger.warning(
+                f"Plan index was built with '{meta.get('model')}', "
+                f"now using '{self.model}'; starting a fresh index"
+            )
+            self._reset()
+            return
+
+        self.dim = meta["dim"]
+        vector_rows = self._size(self._vectors_path) // (self.dim * 4)
+        offset_rows = self._size(self._offsets_path) // 8
+        rows = min(vector_rows, offset_rows)
+
+        # Trim a half-written append so new rows stay aligned
+        if self._size(self._vectors_path) != rows * self.dim * 4:
+            os.truncate(self._vectors_path, rows * self.dim * 4)
+        if self._size(self._offsets_path) != rows * 8:
+            os.truncate(self._offsets_path, rows * 8)
+
+        self._remap(rows)
+        logger.info(f"Plan index loaded | rows={rows} | dim={self.dim}")
+
+    def _reset(self):
+        for path in (self._vectors_path, self._offsets_path, self._plans_path, self._meta_path):
+            path.unlink(missing_ok=True)
+        self.dim = None
+        self._remap(0)
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        return path.stat().st_size if path.exists() else 0
+
+    def _remap(self, rows: int):
+        self._rows = rows
+        if rows == 0:
+            self._vectors = self._offsets = None
+            return
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim)
+        )
+        self._offsets = np.memmap(self._offsets_path, dtype=np.uint64, mode="r", shape=(rows,))
+
+    def _read_row(self, row: int) -> Dict:
+        with open(self._plans_path, "rb") as f:
+            f.seek(int(self._offsets[row]))
+            return json.loads(f.readline())
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+    def _query(self, goal: str) -> Optional[np.ndarray]:
+        vec = self.embed(goal)
+        if vec is None:
+            return None
+        vec = np.asarray(vec, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm > 0 else None
+
+    def _top(self, query: np.ndarray, k: int):
+        scores = self._vectors @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def search(self, goal: str) -> List[SemanticMatch]:
+        """
+        Up to top_k stored plans scoring at least threshold, best first.
+        Empty when the embedding model isn't available.
+        """
+        query = self._query(goal)
+        with self._lock:
+            if query is None or self._rows == 0 or query.shape[0] != self.dim:
+                return []
+            top = self._top(query, self.top_k)
+
+            matches = []
+            for row, score in top:
+                if score < self.threshold:
+                    break
+                stored = self._read_row(row)
+                matches.append(SemanticMatch(
+                    stored["goal"], Plan(**stored["plan"]), stored["planner"], score
+                ))
+        return matches
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # ----------------------------
+    # Store
+    # ----------------------------
+    def add(self, goal: str, plan: Plan, planner: str) -> bool:
+        query = self._query(goal)
+        if query is None:
+            return False
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(query.shape[0])
+                self._meta_path.write_text(json.dumps({"model": self.model, "dim": self.dim}))
+            if query.shape[0] != self.dim:
+                return False
+            if self._rows >= self.max_entries:
+                return False
+            if self._rows and self._top(query, 1)[0][1] >= DUPLICATE_SCORE:
+                return False
+
+            # Plan first, then its offset, then the vector: a row only
+            # counts once all three are on disk
+            record = json.dumps({"goal": goal, "planner": planner, "plan": plan.model_dump()})
+            with open(self._plans_path, "ab") as f:
+                offset = f.tell()
+                f.write(record.encode("utf-8") + b"\n")
+            with open(self._offsets_path, "ab") as f:
+                f.write(np.array([offset], dtype=np.uint64).tobytes())
+            with open(self._vectors_path, "ab") as f:
+                f.write(query.tobytes())
+
+            self._remap(self._rows + 1)
+        return True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._rows,
+                "dim": self.dim,
+                "model": self.model,
+                "threshold": self.threshold,
+                "bytes": self._rows * (self.dim or 0) * 4,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
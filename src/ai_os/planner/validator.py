@@ -1,4 +1,6 @@
-from ai_os.planner.plan import Plan
+from collections import deque
+
+from ai_os.planner.plan import Plan, PlanStep
 
 
 class PlanValidationError(Exception):
@@ -14,33 +16,80 @@ class PlanValidator:
             raise PlanValidationError("Plan has no steps")
 
         for step in plan.steps:
-            if step.action not in self.ALLOWED_ACTIONS:
+            self.validate_step(step)
+
+        self._validate_dependencies(plan)
+
+    def validate_step(self, step: PlanStep) -> None:
+        """
+        Checks that need only the step itself, so streamed plans can
+        be rejected as soon as a bad step appears.
+        """
+        if step.action not in self.ALLOWED_ACTIONS:
+            raise PlanValidationError(
+                f"Action not allowed: {step.action}"
+            )
+
+        if step.action == "command":
+            params = step.params
+
+            if "command" not in params:
+                raise PlanValidationError("Missing command")
+
+            command = params["command"]
+
+            # 🔒 ENFORCE LIST[str]
+            if isinstance(command, str):
+                raise PlanValidationError(
+                    "command must be a list, not a string"
+                )
+
+            if not isinstance(command, list) or not command:
                 raise PlanValidationError(
-                    f"Action not allowed: {step.action}"
+                    "command must be a non-empty list"
                 )
 
-            if step.action == "command":
-                params = step.params
+            cmd_name = command[0]
 
-                if "command" not in params:
-                    raise PlanValidationError("Missing command")
+            if cmd_name not in self.ALLOWED_COMMANDS:
+                raise PlanValidationError(
+                    f"Command not allowed: {cmd_name}"
+                )
 
-                command = params["command"]
+    def _validate_dependencies(self, plan: Plan) -> None:
+        ids = plan.step_ids()
+        if len(set(ids)) != len(ids):
+            raise PlanValidationError("Step ids must be unique")
 
-                # 🔒 ENFORCE LIST[str]
-                if isinstance(command, str):
+        deps = plan.dependencies()
+        for step_id, parents in deps.items():
+            for parent in parents:
+                if parent not in deps:
                     raise PlanValidationError(
-                        "command must be a list, not a string"
+                        f"Step {step_id} depends on unknown step {parent}"
                     )
+                if parent == step_id:
+                    raise PlanValidationError(f"Step {step_id} depends on itself")
 
-                if not isinstance(command, list) or not command:
-                    raise PlanValidationError(
-                        "command must be a non-empty list"
-                    )
+        # Kahn's algorithm: anything left unvisited sits on a cycle
+        remaining = {step_id: len(set(parents)) for step_id, parents in deps.items()}
+        children = {step_id: [] for step_id in deps}
+        for step_id, parents in deps.items():
+            for parent in set(parents):
+                children[parent].append(step_id)
 
-                cmd_name = command[0]
+        ready = deque(step_id for step_id, n in remaining.items() if n == 0)
+        visited = 0
+        while ready:
+            step_id = ready.popleft()
+            visited += 1
+            for child in children[step_id]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    ready.append(child)
 
-                if cmd_name not in self.ALLOWED_COMMANDS:
-                    raise PlanValidationError(
-                        f"Command not allowed: {cmd_name}"
-                    )
+        if visited != len(deps):
+            cyclic = sorted(step_id for step_id, n in remaining.items() if n > 0)
+            raise PlanValidationError(
+                f"Plan dependencies contain a cycle: {', '.join(cyclic)}"
+            )
@@ -5,4 +5,5 @@ class Capability(str, Enum):
     EXECUTE_COMMAND = "execute_command"
     READ_FILES = "read_files"
     WRITE_FILES = "write_files"
-    USE_CLOUD_LLM = "use_cloud_llm"
\ No newline at end of file
+    USE_CLOUD_LLM = "use_cloud_llm"
+    MANAGE_MODELS = "manage_models"
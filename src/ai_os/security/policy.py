@@ -9,6 +9,7 @@ ROLE_CAPABILITIES = {
         Capability.READ_FILES,
         Capability.WRITE_FILES,
         Capability.USE_CLOUD_LLM,
+        Capability.MANAGE_MODELS,
     },
     Role.USER: {
         Capability.READ_FILES,
@@ -0,0 +1,43 @@
+import asyncio
+import json
+from typing import AsyncIterator, Optional
+
+_CLOSE = object()
+
+
+def format_event(event: str, data) -> str:
+    """
+    One Server-Sent Events frame.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class EventChannel:
+    """
+    Hands events from worker threads to one async consumer.
+    - emit() is thread-safe and never blocks the producer
+    - events() yields SSE frames until close()
+    """
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop or asyncio.get_running_loop()
+        self._queue: "asyncio.Queue" = asyncio.Queue()
+
+    def emit(self, event: str, data: dict):
+        try:
+            self.loop.call_soon_threadsafe(self._queue.put_nowait, (event, data))
+        except RuntimeError:
+            pass  # loop closed: client is gone
+
+    def close(self):
+        try:
+            self.loop.call_soon_threadsafe(self._queue.put_nowait, _CLOSE)
+        except RuntimeError:
+            pass
+
+    async def events(self) -> AsyncIterator[str]:
+        while True:
+            item = await self._queue.get()
+            if item is _CLOSE:
+                return
+            yield format_event(*item)
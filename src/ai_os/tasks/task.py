@@ -1,3 +1,4 @@
+import time
 from enum import Enum
 from uuid import uuid4
 from typing import Optional, Dict
@@ -9,6 +10,8 @@ class TaskStatus(str, Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    # Never ran: a step it depended on failed
+    CANCELLED = "cancelled"
 
 
 class Task(BaseModel):
@@ -18,3 +21,9 @@ class Task(BaseModel):
     status: TaskStatus = TaskStatus.PENDING
     result: Optional[Dict] = None
     error: Optional[str] = None
+    created_at: float = Field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # Set only for tasks submitted to the async TaskQueue
+    priority: Optional[int] = None
+    role: Optional[str] = None
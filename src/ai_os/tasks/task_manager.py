@@ -1,105 +1,381 @@
-from typing import Dict
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+import base64
+import threading
 import time
 import json
 
-from ai_os.tasks.task import Task
-from ai_os.persistence.db import get_conn
+from ai_os.config import Config
+from ai_os.tasks.task import Task, TaskStatus
+from ai_os.persistence.archive import ArchiveStore
+from ai_os.persistence.db import get_conn, transaction
+from ai_os.persistence.write_behind import WriteBehindQueue
+
+TERMINAL_STATUSES = {TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED}
+
+
+TASK_COLUMNS = """
+    id, type, status, payload, result, error,
+    created_at, started_at, finished_at, priority, role
+"""
+
+
+class TaskNotFoundError(KeyError):
+    pass
+
+
+class InvalidCursorError(ValueError):
+    pass
 
 
 class TaskManager:
-    def __init__(self):
-        self.tasks: Dict[str, Task] = {}
-        self._load_tasks_from_db()
+    """
+    Task store.
+    - Non-terminal tasks always stay in memory
+    - Terminal tasks live in a bounded LRU
+    - Anything else is looked up by primary key on demand, falling
+      back to the archive for tasks moved out by retention
+    Startup only loads tasks that are still pending/running, through
+    load_active() once the schema is migrated.
+    Listeners (add_listener) hear about every task update_task() leaves
+    terminal, whoever ran it.
+    """
+
+    def __init__(
+        self,
+        write_behind: WriteBehindQueue | None = None,
+        cache_size: int = Config.TASK_CACHE_SIZE,
+        archive: ArchiveStore | None = None,
+    ):
+        self._active: Dict[str, Task] = {}
+        self._recent: "OrderedDict[str, Task]" = OrderedDict()
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+
+        # None = write-through on the calling thread
+        self.write_behind = write_behind
+        self.archive = archive
+        self._listeners: List[Callable[[Task], None]] = []
+
+    def _write(self, sql: str, params: tuple):
+        if self.write_behind:
+            self.write_behind.submit(sql, params)
+            return
+
+        with transaction() as conn:
+            conn.execute(sql, params)
+
+    def add_listener(self, callback: Callable[[Task], None]):
+        self._listeners.append(callback)
+
+    def close(self):
+        if self.write_behind:
+            self.write_behind.close()
 
     # ----------------------------
-    # Internal: load persisted tasks
+    # Internal: in-memory cache
     # ----------------------------
-    def _load_tasks_from_db(self):
-        conn = get_conn()
-        cur = conn.cursor()
-        try :
-            cur.execute(
-                """
-                SELECT id, type, status, payload, result, error
-                FROM tasks
-                """
-            )
-        except Exception as e:
-            conn.close()
-            return 
-
-        rows = cur.fetchall()
-        for row in rows:
-            task = Task(
-                id=row[0],
-                type=row[1],
-                payload=json.loads(row[3]),
-            )
-            task.status = row[2]
-            task.result = json.loads(row[4]) if row[4] else None
-            task.error = row[5]
+    def _remember(self, task: Task):
+        with self._lock:
+            if task.status in TERMINAL_STATUSES:
+                self._active.pop(task.id, None)
+                self._recent[task.id] = task
+                self._recent.move_to_end(task.id)
+                while len(self._recent) > self.cache_size:
+                    self._recent.popitem(last=False)
+            else:
+                self._recent.pop(task.id, None)
+                self._active[task.id] = task
 
-            self.tasks[task.id] = task
+    def _cached(self, task_id: str) -> Optional[Task]:
+        with self._lock:
+            task = self._active.get(task_id)
+            if task is not None:
+                return task
+            task = self._recent.get(task_id)
+            if task is not None:
+                self._recent.move_to_end(task_id)
+            return task
 
-        conn.close()
+    @staticmethod
+    def _row_to_task(row) -> Task:
+        task = Task(
+            id=row[0],
+            type=row[1],
+            payload=json.loads(row[3]),
+        )
+        task.status = row[2]
+        task.result = json.loads(row[4]) if row[4] else None
+        task.error = row[5]
+        task.created_at = row[6]
+        task.started_at = row[7]
+        task.finished_at = row[8]
+        task.priority = row[9]
+        task.role = row[10]
+        return task
+
+    @staticmethod
+    def _record_to_task(record: Dict) -> Task:
+        # Archived rows keep the raw column values
+        return Task(
+            id=record["id"],
+            type=record["type"],
+            status=record["status"],
+            payload=json.loads(record["payload"]),
+            result=json.loads(record["result"]) if record.get("result") else None,
+            error=record.get("error"),
+            created_at=record["created_at"],
+            started_at=record.get("started_at"),
+            finished_at=record.get("finished_at"),
+            priority=record.get("priority"),
+            role=record.get("role"),
+        )
 
     # ----------------------------
-    # Create task (write-through)
+    # Load persisted tasks
     # ----------------------------
-    def create_task(self, task_type: str, payload: Dict) -> Task:
-        task = Task(type=task_type, payload=payload)
-        self.tasks[task.id] = task
+    def load_active(self) -> List[Task]:
+        """
+        (Re)loads pending/running tasks; history is fetched lazily by id.
+        Needs the migrated schema (init_db() first); DB errors propagate.
+        """
+        rows = get_conn().execute(
+            f"""
+            SELECT {TASK_COLUMNS}
+            FROM tasks
+            WHERE status IN (?, ?)
+            ORDER BY created_at
+            """,
+            (TaskStatus.PENDING.value, TaskStatus.RUNNING.value),
+        ).fetchall()
+
+        tasks = [self._row_to_task(row) for row in rows]
+        for task in tasks:
+            self._remember(task)
+        return tasks
 
-        conn = get_conn()
-        cur = conn.cursor()
+    def _fetch_from_db(self, task_id: str) -> Optional[Task]:
+        row = get_conn().execute(
+            f"""
+            SELECT {TASK_COLUMNS}
+            FROM tasks
+            WHERE id = ?
+            """,
+            (task_id,),
+        ).fetchone()
+        return self._row_to_task(row) if row else None
+
+    # ----------------------------
+    # Create task
+    # ----------------------------
+    def create_task(
+        self,
+        task_type: str,
+        payload: Dict,
+        priority: Optional[int] = None,
+        role: Optional[str] = None,
+    ) -> Task:
+        task = Task(type=task_type, payload=payload, priority=priority, role=role)
+        self._remember(task)
 
-        cur.execute(
+        self._write(
             """
-            INSERT INTO tasks (id, type, status, payload, created_at)
-            VALUES (?, ?, ?, ?, ?)
+            INSERT INTO tasks (id, type, status, payload, created_at, priority, role)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 task.id,
                 task.type,
                 task.status,
                 json.dumps(task.payload),
-                time.time(),
+                task.created_at,
+                task.priority,
+                task.role,
             ),
         )
 
-        conn.commit()
-        conn.close()
-
         return task
 
     # ----------------------------
     # Read task
     # ----------------------------
     def get_task(self, task_id: str) -> Task:
-        return self.tasks[task_id]
+        task = self._cached(task_id)
+        if task is not None:
+            return task
+
+        task = self._fetch_from_db(task_id)
+        if task is None and self.archive is not None:
+            record = self.archive.find_task(task_id)
+            if record is not None:
+                task = self._record_to_task(record)
+        if task is None:
+            raise TaskNotFoundError(task_id)
+
+        self._remember(task)
+        return task
 
     # ----------------------------
-    # Update task (write-through)
+    # Update task
     # ----------------------------
+    def mark_running(self, task: Task):
+        """
+        In-memory only; started_at is persisted with the next update_task.
+        """
+        task.status = TaskStatus.RUNNING
+        task.started_at = time.time()
+        self._remember(task)
+
     def update_task(self, task: Task):
-        self.tasks[task.id] = task
+        if task.status in TERMINAL_STATUSES and task.finished_at is None:
+            task.finished_at = time.time()
 
-        conn = get_conn()
-        cur = conn.cursor()
+        self._remember(task)
 
-        cur.execute(
-            """
-            UPDATE tasks
-            SET status = ?, result = ?, error = ?
-            WHERE id = ?
+        try:
+            self._write(
+                """
+                UPDATE tasks
+                SET status = ?, result = ?, error = ?,
+                    started_at = ?, finished_at = ?
+                WHERE id = ?
+                """,
+                (
+                    task.status,
+                    json.dumps(task.result) if task.result else None,
+                    task.error,
+                    task.started_at,
+                    task.finished_at,
+                    task.id,
+                ),
+            )
+        finally:
+            # Even if persisting failed: the task is done in memory
+            if task.status in TERMINAL_STATUSES:
+                for listener in self._listeners:
+                    listener(task)
+
+    # ----------------------------
+    # Query tasks
+    # ----------------------------
+    @staticmethod
+    def _encode_cursor(created_at: float, task_id: str) -> str:
+        raw = json.dumps([created_at, task_id]).encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple:
+        try:
+            created_at, task_id = json.loads(base64.urlsafe_b64decode(cursor))
+            return float(created_at), str(task_id)
+        except Exception:
+            raise InvalidCursorError("Invalid cursor")
+
+    @staticmethod
+    def _filters(
+        status: Optional[str],
+        task_type: Optional[str],
+        created_after: Optional[float],
+        created_before: Optional[float],
+    ) -> tuple[List[str], List]:
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if task_type:
+            clauses.append("type = ?")
+            params.append(task_type)
+        if created_after is not None:
+            clauses.append("created_at >= ?")
+            params.append(created_after)
+        if created_before is not None:
+            clauses.append("created_at < ?")
+            params.append(created_before)
+        return clauses, params
+
+    def list_tasks(
+        self,
+        status: Optional[str] = None,
+        task_type: Optional[str] = None,
+        created_after: Optional[float] = None,
+        created_before: Optional[float] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Dict:
+        """
+        Newest first, keyset-paginated on (created_at, id) so each page
+        is an index range scan regardless of how deep it is.
+        """
+        clauses, params = self._filters(
+            status, task_type, created_after, created_before
+        )
+
+        if cursor:
+            created_at, task_id = self._decode_cursor(cursor)
+            clauses.append("(created_at, id) < (?, ?)")
+            params += [created_at, task_id]
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = get_conn().execute(
+            f"""
+            SELECT {TASK_COLUMNS}
+            FROM tasks
+            {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
             """,
-            (
-                task.status,
-                json.dumps(task.result) if task.result else None,
-                task.error,
-                task.id,
-            ),
+            (*params, limit + 1),
+        ).fetchall()
+
+        tasks = [self._row_to_task(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = tasks[-1]
+            next_cursor = self._encode_cursor(last.created_at, last.id)
+
+        return {"tasks": tasks, "next_cursor": next_cursor}
+
+    def latency_stats(
+        self,
+        task_type: Optional[str] = None,
+        created_after: Optional[float] = None,
+        created_before: Optional[float] = None,
+    ) -> List[Dict]:
+        """
+        Run-time stats per type/status, computed in SQL.
+        """
+        clauses, params = self._filters(
+            None, task_type, created_after, created_before
         )
+        clauses.append("started_at IS NOT NULL AND finished_at IS NOT NULL")
+
+        rows = get_conn().execute(
+            f"""
+            SELECT type, status, COUNT(*),
+                   AVG(finished_at - started_at) * 1000,
+                   MAX(finished_at - started_at) * 1000
+            FROM tasks
+            WHERE {' AND '.join(clauses)}
+            GROUP BY type, status
+            """,
+            params,
+        ).fetchall()
+
+        return [
+            {
+                "type": row[0],
+                "status": row[1],
+                "count": row[2],
+                "avg_ms": round(row[3], 3),
+                "max_ms": round(row[4], 3),
+            }
+            for row in rows
+        ]
 
-        conn.commit()
-        conn.close()
+    def cache_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "active": len(self._active),
+                "recent": len(self._recent),
+                "max_recent": self.cache_size,
+            }
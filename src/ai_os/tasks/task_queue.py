@@ -0,0 +1,298 @@
+import asyncio
+import bisect
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from ai_os.executors.pools import PoolSaturatedError
+from ai_os.observability.logger import get_logger
+from ai_os.observability.metrics import LatencyStats
+from ai_os.tasks.task import Task, TaskStatus
+from ai_os.tasks.task_manager import TERMINAL_STATUSES, TaskManager
+
+logger = get_logger("tasks.queue")
+
+
+def parse_role_limits(spec: str) -> Dict[str, int]:
+    """
+    "user=1,admin=4" -> {"user": 1, "admin": 4}
+    """
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        role, _, value = item.partition("=")
+        limits[role.strip().lower()] = int(value)
+    return limits
+
+
+class TaskQueue:
+    """
+    Asynchronous task execution.
+    - submit() persists the task as PENDING and returns at once
+    - `workers` threads run queued tasks, highest priority first,
+      FIFO within a priority
+    - role_limits caps how many of one role's tasks run at once; a role
+      at its limit doesn't hold back other roles queued behind it
+    - Up to max_queue tasks wait; beyond that submit() raises
+      PoolSaturatedError
+    - priority is clamped to [-max_priority, max_priority], so no
+      caller can jump arbitrarily far ahead of everyone else
+    - wait() wakes on any task the task manager finishes, including
+      sync and plan-step tasks that never went through the queue
+    - recover() requeues PENDING tasks persisted by a previous process
+    """
+
+    def __init__(
+        self,
+        task_manager: TaskManager,
+        handlers: Dict[str, Callable[[Task], Dict]],
+        workers: int,
+        max_queue: int,
+        role_limits: Optional[Dict[str, int]] = None,
+        retry_after: int = 1,
+        max_priority: int = 10,
+    ):
+        self.task_manager = task_manager
+        self.handlers = handlers
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.role_limits = role_limits or {}
+        self.retry_after = retry_after
+        self.max_priority = max_priority
+
+        self._cond = threading.Condition()
+        self._pending: List[tuple] = []   # sorted (-priority, seq, task)
+        self._seq = itertools.count()
+        self._reserved = 0
+        self._running: Dict[str, int] = {}
+        self._waiters: Dict[str, list] = {}
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.queue_wait = LatencyStats()
+        self.run_time = LatencyStats()
+        self._enqueued_at: Dict[str, float] = {}
+
+        task_manager.add_listener(self._notify)
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker, name=f"task-queue-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """
+        Lets running tasks finish; queued ones stay PENDING in the DB
+        and are picked up again by recover() on the next start.
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def recover(self) -> int:
+        """
+        Requeues PENDING queued tasks from the DB. Tasks left RUNNING were
+        interrupted mid-command; commands aren't idempotent, so those are
+        failed rather than run twice. Inline (sync-mode) tasks have no
+        queue to resume on, so any still active are failed too.
+        """
+        requeued = 0
+        for task in self.task_manager.load_active():
+            # priority is None: executed inline, not through the queue
+            if task.priority is None or task.status == TaskStatus.RUNNING:
+                task.status = TaskStatus.FAILED
+                task.error = "Interrupted by restart"
+                self.task_manager.update_task(task)
+                continue
+
+            self._enqueue(task)
+            requeued += 1
+
+        if requeued:
+            logger.info(f"Requeued pending tasks | count={requeued}")
+        return requeued
+
+    # ----------------------------
+    # Submission
+    # ----------------------------
+    def submit(
+        self,
+        task_type: str,
+        payload: Dict,
+        priority: int = 0,
+        role: Optional[str] = None,
+    ) -> Task:
+        if task_type not in self.handlers:
+            raise ValueError(f"No handler for task type: {task_type}")
+        priority = max(-self.max_priority, min(self.max_priority, priority))
+
+        # Reserve the slot before the task is persisted, so a rejected
+        # submission never leaves a PENDING row behind to be requeued
+        with self._cond:
+            if len(self._pending) + self._reserved >= self.max_queue:
+                self.rejected += 1
+                raise PoolSaturatedError("tasks", self.retry_after)
+            self._reserved += 1
+
+        try:
+            task = self.task_manager.create_task(
+                task_type, payload, priority=priority, role=role
+            )
+        finally:
+            with self._cond:
+                self._reserved -= 1
+
+        self._enqueue(task)
+        return task
+
+    def _enqueue(self, task: Task):
+        with self._cond:
+            self._enqueued_at[task.id] = time.perf_counter()
+            bisect.insort(
+                self._pending,
+                (-(task.priority or 0), next(self._seq), task),
+                key=lambda entry: entry[:2],
+            )
+            self._cond.notify()
+
+    # ----------------------------
+    # Workers
+    # ----------------------------
+    def _next_runnable(self) -> Optional[Task]:
+        for i, (_, _, task) in enumerate(self._pending):
+            role = task.role or ""
+            limit = self.role_limits.get(role)
+            if limit is not None and self._running.get(role, 0) >= limit:
+                continue
+            del self._pending[i]
+            return task
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                task = None
+                while not self._stopping:
+                    task = self._next_runnable()
+                    if task is not None:
+                        break
+                    self._cond.wait()
+                if task is None:
+                    return
+                role = task.role or ""
+                self._running[role] = self._running.get(role, 0) + 1
+                enqueued = self._enqueued_at.pop(task.id, None)
+
+            if enqueued is not None:
+                self.queue_wait.observe((time.perf_counter() - enqueued) * 1000)
+
+            try:
+                self._run(task)
+            finally:
+                with self._cond:
+                    self._running[role] -= 1
+                    if task.status == TaskStatus.COMPLETED:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                    # A role slot freed up: jobs skipped for it may run now
+                    self._cond.notify_all()
+
+    def _run(self, task: Task):
+        started = time.perf_counter()
+
+        try:
+            self.task_manager.mark_running(task)
+            # Persist RUNNING so pollers and a restarted process can see it
+            self.task_manager.update_task(task)
+            task.result = self.handlers[task.type](task)
+            task.status = TaskStatus.COMPLETED
+        except Exception as e:
+            task.status = TaskStatus.FAILED
+            task.error = str(e)
+
+        self.run_time.observe((time.perf_counter() - started) * 1000)
+
+        # Wakes long-pollers through the task manager listener
+        try:
+            self.task_manager.update_task(task)
+        except Exception as e:
+            logger.error(f"Failed to persist task | id={task.id} | error={e}")
+
+    # ----------------------------
+    # Long-poll
+    # ----------------------------
+    def _notify(self, task: Task):
+        with self._cond:
+            waiters = self._waiters.pop(task.id, [])
+
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                pass  # loop already closed
+
+    async def wait(self, task: Task, timeout: float) -> Task:
+        """
+        Returns once `task` is terminal or after `timeout` seconds,
+        whichever comes first.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = (loop, future)
+
+        with self._cond:
+            # Checked under the lock _notify takes, so a task finishing
+            # right now can't slip between the check and the registration
+            if task.status in TERMINAL_STATUSES:
+                return task
+            self._waiters.setdefault(task.id, []).append(waiter)
+
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                waiters = self._waiters.get(task.id)
+                if waiters and waiter in waiters:
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del self._waiters[task.id]
+
+        return task
+
+    def snapshot(self) -> Dict:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": len(self._pending),
+                "running": {role: n for role, n in self._running.items() if n},
+                "role_limits": self.role_limits,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed,
+                "waiters": sum(len(w) for w in self._waiters.values()),
+                "queue_wait": self.queue_wait.snapshot(),
+                "run_time": self.run_time.snapshot(),
+            }
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
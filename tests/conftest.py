@@ -0,0 +1,34 @@
+import asyncio
+import os
+import tempfile
+import threading
+
+import pytest
+
+# ai_os.persistence.db opens Config.DB_PATH at import; keep test runs
+# from creating ./data in the checkout
+os.environ.setdefault("AIOS_DATA_DIR", tempfile.mkdtemp(prefix="aios-test-"))
+
+
+@pytest.fixture
+def busy_llm_pool(monkeypatch):
+    # One worker, no queue, and a generation holding the worker.
+    # Imported here so tests that never touch the API don't load it
+    from ai_os import api
+    from ai_os.executors.pools import WorkPool
+
+    pool = WorkPool("llm", max_workers=1, max_queue=0)
+    running, release = threading.Event(), threading.Event()
+
+    def generation():
+        running.set()
+        release.wait(10)
+
+    holder = threading.Thread(target=lambda: asyncio.run(pool.run(generation)))
+    holder.start()
+    assert running.wait(5)
+    monkeypatch.setattr(api, "llm_pool", pool)
+    yield pool
+    release.set()
+    holder.join()
+    pool.shutdown()
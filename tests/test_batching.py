@@ -0,0 +1,94 @@
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from ai_os.inference.batching import BatcherClosedError, MicroBatcher
+
+
+def test_concurrent_submits_share_a_batch():
+    calls = []
+
+    def run_batch(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher("test", run_batch, max_batch_size=8, max_wait_ms=50)
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.submit(i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert results == {i: i * 2 for i in range(8)}
+    assert len(calls) < 8
+
+    stats = batcher.stats.snapshot()
+    assert stats["requests"] == 8
+    assert stats["batches"] == len(calls)
+
+
+def test_batch_is_capped_at_max_batch_size():
+    sizes = []
+
+    def run_batch(items):
+        sizes.append(len(items))
+        time.sleep(0.01)
+        return items
+
+    batcher = MicroBatcher("test", run_batch, max_batch_size=2, max_wait_ms=20)
+    threads = [
+        threading.Thread(target=batcher.submit, args=(i,)) for i in range(6)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert max(sizes) <= 2
+    assert sum(sizes) == 6
+
+
+def test_batch_errors_propagate_to_callers():
+    def run_batch(items):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher("test", run_batch, max_batch_size=4, max_wait_ms=1)
+    with pytest.raises(RuntimeError, match="boom"):
+        batcher.submit("x")
+    batcher.close()
+
+
+
+def test_close_fails_whatever_is_left_queued():
+    release = threading.Event()
+
+    def run_batch(items):
+        release.wait()
+        return items
+
+    batcher = MicroBatcher("test", run_batch, max_batch_size=1, max_wait_ms=0)
+    busy = threading.Thread(target=batcher.submit, args=("busy",))
+    busy.start()
+    time.sleep(0.05)
+
+    batcher.close(timeout=0)
+    with pytest.raises(BatcherClosedError):
+        batcher.submit("late")
+
+    # An entry stranded behind the stop marker must not wait forever
+    stranded = Future()
+    batcher._queue.put(("stranded", time.perf_counter(), stranded))
+    release.set()
+    busy.join()
+
+    with pytest.raises(BatcherClosedError):
+        stranded.result(timeout=2)
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from ai_os.executors.command_executor import CommandExecutionError, CommandExecutor
+from ai_os.executors.spawner import Spawner, SpawnerError
+from ai_os.persistence.blobs import BlobStore, RangeNotSatisfiableError, parse_byte_range
+
+
+def test_small_output_is_inline():
+    result = CommandExecutor().run(["echo", "hello"])
+
+    assert result["stdout"] == "hello"
+    assert result["stdout_bytes"] == 6
+    assert result["returncode"] == 0
+    assert "stdout_blob" not in result
+
+
+def test_large_output_spills_to_blob_and_is_capped(tmp_path):
+    blobs = BlobStore(tmp_path)
+    executor = CommandExecutor(blob_store=blobs, max_inline_bytes=16, max_output_bytes=64)
+    text = "x" * 100
+
+    result = executor.run(["echo", text])
+
+    assert result["stdout_bytes"] == 101
+    assert result["stdout"].startswith("x" * 16 + "\n[truncated: showing 16 of 101 bytes")
+    assert result["stdout_truncated"] is True
+    blob_id = result["stdout_blob"]
+    assert blobs.size(blob_id) == 64
+    assert blobs.read(blob_id, 60, 10) == b"xxxx"
+
+
+def test_without_blob_store_output_stops_at_inline_cap():
+    result = CommandExecutor(max_inline_bytes=8).run(["echo", "y" * 50])
+
+    assert result["stdout"].startswith("y" * 8 + "\n[truncated")
+    assert result["stdout_truncated"] is True
+    assert "stdout_blob" not in result
+
+
+def test_allow_list_still_enforced():
+    with pytest.raises(CommandExecutionError):
+        CommandExecutor().run(["cat", "/etc/passwd"])
+    with pytest.raises(CommandExecutionError):
+        CommandExecutor().run(["ls", "-la"])
+
+
+@pytest.fixture
+def spawner():
+    spawner = Spawner(CommandExecutor.ALLOWED_COMMANDS)
+    yield spawner
+    spawner.close()
+
+
+def test_spawner_runs_commands(spawner, tmp_path):
+    executor = CommandExecutor(blob_store=BlobStore(tmp_path), max_inline_bytes=16, spawner=spawner)
+
+    assert executor.run(["echo", "hi"])["stdout"] == "hi"
+    result = executor.run(["echo", "z" * 100])
+    assert result["stdout_bytes"] == 101
+    assert BlobStore(tmp_path).size(result["stdout_blob"]) == 101
+
+
+def test_spawn_server_keeps_its_own_allow_list(spawner):
+    with pytest.raises(SpawnerError, match="not allowed"):
+        asyncio.run(spawner.spawn(["cat", "/etc/passwd"]))
+
+
+def test_start_timeout_leaves_nothing_pending(spawner, monkeypatch):
+    monkeypatch.setattr("ai_os.executors.spawner.START_TIMEOUT_SECONDS", 0)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(spawner.spawn(["ls"]))
+
+    assert spawner._pending == {}
+    # The late pid/returncode replies are ignored; the spawner still works
+    monkeypatch.undo()
+    assert CommandExecutor(spawner=spawner).run(["echo", "hi"])["stdout"] == "hi"
+
+
+def test_falls_back_to_direct_spawn_when_server_is_gone(spawner):
+    executor = CommandExecutor(spawner=spawner)
+    spawner.close()
+
+    assert executor.run(["echo", "fallback"])["stdout"] == "fallback"
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("bytes=0-9", (0, 10)),
+        ("bytes=90-", (90, 100)),
+        ("bytes=-5", (95, 100)),
+        ("bytes=95-500", (95, 100)),
+    ],
+)
+def test_parse_byte_range(header, expected):
+    assert parse_byte_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=5-1", "bytes=-", "items=0-1"])
+def test_parse_byte_range_rejects(header):
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_byte_range(header, 100)
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from ai_os.config import Config
+from ai_os.inference.embedding_cache import EmbeddingCache, cache_key
+from ai_os.inference.model_cache import CachedModel
+from ai_os.model_manager import ModelManager
+
+
+def _vec(value, dim=4):
+    return np.full(dim, value, dtype=np.float32)
+
+
+def test_memory_tier_is_an_lru_bounded_by_bytes():
+    cache = EmbeddingCache(max_bytes=3 * _vec(0).nbytes)
+    for name in "abc":
+        cache.put(name, _vec(ord(name)))
+    cache.get("a")  # now most recent; b is the oldest
+    cache.put("d", _vec(4))
+
+    assert cache.get("b") is None
+    assert [cache.get(k)[0][0] for k in "acd"] == [ord("a"), ord("c"), 4]
+    stats = cache.stats()
+    assert stats["bytes"] == 3 * _vec(0).nbytes
+    assert stats["evictions"] == 1
+
+    # Larger than the whole budget: not kept in memory at all
+    cache.put("big", _vec(1, dim=64))
+    assert cache.get("big") is None
+    assert cache.stats()["entries"] == 3
+
+
+def test_cached_vectors_are_read_only_copies():
+    cache = EmbeddingCache(max_bytes=1024)
+    batch = np.stack([_vec(1), _vec(2)])
+    cache.put("k", batch[0])
+    batch[0] = 9
+
+    vec, truncated = cache.get("k")
+    assert vec[0] == 1 and truncated is False
+    with pytest.raises(ValueError):
+        vec[0] = 5
+
+
+def test_disk_tier_round_trips_truncation_and_promotes(tmp_path):
+    writer = EmbeddingCache(max_bytes=1024, disk_dir=tmp_path, disk_max_bytes=1 << 20)
+    writer.put("cut", _vec(1.5), truncated=True)
+    writer.put("whole", _vec(2.5), truncated=False)
+    writer.close()
+
+    reader = EmbeddingCache(max_bytes=1024, disk_dir=tmp_path, disk_max_bytes=1 << 20)
+    vec, truncated = reader.get("cut")
+    assert truncated is True
+    np.testing.assert_array_equal(vec, _vec(1.5))
+    assert reader.get("whole")[1] is False
+    assert reader.stats()["disk_hits"] == 2
+
+    # Promoted: the second lookup is served from memory
+    reader.get("cut")
+    assert reader.stats()["memory_hits"] == 1
+    reader.close()
+
+
+def test_cache_key_changes_with_the_model_fingerprint():
+    key = cache_key("m", "fp1", "mean", "hello  world")
+
+    assert cache_key("m", "fp1", "mean", " hello world ") == key
+    assert cache_key("m", "fp2", "mean", "hello world") != key
+    assert cache_key("m", "fp1", "cls", "hello world") != key
+    assert cache_key("m", "fp1", "mean", "Hello world") != key
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    model_file = tmp_path / "m.onnx"
+    model_file.write_bytes(b"weights-v1")
+    registry = tmp_path / "registry.yaml"
+    registry.write_text(f"models:\n  m:\n    path: {model_file}\n    tokenizer: none\n")
+
+    monkeypatch.setattr(Config, "EMBED_CACHE_ENABLED", True)
+    monkeypatch.setattr(Config, "EMBED_CACHE_DISK_DIR", None)
+    monkeypatch.setattr(Config, "INFER_BATCHING", False)
+    mm = ModelManager(str(registry))
+
+    builds = []
+
+    def build(name, precision=None):
+        builds.append(name)
+        entry = CachedModel(name=name, session=None, tokenizer=None, size_bytes=1)
+        entry.model_path = str(model_file)
+        entry.fingerprint = ModelManager._fingerprint(str(model_file))
+        return entry
+
+    def embed_texts(name, entry, texts, bucketed=False):
+        # Vectors record which load produced them
+        return np.stack([_vec(len(builds)) for _ in texts]), np.zeros(len(texts), dtype=bool)
+
+    monkeypatch.setattr(mm, "_build_model", build)
+    monkeypatch.setattr(mm, "_embed_texts", embed_texts)
+    return mm, model_file, builds
+
+
+def test_cache_hits_do_not_load_the_model(manager):
+    mm, _, builds = manager
+    mm.embed("m", "hello")
+    mm.unload("m")
+
+    assert mm.embed("m", "hello")[0] == 1
+    assert mm.embed_batch("m", ["hello", "hello"])[:, 0].tolist() == [1, 1]
+    assert builds == ["m"]
+    assert "m" not in mm.cache
+
+    # A miss still loads it
+    mm.embed_batch("m", ["hello", "new"])
+    assert builds == ["m", "m"]
+
+
+def test_replaced_model_file_invalidates_cached_embeddings(manager):
+    mm, model_file, builds = manager
+    assert mm.embed("m", "hello")[0] == 1
+    mm.unload("m")
+
+    model_file.write_bytes(b"weights-v2, retrained")
+
+    assert mm.embed("m", "hello")[0] == 2
+    assert builds == ["m", "m"]
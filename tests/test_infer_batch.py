@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import PreTrainedTokenizerFast
+
+from ai_os import api
+from ai_os.config import Config
+from ai_os.inference.model_cache import CachedModel
+from ai_os.model_manager import ModelManager
+
+# Word-level vocab: "w<i>" is token id i + 2
+VOCAB = {"[PAD]": 0, "[UNK]": 1, **{f"w{i}": i + 2 for i in range(16)}}
+
+# Token lengths 5, 1, 3, 2, 4: bucketing has to reorder them
+TEXTS = ["w0 w1 w2 w3 w4", "w9", "w3 w1 w4", "w7 w2", "w5 w6 w5 w6"]
+
+
+class EchoSession:
+    """
+    Hidden state per token is (id, id²), so every pooled value is
+    checkable. Records the shape of each padded batch it runs.
+    """
+
+    def __init__(self):
+        self.shapes = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input_ids"), SimpleNamespace(name="attention_mask")]
+
+    def run(self, output_names, feeds):
+        ids = feeds["input_ids"]
+        self.shapes.append(ids.shape)
+        return [np.stack([ids, ids * ids], axis=-1).astype(np.float32)]
+
+
+def _expected(text):
+    ids = np.array([VOCAB[w] for w in text.split()], dtype=np.float32)
+    return [ids.mean(), (ids * ids).mean()]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    model_file = tmp_path / "m.onnx"
+    model_file.write_bytes(b"weights")
+    registry = tmp_path / "registry.yaml"
+    registry.write_text(
+        f"models:\n  m:\n    path: {model_file}\n    tokenizer: none\n"
+        f"    max_length: 8\n    bucket_size: 2\n"
+    )
+    monkeypatch.setattr(Config, "EMBED_CACHE_ENABLED", False)
+    monkeypatch.setattr(Config, "INFER_BATCHING", False)
+    mm = ModelManager(str(registry))
+
+    tok = Tokenizer(models.WordLevel(VOCAB, unk_token="[UNK]"))
+    tok.pre_tokenizer = pre_tokenizers.Whitespace()
+    hf = PreTrainedTokenizerFast(tokenizer_object=tok, pad_token="[PAD]")
+    session = EchoSession()
+
+    def build(name, precision=None):
+        entry = CachedModel(
+            name=name, session=session, tokenizer=mm._build_tokenizer(name, hf), size_bytes=1
+        )
+        entry.model_path = str(model_file)
+        return entry
+
+    monkeypatch.setattr(mm, "_build_model", build)
+    monkeypatch.setattr(api, "model_manager", mm)
+    return TestClient(api.create_app()), session
+
+
+def test_batch_keeps_input_order_and_matches_single_infer(client):
+    client, session = client
+
+    r = client.post("/v1/infer/batch", json={"model": "m", "texts": TEXTS})
+
+    assert r.status_code == 200
+    result = r.json()["result"]
+    assert result["count"] == len(TEXTS)
+    np.testing.assert_allclose(result["embeddings"], [_expected(t) for t in TEXTS])
+    # Sorted by length, in buckets of 2, each padded to its own longest row
+    assert session.shapes == [(2, 2), (2, 4), (1, 5)]
+
+    for text, embedding in zip(TEXTS, result["embeddings"]):
+        single = client.post("/v1/infer", json={"model": "m", "prompt": text, "encoding": "float"})
+        np.testing.assert_allclose(single.json()["result"]["embedding"], embedding)
+
+
+def test_empty_and_oversize_batches_are_rejected(client, monkeypatch):
+    client, session = client
+    monkeypatch.setattr(Config, "INFER_BATCH_MAX_TEXTS", 4)
+
+    empty = client.post("/v1/infer/batch", json={"model": "m", "texts": []})
+    oversize = client.post("/v1/infer/batch", json={"model": "m", "texts": TEXTS})
+
+    assert empty.status_code == 400
+    assert oversize.status_code == 413
+    assert session.shapes == []
@@ -0,0 +1,179 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from ai_os.config import Config
+from ai_os.planner.json_stream import JSONObjectStream, JSONStreamError
+from ai_os.planner.llm_planner import LLMPlanner, PROMPT_PREFIX
+from ai_os.planner.plan import plan_json_schema
+from ai_os.planner.validator import PlanValidationError
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+class FakeClient:
+    def __init__(self, output):
+        self.output = output
+        self.kwargs = None
+
+    def generate(self, prompt, **kwargs):
+        self.kwargs = kwargs
+        return self.output
+
+
+PLAN = json.dumps({
+    "goal": "where am i",
+    "steps": [{"action": "command", "params": {"command": ["pwd"]}}],
+})
+
+
+def test_constrained_planner_sends_schema_without_user_text():
+    client = FakeClient(PLAN)
+
+    plan = LLMPlanner(client, constrained=True).plan('say "where" am i')
+
+    schema = client.kwargs["json_schema"]
+    assert "where" not in json.dumps(schema)
+    # The goal comes from the caller, not from whatever the model wrote
+    assert plan.goal == 'say "where" am i'
+    shapes = schema["$defs"]["PlanStep"]["properties"]["params"]["properties"]["command"]["anyOf"]
+    assert {"type": "array", "prefixItems": [{"const": "ls"}]} in shapes
+    assert plan.steps[0].params["command"] == ["pwd"]
+
+
+def test_unconstrained_planner_keeps_plain_generate():
+    client = FakeClient(PLAN)
+
+    LLMPlanner(client).plan("where am i")
+
+    assert client.kwargs == {}
+
+
+GRAMMAR_SCRIPT = """
+import sys
+from ai_os.llm.local import LocalLLMClient
+from ai_os.planner.llm_planner import LLMPlanner
+from ai_os.planner.validator import PlanValidationError
+
+planner = LLMPlanner(LocalLLMClient(sys.argv[1]), constrained=True)
+for goal in sys.argv[2:]:
+    try:
+        planner.plan(goal)
+    except PlanValidationError:
+        pass  # random output is fine; the grammar must parse
+"""
+
+
+def test_constrained_decoding_survives_quotes_and_backslashes():
+    pytest.importorskip("llama_cpp")
+    model_path = Config.LOCAL_LLM_PATH
+    if not model_path or not Path(model_path).exists():
+        pytest.skip("AIOS_LOCAL_LLM_PATH is not set")
+
+    # llama.cpp aborts the whole process on a bad grammar, so decode in a child
+    proc = subprocess.run(
+        [sys.executable, "-c", GRAMMAR_SCRIPT, model_path, 'echo "hi"', "C:\\tmp\\new", '\\"'],
+        env=dict(os.environ, PYTHONPATH=str(SRC)),
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert "error parsing grammar" not in proc.stderr
+
+
+def test_schema_keeps_commands_as_grammar_literals():
+    llama_cpp = pytest.importorskip("llama_cpp")
+    schema = plan_json_schema(["command"], {"ls": [], "echo": ["*"]})
+
+    grammar = llama_cpp.LlamaGrammar.from_json_schema(json.dumps(schema), verbose=False)
+
+    assert '\\"echo\\"' in grammar._grammar
+
+
+def test_prompt_starts_with_the_static_prefix():
+    planner = LLMPlanner(FakeClient(PLAN))
+
+    first, second = planner._build_prompt("list files"), planner._build_prompt("say hi")
+
+    # Everything before the goal must be shared for the KV prefix cache
+    assert first.startswith(PROMPT_PREFIX) and second.startswith(PROMPT_PREFIX)
+    assert "list files" not in PROMPT_PREFIX
+
+
+class StreamingClient:
+    """
+    Yields output in small chunks and records how much was consumed.
+    """
+
+    def __init__(self, output, chunk=4):
+        self.chunks = [output[i:i + chunk] for i in range(0, len(output), chunk)]
+        self.consumed = 0
+        self.closed = False
+
+    def generate_stream(self, prompt, **kwargs):
+        try:
+            for chunk in self.chunks:
+                self.consumed += 1
+                yield chunk
+        finally:
+            self.closed = True
+
+
+def test_stream_scanner_handles_strings_and_stops_at_close():
+    items = []
+    scanner = JSONObjectStream(on_item=items.append)
+    text = '  {"goal": "a } \\" ]", "steps": [{"action": "command", "params": {"command": ["echo", "{["]}}]} trailing'
+
+    done = [scanner.feed(text[i:i + 3]) for i in range(0, len(text), 3)]
+
+    assert done[-1] and scanner.done
+    assert json.loads(scanner.result())["goal"] == 'a } " ]'
+    assert items == [{"action": "command", "params": {"command": ["echo", "{["]}}]
+
+
+@pytest.mark.parametrize("text", ["Sure! Here is", "```json\n{", '{"steps": [}'])
+def test_stream_scanner_rejects_non_json_early(text):
+    with pytest.raises(JSONStreamError):
+        JSONObjectStream().feed(text)
+
+
+def test_streaming_planner_stops_at_end_of_object():
+    client = StreamingClient(PLAN + "\n\nand some rambling after the plan " * 20)
+
+    plan = LLMPlanner(client, streaming=True).plan("where am i")
+
+    assert plan.steps[0].params["command"] == ["pwd"]
+    assert client.closed
+    assert client.consumed == -(-len(PLAN) // 4)
+
+
+def test_streaming_planner_aborts_on_first_bad_step():
+    bad = json.dumps({
+        "goal": "x",
+        "steps": [
+            {"action": "command", "params": {"command": "ls"}},
+            {"action": "command", "params": {"command": ["rm", "-rf", "/"]}},
+        ] + [{"action": "command", "params": {"command": ["ls"]}}] * 20,
+    })
+    client = StreamingClient(bad)
+
+    with pytest.raises(PlanValidationError, match="Command not allowed: rm"):
+        LLMPlanner(client, streaming=True).plan("x")
+
+    assert client.closed
+    assert client.consumed < len(client.chunks) // 4
+
+
+def test_streaming_planner_aborts_on_prose():
+    client = StreamingClient("I cannot help with that. " * 50)
+
+    with pytest.raises(PlanValidationError):
+        LLMPlanner(client, streaming=True).plan("x")
+
+    assert client.consumed == 1
@@ -0,0 +1,117 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ai_os.inference.model_cache import CachedModel, ModelCache
+from ai_os.model_manager import ModelManager
+
+
+def _entry(name, size, pinned=False):
+    return CachedModel(name=name, session=None, tokenizer=None, size_bytes=size, pinned=pinned)
+
+
+def test_lru_eviction_respects_budget_and_pins():
+    cache = ModelCache(max_bytes=250)
+    cache.put(_entry("a", 100, pinned=True))
+    cache.put(_entry("b", 100))
+    cache.get("a")
+    cache.put(_entry("c", 100))
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.total_bytes() == 200
+    assert cache.evictions == 1
+
+
+def test_idle_ttl_sweep_skips_pinned():
+    cache = ModelCache(idle_ttl_seconds=0.05)
+    cache.put(_entry("a", 1))
+    cache.put(_entry("b", 1, pinned=True))
+    time.sleep(0.1)
+
+    assert cache.sweep_idle() == ["a"]
+    assert "b" in cache
+    assert cache.evictions == 1
+    cache.close()
+
+
+def test_explicit_unload_is_not_an_eviction():
+    cache = ModelCache()
+    cache.put(_entry("a", 1))
+
+    assert cache.unload("a")
+    assert not cache.unload("a")
+    assert (cache.evictions, cache.unloads) == (0, 1)
+
+
+CALLERS = 8
+
+
+@pytest.fixture
+def cold_manager(tmp_path):
+    model_file = tmp_path / "m.onnx"
+    model_file.write_bytes(b"weights")
+    registry = tmp_path / "registry.yaml"
+    registry.write_text(f"models:\n  m:\n    path: {model_file}\n    tokenizer: none\n")
+    return ModelManager(str(registry)), str(model_file)
+
+
+def _load_concurrently(mm, build, release):
+    """
+    CALLERS threads ask for the cold model at once; build() holds the
+    load open until release is set.
+    """
+    mm._build_model = build
+    start = threading.Barrier(CALLERS)
+
+    def call():
+        start.wait()
+        return mm._load_model("m")
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        futures = [pool.submit(call) for _ in range(CALLERS)]
+        time.sleep(0.1)  # everyone is now building or waiting
+        release.set()
+        return [f.exception() or f.result() for f in futures]
+
+
+def test_concurrent_cold_loads_build_once(cold_manager):
+    mm, model_file = cold_manager
+    builds, release = [], threading.Event()
+
+    def build(name, precision=None):
+        builds.append(name)
+        release.wait(5)
+        entry = _entry(name, 1)
+        entry.model_path = model_file
+        return entry
+
+    results = _load_concurrently(mm, build, release)
+
+    assert builds == ["m"]
+    assert all(r is results[0] for r in results)
+    assert mm.model_status()["m"] == {"state": "ready"}
+
+
+def test_failed_cold_load_raises_for_every_waiter(cold_manager):
+    mm, model_file = cold_manager
+    builds, release = [], threading.Event()
+
+    def build(name, precision=None):
+        builds.append(name)
+        release.wait(5)
+        raise RuntimeError("corrupt weights")
+
+    results = _load_concurrently(mm, build, release)
+
+    assert builds == ["m"]
+    assert all(isinstance(r, RuntimeError) for r in results)
+    # Nothing left in flight: the next request tries again
+    assert "m" not in mm._loading
+    assert mm.model_status()["m"] == {"state": "failed", "error": "corrupt weights"}
+    with pytest.raises(RuntimeError):
+        mm._load_model("m")
+    assert builds == ["m", "m"]
@@ -0,0 +1,142 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_os import api
+from ai_os.persistence.schema import init_db
+from ai_os.planner.cache import PlanCache, normalize_goal
+from ai_os.planner.dispatcher import PlannerDispatcher
+from ai_os.planner.plan import Plan, PlanStep
+from ai_os.planner.validator import PlanValidationError
+from ai_os.security.identity import Role
+from ai_os.security.policy import PolicyEngine
+
+
+class CountingPlanner:
+    def __init__(self, command=("pwd",), fail=False):
+        self.command = list(command)
+        self.fail = fail
+        self.calls = 0
+
+    def plan(self, goal):
+        self.calls += 1
+        if self.fail:
+            raise PlanValidationError("no plan")
+        return Plan(goal=goal, steps=[PlanStep(action="command", params={"command": self.command})])
+
+
+@pytest.fixture
+def cache():
+    init_db()
+    cache = PlanCache(max_entries=100, ttl_seconds=0)
+    cache.clear()
+    return cache
+
+
+def test_normalize_goal():
+    assert normalize_goal("  show   the\tdirectory \n") == "show the directory"
+    assert normalize_goal("echo Hello") != normalize_goal("echo hello")
+
+
+def test_repeated_goal_skips_the_llm(cache):
+    local = CountingPlanner()
+    dispatcher = PlannerDispatcher(local, None, PolicyEngine(), cache=cache)
+
+    first = dispatcher.plan("show the directory", Role.SYSTEM)
+    second = dispatcher.plan("show  the directory ", Role.SYSTEM)
+
+    assert local.calls == 1
+    assert second.steps == first.steps
+    assert second.goal == "show  the directory "
+    stats = cache.stats()
+    assert stats["planners"]["local"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+    assert stats["entries"] == 1
+
+
+def test_cache_survives_a_new_instance(cache):
+    PlannerDispatcher(CountingPlanner(), None, PolicyEngine(), cache=cache).plan("where am i", Role.SYSTEM)
+
+    local = CountingPlanner()
+    fresh = PlanCache(max_entries=100, ttl_seconds=0)
+    PlannerDispatcher(local, None, PolicyEngine(), cache=fresh).plan("where am i", Role.SYSTEM)
+
+    assert local.calls == 0
+
+
+def test_simple_planner_fallback_is_not_cached(cache):
+    local = CountingPlanner(fail=True)
+    dispatcher = PlannerDispatcher(local, None, PolicyEngine(), cache=cache)
+
+    dispatcher.plan("list files", Role.SYSTEM)
+    dispatcher.plan("list files", Role.SYSTEM)
+
+    assert local.calls == 4
+    assert cache.stats()["planners"]["simple"]["misses"] == 2
+
+
+def test_invalid_cached_plan_is_dropped(cache):
+    cache.put("dump secrets", Plan(
+        goal="dump secrets",
+        steps=[PlanStep(action="command", params={"command": ["cat", "/etc/shadow"]})],
+    ), "local")
+    local = CountingPlanner()
+    dispatcher = PlannerDispatcher(local, None, PolicyEngine(), cache=cache)
+
+    plan = dispatcher.plan("dump secrets", Role.SYSTEM)
+
+    assert local.calls == 1
+    assert plan.steps[0].params["command"] == ["pwd"]
+
+
+def test_cloud_plans_still_need_the_cloud_capability(cache):
+    cache.put("where am i", CountingPlanner().plan("where am i"), "cloud")
+    local = CountingPlanner(command=["ls"])
+    dispatcher = PlannerDispatcher(local, None, PolicyEngine(), cache=cache)
+
+    # SYSTEM may not use the cloud LLM, so it must not reuse its plans
+    assert dispatcher.plan("where am i", Role.SYSTEM).steps[0].params["command"] == ["ls"]
+    assert local.calls == 1
+
+
+def test_ttl_and_lru_bounds(cache):
+    plan = CountingPlanner().plan("x")
+
+    expiring = PlanCache(max_entries=100, ttl_seconds=0.05)
+    expiring.put("soon gone", plan, "local")
+    assert expiring.get("soon gone") is not None
+    time.sleep(0.1)
+    assert expiring.get("soon gone") is None
+
+    bounded = PlanCache(max_entries=2, ttl_seconds=0)
+    bounded.put("a", plan, "local")
+    bounded.put("b", plan, "local")
+    bounded.get("a")
+    bounded.put("c", plan, "local")
+
+    assert bounded.get("b") is None
+    assert bounded.get("a") is not None
+    assert bounded.get("c") is not None
+    assert bounded.evictions == 1
+
+
+def test_cache_hits_skip_a_busy_llm_pool(cache, busy_llm_pool, monkeypatch):
+    local = CountingPlanner()
+    dispatcher = PlannerDispatcher(local, None, PolicyEngine(), cache=cache)
+    dispatcher.plan("where am i", Role.SYSTEM)
+    monkeypatch.setattr(api, "dispatcher", dispatcher)
+    client = TestClient(api.create_app())
+    headers = {"X-User-Role": "admin"}
+
+    hit = client.post("/v1/plan", json={"goal": "where am i"}, headers=headers)
+    assert hit.status_code == 200
+    assert hit.json()["steps"][0]["params"]["command"] == ["pwd"]
+
+    streamed = client.post("/v1/plan/stream", json={"goal": "where am i"}, headers=headers)
+    assert "event: plan_accepted" in streamed.text
+    assert "event: done" in streamed.text
+
+    # A miss needs the LLM pool, which is full
+    miss = client.post("/v1/plan", json={"goal": "list files"}, headers=headers)
+    assert miss.status_code == 503
+    assert local.calls == 1
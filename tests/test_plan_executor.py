@@ -0,0 +1,151 @@
+import threading
+import time
+
+import pytest
+
+from ai_os.planner.executor import PlanExecutor
+from ai_os.planner.plan import Plan, PlanStep
+from ai_os.planner.validator import PlanValidationError, PlanValidator
+from ai_os.tasks.task import Task, TaskStatus
+
+
+class FakeTaskManager:
+    def create_task(self, task_type, payload):
+        return Task(type=task_type, payload=payload)
+
+    def mark_running(self, task):
+        task.status = TaskStatus.RUNNING
+        task.started_at = time.time()
+
+    def update_task(self, task):
+        if task.status != TaskStatus.RUNNING and task.finished_at is None:
+            task.finished_at = time.time()
+
+
+class SleepingExecutor:
+    """
+    ["echo", "<ms>"] sleeps; ["echo", "fail"] raises.
+    """
+
+    def __init__(self):
+        self.order = []
+        self.lock = threading.Lock()
+
+    def run(self, command):
+        arg = command[1]
+        with self.lock:
+            self.order.append(arg)
+        if arg == "fail":
+            raise RuntimeError("boom")
+        time.sleep(int(arg) / 1000)
+        return {"stdout": arg}
+
+
+def _plan(*steps):
+    return Plan(
+        goal="test",
+        steps=[
+            PlanStep(action="command", params={"command": ["echo", arg]}, id=sid, depends_on=deps)
+            for sid, arg, deps in steps
+        ],
+    )
+
+
+def test_independent_steps_run_concurrently():
+    plan = _plan(*[(f"s{i}", "100", []) for i in range(4)])
+    executor = PlanExecutor(FakeTaskManager(), SleepingExecutor(), max_parallelism=4)
+
+    start = time.perf_counter()
+    tasks = executor.execute(plan)
+    elapsed = time.perf_counter() - start
+
+    assert [t.status for t in tasks] == [TaskStatus.COMPLETED] * 4
+    assert elapsed < 0.3
+    assert all(t.started_at and t.finished_at for t in tasks)
+
+
+def test_dependencies_order_and_failure_cancels_downstream():
+    plan = _plan(
+        ("a", "10", []),
+        ("b", "fail", ["a"]),
+        ("c", "10", ["a"]),
+        ("d", "10", ["b", "c"]),
+        ("e", "10", ["d"]),
+    )
+    command_executor = SleepingExecutor()
+    executor = PlanExecutor(FakeTaskManager(), command_executor, max_parallelism=2)
+    tasks = executor.execute(plan)
+
+    assert [t.status for t in tasks] == [
+        TaskStatus.COMPLETED,
+        TaskStatus.FAILED,
+        TaskStatus.COMPLETED,
+        TaskStatus.CANCELLED,
+        TaskStatus.CANCELLED,
+    ]
+    assert command_executor.order[0] == "10"
+    assert len(command_executor.order) == 3
+    assert tasks[3].error == "Dependency b failed"
+
+
+def test_parallelism_is_per_plan():
+    executor = PlanExecutor(FakeTaskManager(), SleepingExecutor(), max_parallelism=4)
+    plans = [_plan(*[(f"s{i}", "100", []) for i in range(4)]) for _ in range(2)]
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=executor.execute, args=(plan,)) for plan in plans]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # A shared limit of 4 would serialize the two plans (~200 ms)
+    assert time.perf_counter() - start < 0.18
+
+
+def test_plans_without_edges_run_in_order_and_past_failures():
+    plan = Plan(
+        goal="test",
+        steps=[
+            PlanStep(action="command", params={"command": ["echo", arg]})
+            for arg in ("30", "fail", "10", "1")
+        ],
+    )
+    command_executor = SleepingExecutor()
+    executor = PlanExecutor(FakeTaskManager(), command_executor, max_parallelism=4)
+    tasks = executor.execute(plan)
+
+    assert not plan.is_graph()
+    assert command_executor.order == ["30", "fail", "10", "1"]
+    assert [t.status for t in tasks] == [
+        TaskStatus.COMPLETED,
+        TaskStatus.FAILED,
+        TaskStatus.COMPLETED,
+        TaskStatus.COMPLETED,
+    ]
+
+
+@pytest.mark.parametrize(
+    "steps, message",
+    [
+        ((("a", "1", ["b"]), ("b", "1", ["a"])), "cycle"),
+        ((("a", "1", ["a"]),), "itself"),
+        ((("a", "1", ["z"]),), "unknown"),
+        ((("a", "1", []), ("a", "1", [])), "unique"),
+    ],
+)
+def test_validator_rejects_bad_dependencies(steps, message):
+    with pytest.raises(PlanValidationError, match=message):
+        PlanValidator().validate(_plan(*steps))
+
+
+def test_index_ids_and_int_edges():
+    plan = Plan(
+        goal="test",
+        steps=[
+            PlanStep(action="command", params={"command": ["ls"]}),
+            PlanStep(action="command", params={"command": ["pwd"]}, depends_on=[0]),
+        ],
+    )
+    PlanValidator().validate(plan)
+    assert plan.dependencies() == {"0": [], "1": ["0"]}
@@ -0,0 +1,156 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_os import api
+from ai_os.persistence.schema import init_db
+from ai_os.planner.dispatcher import PlannerDispatcher
+from ai_os.planner.plan import Plan, PlanStep
+from ai_os.planner.semantic_index import SemanticPlanIndex
+from ai_os.security.identity import Role
+from ai_os.security.policy import PolicyEngine
+
+# Paraphrases share a concept; stand-in for a sentence embedding model
+CONCEPTS = {
+    "files": 0, "listing": 0, "list": 0, "show": 1, "directory": 2, "folder": 2,
+    "where": 2, "echo": 3, "say": 3, "print": 3,
+}
+
+
+def embed(text):
+    vec = np.zeros(8, dtype=np.float32)
+    for word in text.lower().split():
+        vec[CONCEPTS.get(word, 7)] += 1
+    return vec
+
+
+class CountingPlanner:
+    def __init__(self, command):
+        self.command = command
+        self.calls = 0
+
+    def plan(self, goal):
+        self.calls += 1
+        return Plan(goal=goal, steps=[PlanStep(action="command", params={"command": self.command})])
+
+
+def _index(path, **kwargs):
+    return SemanticPlanIndex(path, embed=embed, model="fake", threshold=0.9, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def db():
+    init_db()
+
+
+def test_paraphrase_reuses_stored_plan(tmp_path):
+    local = CountingPlanner(["ls"])
+    index = _index(tmp_path)
+    dispatcher = PlannerDispatcher(local, None, PolicyEngine(), index=index)
+
+    dispatcher.plan("show files", Role.SYSTEM)
+    plan = dispatcher.plan("show listing", Role.SYSTEM)
+
+    assert local.calls == 1
+    assert plan.goal == "show listing"
+    assert plan.steps[0].params["command"] == ["ls"]
+    assert index.stats()["hits"] == 1
+
+    # Unrelated goal still goes to the LLM
+    dispatcher.plan("echo hello", Role.SYSTEM)
+    assert local.calls == 2
+
+
+def test_paraphrase_with_different_arguments_is_planned_afresh(tmp_path):
+    index = _index(tmp_path)
+    dispatcher = PlannerDispatcher(CountingPlanner(["echo", "hello"]), None, PolicyEngine(), index=index)
+    dispatcher.plan("echo hello", Role.SYSTEM)
+
+    # Same concept, different text: reusing would print the wrong thing
+    other = CountingPlanner(["echo", "goodbye"])
+    dispatcher.local = other
+    plan = dispatcher.plan("echo goodbye", Role.SYSTEM)
+    assert other.calls == 1
+    assert plan.steps[0].params["command"] == ["echo", "goodbye"]
+
+    # Arguments that recur in the paraphrase still allow reuse
+    plan = dispatcher.plan("say hello", Role.SYSTEM)
+    assert other.calls == 1
+    assert plan.steps[0].params["command"] == ["echo", "hello"]
+
+
+def test_index_reloads_from_disk(tmp_path):
+    index = _index(tmp_path)
+    plan = CountingPlanner(["pwd"]).plan("x")
+    assert index.add("show directory", plan, "local")
+    assert index.add("echo hello", CountingPlanner(["echo", "hello"]).plan("x"), "local")
+    # Near-duplicates are not stored twice
+    assert not index.add("show folder", plan, "local")
+
+    reopened = _index(tmp_path)
+    matches = reopened.search("show folder")
+
+    assert reopened.stats()["entries"] == 2
+    assert isinstance(reopened._vectors, np.memmap)
+    assert [m.goal for m in matches] == ["show directory"]
+    assert matches[0].plan.steps[0].params["command"] == ["pwd"]
+
+
+def test_half_written_row_is_trimmed(tmp_path):
+    index = _index(tmp_path)
+    index.add("show directory", CountingPlanner(["pwd"]).plan("x"), "local")
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(b"\0" * 12)
+
+    reopened = _index(tmp_path)
+    assert reopened.stats()["entries"] == 1
+    assert reopened.add("echo hello", CountingPlanner(["echo", "hello"]).plan("x"), "local")
+    assert _index(tmp_path).search("echo hello")[0].goal == "echo hello"
+
+
+def test_model_change_starts_fresh(tmp_path):
+    _index(tmp_path).add("show directory", CountingPlanner(["pwd"]).plan("x"), "local")
+
+    other = SemanticPlanIndex(tmp_path, embed=embed, model="other", threshold=0.9)
+
+    assert other.stats()["entries"] == 0
+    assert other.search("show directory") == []
+
+
+def test_invalid_stored_plan_is_skipped(tmp_path):
+    index = _index(tmp_path)
+    index.add("show files", Plan(
+        goal="x", steps=[PlanStep(action="command", params={"command": ["cat", "/etc/passwd"]})],
+    ), "local")
+    local = CountingPlanner(["ls"])
+
+    plan = PlannerDispatcher(local, None, PolicyEngine(), index=index).plan("show listing", Role.SYSTEM)
+
+    assert local.calls == 1
+    assert plan.steps[0].params["command"] == ["ls"]
+
+
+def test_unavailable_embedding_model_falls_through(tmp_path):
+    index = SemanticPlanIndex(tmp_path, embed=lambda text: None, model="fake", threshold=0.9)
+    local = CountingPlanner(["ls"])
+    dispatcher = PlannerDispatcher(local, None, PolicyEngine(), index=index)
+
+    dispatcher.plan("show files", Role.SYSTEM)
+    dispatcher.plan("show files", Role.SYSTEM)
+
+    assert local.calls == 2
+    assert index.stats()["entries"] == 0
+
+
+def test_paraphrase_hits_skip_a_busy_llm_pool(tmp_path, busy_llm_pool, monkeypatch):
+    local = CountingPlanner(["ls"])
+    dispatcher = PlannerDispatcher(local, None, PolicyEngine(), index=_index(tmp_path))
+    dispatcher.plan("show files", Role.SYSTEM)
+    monkeypatch.setattr(api, "dispatcher", dispatcher)
+    client = TestClient(api.create_app())
+
+    r = client.post("/v1/plan", json={"goal": "show listing"}, headers={"X-User-Role": "admin"})
+
+    assert r.status_code == 200
+    assert r.json()["steps"][0]["params"]["command"] == ["ls"]
+    assert local.calls == 1
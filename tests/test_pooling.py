@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from ai_os.inference.pooling import PoolingError, l2_normalize, pool
+
+
+def _padded_batch():
+    # Row 0 has 3 real tokens, row 1 has 1; pad positions hold garbage
+    # that must never leak into the result
+    hidden = np.array(
+        [
+            [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0], [100.0, 100.0]],
+            [[7.0, -8.0], [100.0, 100.0], [100.0, 100.0], [100.0, 100.0]],
+        ],
+        dtype=np.float32,
+    )
+    mask = np.array([[1, 1, 1, 0], [1, 0, 0, 0]], dtype=np.int64)
+    return hidden, mask
+
+
+def test_mean_pooling_ignores_padding():
+    hidden, mask = _padded_batch()
+    pooled = pool(hidden, mask, "mean")
+
+    np.testing.assert_allclose(pooled, [[3.0, 4.0], [7.0, -8.0]])
+    assert pooled.dtype == np.float32
+
+
+def test_max_pooling_ignores_padding():
+    hidden, mask = _padded_batch()
+    np.testing.assert_allclose(pool(hidden, mask, "max"), [[5.0, 6.0], [7.0, -8.0]])
+
+
+def test_cls_pooling_takes_the_first_token():
+    hidden, mask = _padded_batch()
+    np.testing.assert_allclose(pool(hidden, mask, "cls"), [[1.0, 2.0], [7.0, -8.0]])
+
+
+def test_mean_pooling_of_an_all_padding_row_is_finite():
+    hidden, _ = _padded_batch()
+    mask = np.zeros((2, 4), dtype=np.int64)
+    assert np.isfinite(pool(hidden, mask, "mean")).all()
+
+
+def test_normalize_and_pooled_outputs_pass_through():
+    pooled = np.array([[3.0, 4.0], [0.0, 0.0]], dtype=np.float32)
+
+    out = pool(pooled, np.ones((2, 1)), "mean", normalize=True)
+    np.testing.assert_allclose(out, [[0.6, 0.8], [0.0, 0.0]])
+    np.testing.assert_allclose(l2_normalize(pooled), out)
+
+
+def test_unknown_strategy_is_rejected():
+    hidden, mask = _padded_batch()
+    with pytest.raises(PoolingError):
+        pool(hidden, mask, "median")
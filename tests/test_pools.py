@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_os import api
+from ai_os.executors.pools import WorkPool
+
+
+class BlockingModels:
+    """
+    Stands in for the model manager: infer() blocks until released,
+    or fails for prompts starting with "fail".
+    """
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def list_models(self):
+        return ["m"]
+
+    def infer(self, model, prompt):
+        if prompt.startswith("fail"):
+            raise RuntimeError("model crashed")
+        self.release.wait(10)
+        return {"model": model, "prompt": prompt}
+
+
+@pytest.fixture
+def tiny_pool(monkeypatch):
+    # 1 running + 1 queued, then reject
+    pool = WorkPool("inference", max_workers=1, max_queue=1, retry_after=7)
+    models = BlockingModels()
+    monkeypatch.setattr(api, "inference_pool", pool)
+    monkeypatch.setattr(api, "model_manager", models)
+    yield TestClient(api.create_app()), pool, models
+    models.release.set()
+    pool.shutdown()
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_full_pool_answers_503_with_retry_after(tiny_pool):
+    client, pool, models = tiny_pool
+    responses = []
+
+    def infer(prompt):
+        responses.append(client.post("/v1/infer", json={"model": "m", "prompt": prompt}))
+
+    callers = [threading.Thread(target=infer, args=(p,)) for p in ("running", "queued")]
+    for caller in callers:
+        caller.start()
+    _wait_for(lambda: pool.snapshot()["in_flight"] == 2)
+
+    rejected = client.post("/v1/infer", json={"model": "m", "prompt": "one too many"})
+
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "7"
+    assert pool.snapshot()["rejected"] == 1
+
+    models.release.set()
+    for caller in callers:
+        caller.join()
+    assert [r.status_code for r in responses] == [200, 200]
+    assert pool.snapshot()["in_flight"] == 0
+
+
+def test_failed_task_releases_its_slot(tiny_pool):
+    client, pool, models = tiny_pool
+    models.release.set()
+
+    # More failures than the pool holds: each must give its slot back
+    for _ in range(3):
+        assert client.post("/v1/infer", json={"model": "m", "prompt": "fail"}).status_code == 500
+    assert pool.snapshot()["in_flight"] == 0
+
+    ok = client.post("/v1/infer", json={"model": "m", "prompt": "after failures"})
+    assert ok.status_code == 200
+    assert pool.snapshot()["rejected"] == 0
@@ -0,0 +1,135 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# DB_PATH is read from AIOS_DATA_DIR at import time, so each scenario
+# runs in its own interpreter.
+ARCHIVE_RUN = textwrap.dedent(
+    """
+    import json, time
+
+    from ai_os.config import Config
+    from ai_os.persistence.archive import ArchiveStore
+    from ai_os.persistence.db import get_conn, transaction
+    from ai_os.persistence.retention import RetentionEngine, RetentionPolicy
+    from ai_os.persistence.schema import init_db
+
+    init_db()
+    now = time.time()
+    with transaction() as conn:
+        for i in range(1200):
+            status = "pending" if i % 4 == 0 else "completed"
+            conn.execute(
+                "INSERT INTO tasks (id, type, status, payload, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (f"old-{i}", "command", status, json.dumps({"command": ["ls"]}),
+                 json.dumps({"stdout": "x" * 1000}), now - 40 * 86400 - i),
+            )
+        conn.execute(
+            "INSERT INTO tasks (id, type, status, payload, created_at) "
+            "VALUES ('fresh', 'command', 'completed', '{}', ?)",
+            (now,),
+        )
+
+    archive = ArchiveStore(Config.ARCHIVE_DIR)
+    engine = RetentionEngine(
+        [RetentionPolicy("done", "tasks", 30, statuses=("completed",))],
+        archive=archive,
+        batch_size=250,
+    )
+    report = engine.run_once()
+
+    conn = get_conn()
+    print(json.dumps({
+        "moved": report["rows"]["done"],
+        "left": dict(conn.execute(
+            "SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()),
+        "indexed": conn.execute("SELECT COUNT(*) FROM task_archive").fetchone()[0],
+        "found": archive.find_task("old-1"),
+        "missing": archive.find_task("old-0"),
+        "segments": archive.stats()["segments"],
+    }))
+    """
+)
+
+
+# A database file created before auto_vacuum was enabled: retention
+# must not convert it on its own, only enable_incremental_vacuum does.
+LEGACY_VACUUM = textwrap.dedent(
+    """
+    import json, sqlite3
+
+    from ai_os.config import Config
+
+    legacy = sqlite3.connect(Config.DB_PATH)
+    legacy.execute("CREATE TABLE filler (id INTEGER PRIMARY KEY, data TEXT)")
+    legacy.executemany("INSERT INTO filler (data) VALUES (?)", [("x" * 4000,)] * 500)
+    legacy.commit()
+    legacy.close()
+
+    from ai_os.persistence.db import get_conn
+    from ai_os.persistence.retention import RetentionEngine, enable_incremental_vacuum
+    from ai_os.persistence.schema import init_db
+
+    init_db()
+    conn = get_conn()
+    with conn:
+        conn.execute("DELETE FROM filler")
+    engine = RetentionEngine([], batch_size=100)
+
+    report = engine.run_once()
+    skipped = {
+        "mode": conn.execute("PRAGMA auto_vacuum").fetchone()[0],
+        "vacuumed": report["vacuumed_pages"],
+    }
+    converted = enable_incremental_vacuum(conn)
+    again = enable_incremental_vacuum(conn)
+    print(json.dumps({
+        "skipped": skipped,
+        "converted": converted,
+        "again": again,
+        "mode": conn.execute("PRAGMA auto_vacuum").fetchone()[0],
+    }))
+    """
+)
+
+
+def _run(tmp_path, code):
+    env = dict(os.environ, AIOS_DATA_DIR=str(tmp_path), PYTHONPATH=str(SRC))
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_archives_old_completed_tasks_and_keeps_them_readable(tmp_path):
+    out = _run(tmp_path, ARCHIVE_RUN)
+
+    assert out["moved"] == 900
+    assert out["left"] == {"pending": 300, "completed": 1}
+    assert out["indexed"] == 900
+    assert out["segments"] == 4
+    assert out["found"]["status"] == "completed"
+    assert json.loads(out["found"]["result"])["stdout"] == "x" * 1000
+    assert out["missing"] is None
+
+
+def test_legacy_database_is_never_vacuumed_implicitly(tmp_path):
+    out = _run(tmp_path, LEGACY_VACUUM)
+
+    # Left alone by the background run (no full VACUUM)
+    assert out["skipped"] == {"mode": 0, "vacuumed": 0}
+    assert out["converted"] is True
+    assert out["again"] is False
+    assert out["mode"] == 2
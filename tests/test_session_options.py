@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import numpy as np
+from onnxruntime.datasets import get_example
+
+from ai_os.inference.session_options import (
+    create_session,
+    optimized_model_path,
+    resolve_providers,
+)
+
+MODEL = get_example("sigmoid.onnx")
+PROVIDERS = resolve_providers("sigmoid", "cpu")
+
+
+def _run(session):
+    inp = session.get_inputs()[0]
+    shape = [d if isinstance(d, int) else 1 for d in inp.shape]
+    return session.run(None, {inp.name: np.zeros(shape, dtype=np.float32)})[0]
+
+
+def test_optimized_graph_is_cached_without_temp_files(tmp_path):
+    create_session("sigmoid", MODEL, PROVIDERS, {}, cache_dir=tmp_path)
+
+    cached = optimized_model_path(tmp_path, "sigmoid", MODEL, {}, PROVIDERS)
+    assert [p.name for p in tmp_path.iterdir()] == [cached.name]
+    np.testing.assert_allclose(
+        _run(create_session("sigmoid", MODEL, PROVIDERS, {}, cache_dir=tmp_path)), 0.5
+    )
+
+
+def test_corrupt_cached_graph_is_rebuilt(tmp_path):
+    cached = optimized_model_path(tmp_path, "sigmoid", MODEL, {}, PROVIDERS)
+    # What a crash halfway through writing the optimized graph leaves
+    cached.write_bytes(Path(MODEL).read_bytes()[:40])
+
+    session = create_session("sigmoid", MODEL, PROVIDERS, {}, cache_dir=tmp_path)
+
+    np.testing.assert_allclose(_run(session), 0.5)
+    assert cached.stat().st_size > 40
+    assert [p.name for p in tmp_path.iterdir()] == [cached.name]
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import re
+import threading
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from ai_os import api
+from ai_os.planner.plan import Plan, PlanStep
+from ai_os.sse import EventChannel
+
+FRAME = re.compile(r"event: (\w+)\ndata: (.*)\n\n")
+
+
+def _frames(text):
+    # Every byte must belong to a well-formed frame
+    frames = FRAME.findall(text)
+    assert "".join(f"event: {e}\ndata: {d}\n\n" for e, d in frames) == text
+    return [(event, json.loads(data)) for event, data in frames]
+
+
+def test_channel_delivers_thread_events_in_order():
+    async def scenario():
+        channel = EventChannel()
+
+        def producer():
+            for i in range(50):
+                channel.emit("tick", {"i": i, "note": 'a "quoted"\nline'})
+            channel.close()
+
+        threading.Thread(target=producer).start()
+        return "".join([frame async for frame in channel.events()])
+
+    frames = _frames(asyncio.run(scenario()))
+
+    assert [data["i"] for _, data in frames] == list(range(50))
+    assert {event for event, _ in frames} == {"tick"}
+    assert frames[0][1]["note"] == 'a "quoted"\nline'
+
+
+class FakeDispatcher:
+    """
+    No stored plans; generation blocks until released.
+    """
+
+    def __init__(self):
+        self.generating = threading.Event()
+        self.release = threading.Event()
+
+    def reuse(self, goal, role, on_event=None):
+        return None
+
+    def generate(self, goal, role, on_event=None):
+        on_event("planner_started", {"planner": "local", "attempt": 1})
+        self.generating.set()
+        self.release.wait(10)
+        return Plan(goal=goal, steps=[PlanStep(action="command", params={"command": ["pwd"]})])
+
+
+class RecordingExecutor:
+    def __init__(self):
+        self.plans = []
+
+    def execute(self, plan, on_event=None, cancel=None):
+        self.plans.append(plan)
+        on_event("task_started", {"step": 0})
+        on_event("task_finished", {"step": 0, "status": "completed"})
+        return [SimpleNamespace(status="completed")]
+
+
+def test_stream_frames_events_in_order(monkeypatch):
+    dispatcher, executor = FakeDispatcher(), RecordingExecutor()
+    dispatcher.release.set()
+    monkeypatch.setattr(api, "dispatcher", dispatcher)
+    monkeypatch.setattr(api, "plan_executor", executor)
+    client = TestClient(api.create_app())
+
+    r = client.post("/v1/plan/stream", json={"goal": "where am i"}, headers={"X-User-Role": "admin"})
+
+    assert r.headers["content-type"].startswith("text/event-stream")
+    frames = _frames(r.text)
+    assert [event for event, _ in frames] == [
+        "accepted", "planner_started", "plan_accepted", "task_started", "task_finished", "done",
+    ]
+    assert frames[-1][1] == {"tasks": 1, "statuses": ["completed"]}
+
+
+def test_client_disconnect_stops_the_plan(monkeypatch):
+    dispatcher, executor = FakeDispatcher(), RecordingExecutor()
+    monkeypatch.setattr(api, "dispatcher", dispatcher)
+    monkeypatch.setattr(api, "plan_executor", executor)
+    app = api.create_app()
+    body = json.dumps({"goal": "where am i"}).encode()
+
+    async def scenario():
+        gone = asyncio.Event()
+        requested = False
+        sent = []
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await gone.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if b"event: planner_started" in message.get("body", b""):
+                gone.set()  # client hangs up mid-plan
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "POST", "scheme": "http", "path": "/v1/plan/stream",
+            "raw_path": b"/v1/plan/stream", "root_path": "", "query_string": b"",
+            "headers": [(b"content-type", b"application/json"), (b"x-user-role", b"admin")],
+            "client": ("testclient", 1), "server": ("testserver", 80),
+        }
+        # Returns once the disconnect tears the stream down, not when planning ends
+        await asyncio.wait_for(app(scope, receive, send), 5)
+        await asyncio.sleep(0.05)
+        # The planning task went with the stream: nothing left to emit into it
+        leftover = asyncio.all_tasks() - {asyncio.current_task()}
+        return sent, leftover
+
+    sent, leftover = asyncio.run(scenario())
+    dispatcher.release.set()
+
+    assert dispatcher.generating.is_set()
+    assert leftover == set()
+    assert executor.plans == []
+    assert not any(b"plan_accepted" in m.get("body", b"") for m in sent)
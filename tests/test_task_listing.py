@@ -0,0 +1,135 @@
+import json
+import sqlite3
+import uuid
+
+import pytest
+
+from ai_os.persistence.db import transaction
+from ai_os.persistence.migrations import MIGRATIONS, migrate
+from ai_os.persistence.schema import init_db
+from ai_os.tasks.task_manager import InvalidCursorError, TaskManager
+
+
+@pytest.fixture
+def tm():
+    init_db()
+    return TaskManager()
+
+
+def _insert(rows):
+    # (id, type, status, created_at); inserted directly to control created_at
+    with transaction() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (id, type, status, payload, created_at) "
+            "VALUES (?, ?, ?, '{}', ?)",
+            rows,
+        )
+
+
+def _unique_type() -> str:
+    # Tests share one DB; a fresh type keeps each test's rows apart
+    return f"t-{uuid.uuid4().hex[:8]}"
+
+
+def test_cursor_walks_every_task_once_newest_first(tm):
+    task_type = _unique_type()
+    # Ties on created_at are broken by id
+    rows = [(f"{task_type}-{i:02d}", task_type, "completed", 1000.0 + i // 3) for i in range(25)]
+    _insert(rows)
+
+    seen, cursor = [], None
+    while True:
+        page = tm.list_tasks(task_type=task_type, limit=7, cursor=cursor)
+        assert len(page["tasks"]) <= 7
+        seen += [t.id for t in page["tasks"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    expected = [r[0] for r in sorted(rows, key=lambda r: (r[3], r[0]), reverse=True)]
+    assert seen == expected
+
+
+def test_last_full_page_has_no_cursor(tm):
+    task_type = _unique_type()
+    _insert([(f"{task_type}-{i}", task_type, "completed", 1000.0 + i) for i in range(4)])
+
+    page = tm.list_tasks(task_type=task_type, limit=4)
+    assert len(page["tasks"]) == 4
+    assert page["next_cursor"] is None
+
+
+def test_filters_on_status_type_and_created_at(tm):
+    task_type, other_type = _unique_type(), _unique_type()
+    _insert([
+        (f"{task_type}-a", task_type, "completed", 100.0),
+        (f"{task_type}-b", task_type, "failed", 200.0),
+        (f"{task_type}-c", task_type, "completed", 300.0),
+        (f"{other_type}-a", other_type, "completed", 200.0),
+    ])
+
+    def ids(**filters):
+        return [t.id for t in tm.list_tasks(**filters)["tasks"]]
+
+    assert ids(task_type=task_type) == [f"{task_type}-c", f"{task_type}-b", f"{task_type}-a"]
+    assert ids(task_type=task_type, status="completed") == [f"{task_type}-c", f"{task_type}-a"]
+    # created_after is inclusive, created_before exclusive
+    assert ids(task_type=task_type, created_after=200.0) == [f"{task_type}-c", f"{task_type}-b"]
+    assert ids(task_type=task_type, created_before=200.0) == [f"{task_type}-a"]
+    assert ids(
+        task_type=task_type, status="completed", created_after=150.0, created_before=400.0
+    ) == [f"{task_type}-c"]
+    window = ids(status="completed", created_after=150.0, created_before=250.0)
+    assert f"{other_type}-a" in window
+    assert f"{task_type}-b" not in window
+
+
+def test_invalid_cursor_is_rejected(tm):
+    with pytest.raises(InvalidCursorError):
+        tm.list_tasks(cursor="not-a-cursor")
+
+
+def test_migrate_upgrades_an_existing_database(tmp_path):
+    # The tasks table as created before any migration existed
+    conn = sqlite3.connect(tmp_path / "old.db")
+    conn.execute("""
+    CREATE TABLE tasks (
+        id TEXT PRIMARY KEY,
+        type TEXT,
+        status TEXT,
+        payload TEXT,
+        result TEXT,
+        error TEXT,
+        created_at REAL
+    )
+    """)
+    conn.execute(
+        "INSERT INTO tasks VALUES ('old', 'command', 'completed', ?, NULL, NULL, 1.0)",
+        (json.dumps({"command": ["ls"]}),),
+    )
+    conn.commit()
+
+    with conn:
+        migrate(conn)
+
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+    assert {"started_at", "finished_at", "priority", "role"} <= columns
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(tasks)")}
+    assert {"idx_tasks_created", "idx_tasks_status_created", "idx_tasks_type_created"} <= indexes
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == MIGRATIONS[-1][0]
+    assert conn.execute("SELECT id, status FROM tasks").fetchall() == [("old", "completed")]
+
+    # Already at the latest version: nothing is applied again
+    with conn:
+        migrate(conn)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == MIGRATIONS[-1][0]
+    conn.close()
+
+
+def test_load_active_surfaces_db_errors(monkeypatch):
+    # No tasks table: startup must fail loudly, not recover nothing
+    monkeypatch.setattr(
+        "ai_os.tasks.task_manager.get_conn", lambda: sqlite3.connect(":memory:")
+    )
+    with pytest.raises(sqlite3.OperationalError):
+        TaskManager().load_active()
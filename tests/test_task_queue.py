@@ -0,0 +1,182 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from ai_os.persistence.schema import init_db
+from ai_os.tasks.task import TaskStatus
+from ai_os.tasks.task_manager import TaskManager
+from ai_os.tasks.task_queue import TaskQueue
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# DB_PATH is read from AIOS_DATA_DIR at import time, so each scenario
+# runs in its own interpreter.
+PRIORITY_AND_ROLE_LIMITS = textwrap.dedent(
+    """
+    import asyncio, json, threading, time
+
+    from ai_os.persistence.schema import init_db
+    from ai_os.tasks.task_manager import TaskManager
+    from ai_os.tasks.task_queue import TaskQueue
+
+    init_db()
+    tm = TaskManager()
+
+    gate = threading.Event()
+    order, running, peak = [], {}, {}
+    lock = threading.Lock()
+
+    def handler(task):
+        role = task.role
+        with lock:
+            order.append(task.payload["n"])
+            running[role] = running.get(role, 0) + 1
+            peak[role] = max(peak.get(role, 0), running[role])
+        gate.wait()
+        time.sleep(0.01)
+        with lock:
+            running[role] -= 1
+        return {"n": task.payload["n"]}
+
+    queue = TaskQueue(tm, {"job": handler}, workers=3, max_queue=100,
+                      role_limits={"user": 1})
+
+    # Queued before the workers start, so dispatch order is pure priority
+    tasks = [queue.submit("job", {"n": i}, priority=i % 3, role="user") for i in range(6)]
+    tasks += [queue.submit("job", {"n": 10 + i}, priority=0, role="admin") for i in range(2)]
+    queue.start()
+    time.sleep(0.2)
+    gate.set()
+
+    async def main():
+        return [await queue.wait(t, timeout=5) for t in tasks]
+
+    done = asyncio.run(main())
+    queue.shutdown()
+    print(json.dumps({
+        "statuses": sorted({t.status for t in done}),
+        "user_order": [n for n in order if n < 10],
+        "peak": peak,
+        "finished": all(t.started_at and t.finished_at for t in done),
+        "persisted": TaskManager().get_task(tasks[0].id).status,
+    }))
+    """
+)
+
+RESTART = textwrap.dedent(
+    """
+    import asyncio, json, sys
+
+    from ai_os.persistence.schema import init_db
+    from ai_os.tasks.task_manager import TaskManager
+    from ai_os.tasks.task_queue import TaskQueue
+
+    init_db()
+    tm = TaskManager()
+    queue = TaskQueue(tm, {"job": lambda task: {"ok": True}}, workers=1, max_queue=10)
+
+    if sys.argv[1] == "submit":
+        # Never started: tasks stay PENDING when the process exits
+        queued = [queue.submit("job", {}, role="admin").id for _ in range(3)]
+        # Sync-mode tasks cut off mid-request
+        inline = [tm.create_task("command", {}) for _ in range(2)]
+        tm.mark_running(inline[1])
+        tm.update_task(inline[1])
+        print(json.dumps({"queued": queued, "inline": [t.id for t in inline]}))
+    else:
+        submitted = json.loads(sys.argv[2])
+        requeued = queue.recover()
+        queue.start()
+        tasks = [tm.get_task(i) for i in submitted["queued"]]
+        inline = [TaskManager().get_task(i) for i in submitted["inline"]]
+
+        async def main():
+            return [await queue.wait(t, timeout=5) for t in tasks]
+
+        done = asyncio.run(main())
+        queue.shutdown()
+        print(json.dumps({
+            "requeued": requeued,
+            "statuses": sorted({t.status for t in done}),
+            "inline": sorted({(t.status, t.error) for t in inline}),
+        }))
+    """
+)
+
+
+def _run(tmp_path, code, *args):
+    env = dict(os.environ, AIOS_DATA_DIR=str(tmp_path), PYTHONPATH=str(SRC))
+    proc = subprocess.run(
+        [sys.executable, "-c", code, *args],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_priority_order_and_per_role_limit(tmp_path):
+    out = _run(tmp_path, PRIORITY_AND_ROLE_LIMITS)
+
+    assert out["statuses"] == ["completed"]
+    # priority 2 first, then 1, then 0; FIFO within a priority
+    assert out["user_order"] == [2, 5, 1, 4, 0, 3]
+    assert out["peak"]["user"] == 1
+    assert out["peak"]["admin"] == 2
+    assert out["finished"]
+    assert out["persisted"] == "completed"
+
+
+def test_pending_tasks_are_requeued_after_restart(tmp_path):
+    submitted = _run(tmp_path, RESTART, "submit")
+    out = _run(tmp_path, RESTART, "recover", json.dumps(submitted))
+
+    assert out["requeued"] == 3
+    assert out["statuses"] == ["completed"]
+    # Inline tasks can't be resumed, pending or running
+    assert out["inline"] == [["failed", "Interrupted by restart"]]
+
+
+@pytest.fixture
+def tm():
+    init_db()
+    return TaskManager()
+
+
+def test_long_poll_wakes_when_an_inline_task_finishes(tm):
+    queue = TaskQueue(tm, {}, workers=1, max_queue=1)
+    # A sync-mode task: run by the request itself, not the queue
+    task = tm.create_task("command", {"command": ["ls"]})
+    tm.mark_running(task)
+
+    def finish():
+        time.sleep(0.1)
+        task.status = TaskStatus.COMPLETED
+        tm.update_task(task)
+
+    threading.Thread(target=finish).start()
+    start = time.perf_counter()
+    asyncio.run(queue.wait(task, timeout=10))
+
+    assert task.status == TaskStatus.COMPLETED
+    assert time.perf_counter() - start < 5
+    assert queue.snapshot()["waiters"] == 0
+
+
+def test_priority_is_clamped(tm):
+    queue = TaskQueue(tm, {"job": lambda task: {}}, workers=1, max_queue=10, max_priority=5)
+
+    priorities = [queue.submit("job", {}, priority=p).priority for p in (10**9, -10**9, 3)]
+
+    assert priorities == [5, -5, 3]
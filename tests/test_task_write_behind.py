@@ -0,0 +1,173 @@
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import textwrap
+import threading
+from pathlib import Path
+
+import pytest
+
+from ai_os.persistence.write_behind import RELAXED, STRICT, WriteBehindError, WriteBehindQueue
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Writes completed tasks from several threads in strict write-behind mode,
+# printing "ACK <id>" once update_task() has returned, then SIGKILLs itself
+# while writers are still mid-flight. The OS page cache survives a process
+# kill, so this checks that acks wait for the commit, not that it was
+# fsynced; test_strict_mode_writes_with_synchronous_full covers that.
+CRASHING_WRITER = textwrap.dedent(
+    """
+    import os, signal, threading
+
+    from ai_os.persistence.db import get_conn
+    from ai_os.persistence.schema import init_db
+    from ai_os.persistence.write_behind import STRICT, WriteBehindQueue
+    from ai_os.tasks.task_manager import TaskManager
+
+    init_db()
+    tm = TaskManager(write_behind=WriteBehindQueue(
+        get_conn, flush_interval_ms=5, max_batch=32, durability=STRICT,
+    ))
+
+    acked = 0
+    lock = threading.Lock()
+
+    def worker():
+        global acked
+        while True:
+            task = tm.create_task("command", {"command": ["ls"]})
+            task.status = "completed"
+            task.result = {"stdout": "ok"}
+            tm.update_task(task)
+            with lock:
+                print("ACK", task.id, flush=True)
+                acked += 1
+                if acked >= 200:
+                    os.kill(os.getpid(), signal.SIGKILL)
+
+    for _ in range(4):
+        threading.Thread(target=worker, daemon=True).start()
+    threading.Event().wait()
+    """
+)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_strict_mode_loses_no_acked_task_when_the_process_dies(tmp_path):
+    env = dict(os.environ, AIOS_DATA_DIR=str(tmp_path), PYTHONPATH=str(SRC))
+    proc = subprocess.run(
+        [sys.executable, "-c", CRASHING_WRITER],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert proc.returncode == -signal.SIGKILL, proc.stderr
+
+    # stdout also carries log lines (e.g. schema migrations)
+    acked = [
+        line.split()[1] for line in proc.stdout.splitlines()
+        if line.startswith("ACK ")
+    ]
+    assert len(acked) >= 200
+
+    conn = sqlite3.connect(tmp_path / "ai_os.db")
+    rows = dict(
+        conn.execute(
+            f"SELECT id, status FROM tasks WHERE id IN ({','.join('?' * len(acked))})",
+            acked,
+        ).fetchall()
+    )
+    conn.close()
+
+    assert set(rows) == set(acked)
+    assert set(rows.values()) == {"completed"}
+
+
+def test_close_drains_relaxed_writes(tmp_path):
+    path = tmp_path / "wb.db"
+    setup = sqlite3.connect(path)
+    setup.execute("CREATE TABLE t (v INTEGER)")
+    setup.commit()
+    setup.close()
+
+    wb = WriteBehindQueue(
+        lambda: sqlite3.connect(path),
+        flush_interval_ms=1000,
+        max_batch=10,
+        durability=RELAXED,
+    )
+    for i in range(95):
+        wb.submit("INSERT INTO t (v) VALUES (?)", (i,))
+    wb.close()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 95
+    conn.close()
+    assert wb.stats()["statements"] == 95
+
+
+def _table(path, ddl="CREATE TABLE t (v INTEGER)"):
+    setup = sqlite3.connect(path)
+    setup.execute(ddl)
+    setup.commit()
+    setup.close()
+
+
+def test_strict_mode_writes_with_synchronous_full(tmp_path):
+    path = tmp_path / "wb.db"
+    _table(path)
+    conns = []
+
+    def connect():
+        conns.append(sqlite3.connect(path, check_same_thread=False))
+        return conns[-1]
+
+    wb = WriteBehindQueue(connect, durability=STRICT)
+    wb.submit("INSERT INTO t (v) VALUES (?)", (1,))
+    wb.close()
+
+    # 2 = FULL: commits are fsynced before submit() returns
+    assert conns[0].execute("PRAGMA synchronous").fetchone()[0] == 2
+
+
+def test_failed_statement_does_not_take_its_batch_down(tmp_path):
+    path = tmp_path / "wb.db"
+    _table(path, "CREATE TABLE t (v INTEGER UNIQUE)")
+    wb = WriteBehindQueue(
+        lambda: sqlite3.connect(path),
+        flush_interval_ms=1000,
+        max_batch=10,
+        durability=RELAXED,
+    )
+    futures = [wb.submit("INSERT INTO t (v) VALUES (?)", (v,)) for v in (1, 2, 1, 3)]
+    wb.close()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        futures[2].result()
+    conn = sqlite3.connect(path)
+    assert [r[0] for r in conn.execute("SELECT v FROM t ORDER BY v")] == [1, 2, 3]
+    conn.close()
+    assert wb.stats()["statements"] == 3
+    assert wb.stats()["failed"] == 1
+
+
+def test_writes_fail_instead_of_hanging_once_the_writer_stops():
+    release = threading.Event()
+
+    def connect():
+        release.wait()
+        raise sqlite3.OperationalError("unable to open database file")
+
+    wb = WriteBehindQueue(connect, durability=RELAXED)
+    queued = wb.submit("INSERT INTO t (v) VALUES (?)", (1,))
+    release.set()
+
+    with pytest.raises(WriteBehindError):
+        queued.result(timeout=2)
+    with pytest.raises(WriteBehindError):
+        wb.submit("INSERT INTO t (v) VALUES (?)", (2,))
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import PreTrainedTokenizerFast
+
+from ai_os.config import ConfigError
+from ai_os.inference.pooling import combine_chunks, pool
+from ai_os.inference.tokenization import FastTokenizer
+
+# Word-level vocab: "w<i>" is token id i + 2, so windows are easy to read
+VOCAB = {"[PAD]": 0, "[UNK]": 1, **{f"w{i}": i + 2 for i in range(32)}}
+
+
+@pytest.fixture(scope="module")
+def hf_tokenizer():
+    tok = Tokenizer(models.WordLevel(VOCAB, unk_token="[UNK]"))
+    tok.pre_tokenizer = pre_tokenizers.Whitespace()
+    return PreTrainedTokenizerFast(tokenizer_object=tok, pad_token="[PAD]")
+
+
+def _text(n):
+    return " ".join(f"w{i}" for i in range(n))
+
+
+def _ids(*words):
+    return [w + 2 for w in words]
+
+
+def test_truncate_mode_reports_cut_texts(hf_tokenizer):
+    tok = FastTokenizer(hf_tokenizer, max_length=4)
+    batch = tok.encode([_text(4), _text(6)])
+
+    assert batch.ids == [_ids(0, 1, 2, 3), _ids(0, 1, 2, 3)]
+    assert batch.truncated.tolist() == [False, True]
+    assert batch.owners.tolist() == [0, 1]
+
+
+def test_sliding_windows_overlap_at_the_boundary(hf_tokenizer):
+    tok = FastTokenizer(hf_tokenizer, max_length=4, mode="sliding_window", stride=1, max_chunks=3)
+    batch = tok.encode([_text(4), _text(5), _text(10), _text(11)])
+
+    # Exactly one window: no overlap row
+    # One token past it: a second window repeating the boundary token
+    assert batch.ids[0] == _ids(0, 1, 2, 3)
+    assert batch.ids[1:3] == [_ids(0, 1, 2, 3), _ids(3, 4)]
+    assert batch.ids[3:6] == [_ids(0, 1, 2, 3), _ids(3, 4, 5, 6), _ids(6, 7, 8, 9)]
+    assert batch.owners.tolist() == [0, 1, 1, 2, 2, 2, 3, 3, 3]
+    # Only text 3 needs more than max_chunks windows
+    assert batch.truncated.tolist() == [False, False, False, True]
+
+
+def test_pad_fills_masks_and_reuses_the_thread_buffer(hf_tokenizer):
+    tok = FastTokenizer(hf_tokenizer, max_length=4, mode="sliding_window", stride=1, max_chunks=2)
+    batch = tok.encode([_text(5)])
+
+    inputs = tok.pad(batch, [0, 1])
+    assert inputs["input_ids"].tolist() == [_ids(0, 1, 2, 3), _ids(3, 4) + [0, 0]]
+    assert inputs["attention_mask"].tolist() == [[1, 1, 1, 1], [1, 1, 0, 0]]
+    assert inputs["input_ids"].flags["C_CONTIGUOUS"]
+
+    again = tok.pad(batch, [1])
+    assert np.shares_memory(again["input_ids"], inputs["input_ids"])
+
+
+def test_windows_recombine_into_one_token_weighted_mean(hf_tokenizer):
+    tok = FastTokenizer(hf_tokenizer, max_length=4, mode="sliding_window", stride=1, max_chunks=4)
+    texts = [_text(2), _text(7)]
+    batch = tok.encode(texts)
+    inputs = tok.pad(batch, list(range(len(batch))))
+
+    # Hidden state = the token id, so every pooled value is checkable
+    hidden = inputs["input_ids"][:, :, None].astype(np.float32)
+    pooled = pool(hidden, inputs["attention_mask"], "mean")
+    combined = combine_chunks(pooled, batch.owners, batch.lengths, batch.count, "mean")
+
+    assert combined.shape == (2, 1)
+    assert combined[0, 0] == pytest.approx(np.mean(_ids(0, 1)))
+    # Windows [0..3] and [3..6]: the shared boundary token counts in both
+    assert combined[1, 0] == pytest.approx(np.mean(_ids(0, 1, 2, 3, 3, 4, 5, 6)))
+
+
+def test_combine_chunks_strategies():
+    pooled = np.array([[1.0, 5.0], [3.0, 1.0], [7.0, 7.0]], dtype=np.float32)
+    owners = np.array([0, 0, 1])
+    lengths = np.array([3, 1, 2])
+
+    np.testing.assert_allclose(
+        combine_chunks(pooled, owners, lengths, 2, "mean"), [[1.5, 4.0], [7.0, 7.0]]
+    )
+    np.testing.assert_allclose(
+        combine_chunks(pooled, owners, lengths, 2, "max"), [[3.0, 5.0], [7.0, 7.0]]
+    )
+    np.testing.assert_allclose(
+        combine_chunks(pooled, owners, lengths, 2, "cls"), [[1.0, 5.0], [7.0, 7.0]]
+    )
+    # One row per text: nothing to combine
+    assert combine_chunks(pooled, np.arange(3), lengths, 3) is pooled
+
+
+def test_unknown_truncation_mode_is_rejected(hf_tokenizer):
+    with pytest.raises(ConfigError):
+        FastTokenizer(hf_tokenizer, max_length=4, mode="middle_out")